@@ -4,7 +4,13 @@ from dotenv import load_dotenv
 from flask import Flask
 from flask_migrate import Migrate
 from flask_cors import CORS
+from .cli import register_commands
 from .models import db
+from .utils.exercise_catalog import init_exercise_catalog
+from .utils.identity_cache import init_identity_cache
+from .utils.password_hashing import init_password_hasher
+from .utils.query_stats import init_query_stats
+from .utils.workout_report import init_report_cache
 from .views import api_bp
 
 load_dotenv()
@@ -20,6 +26,32 @@ def create_app(config_class=None):
             os.getenv("SQLALCHEMY_TRACK_MODIFICATIONS", "False") == "True"
         )
         app.config["SECRET_KEY"] = os.getenv("SECRET_KEY")
+        app.config["IDENTITY_CACHE_SIZE"] = int(os.getenv("IDENTITY_CACHE_SIZE", "10000"))
+        app.config["IDENTITY_CACHE_TTL"] = int(os.getenv("IDENTITY_CACHE_TTL", "300"))
+        app.config["PASSWORD_HASH_WORKERS"] = int(
+            os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1))
+        )
+        app.config["PASSWORD_HASH_QUEUE_DEPTH"] = int(
+            os.getenv("PASSWORD_HASH_QUEUE_DEPTH", "64")
+        )
+        app.config["PASSWORD_HASH_METHOD"] = os.getenv("PASSWORD_HASH_METHOD", "scrypt")
+        app.config["PASSWORD_HASH_RETRY_AFTER"] = int(
+            os.getenv("PASSWORD_HASH_RETRY_AFTER", "1")
+        )
+        app.config["EXERCISE_CATALOG_CHECK_INTERVAL"] = float(
+            os.getenv("EXERCISE_CATALOG_CHECK_INTERVAL", "5")
+        )
+        app.config["REPORT_CACHE_BYTES"] = int(
+            os.getenv("REPORT_CACHE_BYTES", str(64 * 2**20))
+        )
+        app.config["IDEMPOTENCY_KEY_TTL"] = int(
+            os.getenv("IDEMPOTENCY_KEY_TTL", str(24 * 60 * 60))
+        )
+        app.config["IDEMPOTENCY_KEY_LEASE"] = int(
+            os.getenv("IDEMPOTENCY_KEY_LEASE", str(2 * 60))
+        )
+        if os.getenv("QUERY_BUDGET"):
+            app.config["QUERY_BUDGET"] = int(os.getenv("QUERY_BUDGET"))
     
     # Enhanced CORS for both cookie and header-based auth
     CORS(app, 
@@ -31,14 +63,21 @@ def create_app(config_class=None):
              'http://frontend:80'
          ],
          supports_credentials=True,
-         allow_headers=['Content-Type', 'Authorization', 'X-Requested-With'],
-         expose_headers=['Content-Type', 'Authorization', 'Set-Cookie'],
+         allow_headers=['Content-Type', 'Authorization', 'X-Requested-With', 'Idempotency-Key'],
+         expose_headers=['Content-Type', 'Authorization', 'Set-Cookie', 'Retry-After', 'ETag', 'Last-Modified', 'X-Next-Cursor', 'Idempotent-Replayed',
+                         'X-Query-Count', 'X-Query-Time-Ms', 'X-Query-N-Plus-One'],
          methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS', 'PATCH'])
     
     db.init_app(app)
     Migrate(app, db)
+    init_exercise_catalog(app)
+    init_identity_cache(app)
+    init_password_hasher(app)
+    init_query_stats(app)
+    init_report_cache(app)
     
     app.register_blueprint(api_bp, url_prefix="/api")
+    register_commands(app)
     
     @app.route("/")
     def index():
@@ -0,0 +1,53 @@
+import click
+
+from .models import IdempotencyKey, UserExerciseStats, db
+from .utils.exercise_loader import load_exercises, read_catalog
+from .utils.idempotency import DEFAULT_IDEMPOTENCY_KEY_TTL
+
+
+def register_commands(app):
+    "Attach the app's flask CLI commands."
+
+    @app.cli.command("load-exercises")
+    @click.argument("path", type=click.Path(exists=True, dir_okay=False))
+    @click.option("--batch-size", default=5000, show_default=True)
+    def load_exercises_command(path, batch_size):
+        "Insert or update the exercise catalog from a JSON or CSV file."
+        try:
+            exercises = read_catalog(path)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+
+        result = load_exercises(exercises, batch_size=batch_size)
+        click.echo(
+            f"Exercises loaded from {path}: {result.inserted} inserted, "
+            f"{result.updated} updated, {result.skipped} skipped."
+        )
+
+    @app.cli.command("rebuild-exercise-stats")
+    def rebuild_exercise_stats_command():
+        "Recompute every user's exercise stats from their logged sessions."
+        rows = UserExerciseStats.rebuild()
+        db.session.commit()
+        click.echo(f"Exercise stats rebuilt: {rows} rows.")
+
+    @app.cli.command("check-exercise-stats")
+    def check_exercise_stats_command():
+        "Report exercise stats that differ from a full recomputation."
+        drift = UserExerciseStats.find_drift()
+        if drift:
+            for user_id, exercise_id in drift:
+                click.echo(f"user {user_id}, exercise {exercise_id}")
+            raise click.ClickException(
+                f"{len(drift)} exercise stats rows are out of date. "
+                "Run 'flask rebuild-exercise-stats' to fix them."
+            )
+        click.echo("Exercise stats are consistent.")
+
+    @app.cli.command("purge-idempotency-keys")
+    def purge_idempotency_keys_command():
+        "Delete idempotency keys older than IDEMPOTENCY_KEY_TTL."
+        ttl = app.config.get("IDEMPOTENCY_KEY_TTL", DEFAULT_IDEMPOTENCY_KEY_TTL)
+        deleted = IdempotencyKey.purge(ttl)
+        db.session.commit()
+        click.echo(f"Idempotency keys purged: {deleted}.")
@@ -1,7 +1,11 @@
 from .db import db
+from .cache_version import CacheVersion
+from .change_log import ChangeLog
 from .exercise import Exercise
+from .idempotency_key import IdempotencyKey
 from .session_exercise import SessionExercise
 from .user import User
+from .user_exercise_stats import UserExerciseStats
 from .workout_plan import WorkoutPlan
 from .workout_plan_exercise import WorkoutPlanExercise
 from .workout_session import WorkoutSession
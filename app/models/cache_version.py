@@ -0,0 +1,45 @@
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from . import db
+
+
+class CacheVersion(db.Model):
+    """
+    Version counters of in-process caches, shared by every worker and CLI
+    process. A write that invalidates a cache bumps its row in the same
+    transaction; each process compares the row with the version it last
+    saw to tell when to reload.
+    """
+
+    __tablename__ = "cache_versions"
+
+    name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<CacheVersion {self.name} {self.version}>"
+
+    @classmethod
+    def get(cls, name):
+        "Get the version of a cache, 0 if it was never bumped."
+        return db.session.scalar(select(cls.version).where(cls.name == name)) or 0
+
+    @classmethod
+    def current(cls, name):
+        "The version of a cache as a column expression, to read it alongside other rows."
+        return func.coalesce(
+            select(cls.version).where(cls.name == name).scalar_subquery(), 0
+        )
+
+    @classmethod
+    def bump(cls, name, connection=None):
+        """
+        Move a cache's version on, on connection if given (e.g. from inside
+        a flush) or the session. Does not commit.
+        """
+        statement = insert(cls).values(name=name, version=1)
+        statement = statement.on_conflict_do_update(
+            index_elements=["name"], set_={"version": cls.version + 1}
+        )
+        (connection or db.session).execute(statement)
@@ -0,0 +1,94 @@
+from sqlalchemy import func, insert, select
+
+from . import db
+
+# Entities recorded in the change log, parents before children
+ENTITIES = (
+    "workout_plan",
+    "workout_plan_exercise",
+    "workout_session",
+    "session_exercise",
+)
+
+
+class ChangeLog(db.Model):
+    """
+    Append-only log of writes to a user's plans, plan exercises, sessions
+    and session exercises, for clients that sync incrementally. Entries are
+    recorded by the write paths in the same transaction, one multi-row
+    INSERT per write. Deleting a plan or session only records the parent;
+    its children went with it through ON DELETE CASCADE.
+
+    Ids double as sync cursors, so a user's entries must become visible in
+    id order: record() holds a per-user advisory lock from before its ids
+    are drawn until the transaction ends.
+    """
+
+    __tablename__ = "change_log"
+    __table_args__ = (
+        # Sync reads a user's entries after a cursor in one range scan
+        db.Index("ix_change_log_user_id_id", "user_id", "id"),
+    )
+
+    id = db.Column(db.BigInteger, primary_key=True)
+    user_id = db.Column(
+        db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    entity = db.Column(db.String(32), nullable=False)
+    entity_id = db.Column(db.Integer, nullable=False)
+    deleted = db.Column(db.Boolean, nullable=False, default=False)
+    changed_at = db.Column(
+        db.DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+    def __repr__(self):
+        return f"<ChangeLog {self.id} {self.entity} {self.entity_id}>"
+
+    @classmethod
+    def record(cls, user_id, deleted=False, **ids_by_entity):
+        """
+        Log that the user's rows with the given ids were written or deleted,
+        e.g. record(user_id, workout_session=[1], session_exercise=[2, 3]),
+        in one statement. Waits for the user's other writers to finish, so
+        call it last before committing. Does not commit.
+        """
+        rows = [
+            {
+                "user_id": user_id,
+                "entity": entity,
+                "entity_id": entity_id,
+                "deleted": deleted,
+            }
+            for entity in ENTITIES
+            for entity_id in sorted(set(ids_by_entity.pop(entity, ())))
+        ]
+        if ids_by_entity:
+            raise ValueError(f"Unknown change log entities: {', '.join(ids_by_entity)}")
+        if rows:
+            # Sequence values are drawn at insert time but become visible at
+            # commit; without the lock a later id could commit first and a
+            # client syncing in between would skip the earlier one for good
+            lock = func.pg_advisory_xact_lock(func.hashtext(cls.__tablename__), user_id)
+            db.session.execute(select(lock))
+            db.session.execute(insert(cls), rows)
+
+    @classmethod
+    def get_since(cls, user_id, after_id, limit):
+        """
+        Get up to limit + 1 of the user's (id, entity, entity_id, deleted)
+        entries after after_id, oldest first. The extra row tells the caller
+        whether there are more.
+        """
+        return db.session.execute(
+            select(cls.id, cls.entity, cls.entity_id, cls.deleted)
+            .where(cls.user_id == user_id, cls.id > after_id)
+            .order_by(cls.id)
+            .limit(limit + 1)
+        ).all()
+
+    @classmethod
+    def latest_id(cls, user_id):
+        "Get the id of the user's latest entry, or 0."
+        return db.session.scalar(
+            select(func.coalesce(func.max(cls.id), 0)).where(cls.user_id == user_id)
+        )
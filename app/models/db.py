@@ -1,4 +1,7 @@
+from contextlib import contextmanager
+
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session as BaseSession
 from sqlalchemy.orm import DeclarativeBase
 
 
@@ -6,4 +9,35 @@ class Base(DeclarativeBase):
     pass
 
 
-db = SQLAlchemy(model_class=Base)
+class CommitHoldingMixin:
+    "Session mixin whose commits can be held back with holding_commits()."
+
+    _holding = None
+
+    def commit(self):
+        if self._holding is not None:
+            self.flush()
+            self._holding["requested"] = True
+            return
+        super().commit()
+
+    @contextmanager
+    def holding_commits(self):
+        """
+        Turn commit() calls in the block into flushes, so the caller can add
+        to the transaction before committing it. Yields a dict whose
+        "requested" item says whether the block asked to commit.
+        """
+        held = {"requested": False}
+        self._holding = held
+        try:
+            yield held
+        finally:
+            self._holding = None
+
+
+class Session(CommitHoldingMixin, BaseSession):
+    pass
+
+
+db = SQLAlchemy(model_class=Base, session_options={"class_": Session})
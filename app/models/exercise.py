@@ -1,14 +1,87 @@
+from sqlalchemy import DDL, event, func, text, tuple_
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import deferred
+from sqlalchemy.sql.functions import FunctionElement
 from . import db
 
 
+class search_document(FunctionElement):
+    """
+    The stored full-text document of an exercise.
+
+    Only Postgres has full-text search; other databases (e.g. SQLite test
+    runs) search the in-memory index instead and leave the column empty.
+    """
+
+    inherit_cache = True
+
+
+@compiles(search_document)
+def _search_document(element, compiler, **kw):
+    return "NULL"
+
+
+@compiles(search_document, "postgresql")
+def _search_document_postgresql(element, compiler, **kw):
+    return "to_tsvector('simple', name || ' ' || coalesce(description, ''))"
+
+
+def trigram_available(ddl, target, bind, **kw):
+    "True if the server offers pg_trgm, which fuzzy name search needs."
+    return (
+        bind is not None
+        and bind.execute(
+            text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        ).scalar()
+        is not None
+    )
+
+
 class Exercise(db.Model):
     __tablename__ = "exercises"
+    __table_args__ = (
+        # Natural key for the catalog loader's upserts
+        db.UniqueConstraint("name", name="uq_exercises_name"),
+        # Keyset pagination walks (name, id); the filtered listings walk the
+        # same order inside one category / muscle group.
+        db.Index("ix_exercises_name_id", "name", "id"),
+        db.Index("ix_exercises_category_name_id", "category", "name", "id"),
+        db.Index("ix_exercises_muscle_group_name_id", "muscle_group", "name", "id"),
+        # Case-insensitive name prefix search (lower(name) LIKE 'abc%')
+        db.Index(
+            "ix_exercises_lower_name_pattern",
+            text("lower(name) varchar_pattern_ops"),
+        ).ddl_if(dialect="postgresql"),
+        # The catalog is read far more than it is written, so skip GIN's
+        # pending list: every search would otherwise scan it linearly.
+        db.Index(
+            "ix_exercises_search_vector",
+            "search_vector",
+            postgresql_using="gin",
+            postgresql_with={"fastupdate": "off"},
+        ).ddl_if(dialect="postgresql"),
+        # Misspelt name search (similarity / %), where pg_trgm is available
+        db.Index(
+            "ix_exercises_lower_name_trgm",
+            text("lower(name) gin_trgm_ops"),
+            postgresql_using="gin",
+            postgresql_with={"fastupdate": "off"},
+        ).ddl_if(dialect="postgresql", callable_=trigram_available),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(255), nullable=False)
     description = db.Column(db.Text)
     category = db.Column(db.String(100))
     muscle_group = db.Column(db.String(100))
+    # Kept by the database for full-text search; never loaded into objects
+    search_vector = deferred(
+        db.Column(
+            db.Text().with_variant(TSVECTOR(), "postgresql"),
+            db.Computed(search_document(), persisted=True),
+        )
+    )
 
     # Relationships
     workout_plan_exercises = db.relationship(
@@ -22,3 +95,46 @@ class Exercise(db.Model):
     def get_by_id(cls, id):
         "Get an exercise by id."
         return db.session.query(cls).filter(cls.id == id).one_or_none()
+
+    @classmethod
+    def get_page(
+        cls, limit, category=None, muscle_group=None, name_prefix=None, after=None
+    ):
+        """
+        Get up to limit + 1 exercises ordered by (name, id), starting after the
+        (name, id) pair in after. The extra row tells the caller whether there
+        is a next page.
+        """
+        query = db.session.query(
+            cls.id, cls.name, cls.category, cls.muscle_group
+        ).order_by(cls.name, cls.id)
+
+        if category is not None:
+            query = query.filter(cls.category == category)
+        if muscle_group is not None:
+            query = query.filter(cls.muscle_group == muscle_group)
+        if name_prefix:
+            query = query.filter(
+                func.lower(cls.name).startswith(name_prefix.lower(), autoescape=True)
+            )
+        if after is not None:
+            query = query.filter(tuple_(cls.name, cls.id) > tuple(after))
+
+        return query.limit(limit + 1).all()
+
+    @classmethod
+    def get_existing_ids(cls, ids):
+        "Get the subset of ids that belong to an exercise."
+        if not ids:
+            return set()
+        return set(db.session.scalars(db.select(cls.id).where(cls.id.in_(ids))))
+
+
+# The trigram index's operator class comes from the extension
+event.listen(
+    Exercise.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(
+        dialect="postgresql", callable_=trigram_available
+    ),
+)
@@ -0,0 +1,129 @@
+from datetime import timedelta
+
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from . import db
+
+
+class IdempotencyKey(db.Model):
+    """
+    A write request made with an Idempotency-Key header and, once it has
+    finished, the response to replay for retries of it. status_code is NULL
+    while the request is still running. created_at is when the running
+    request claimed the key: the claim is its lease and fencing token.
+    """
+
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        # Expired keys are purged by age
+        db.Index("ix_idempotency_keys_created_at", "created_at"),
+    )
+
+    user_id = db.Column(
+        db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    key = db.Column(db.String(255), primary_key=True)
+    # Method, path and body of the request the key was first used for
+    request_hash = db.Column(db.String(64), nullable=False)
+    status_code = db.Column(db.Integer)
+    content_type = db.Column(db.String(255))
+    response_body = db.Column(db.LargeBinary)
+    created_at = db.Column(
+        db.DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+    def __repr__(self):
+        return f"<IdempotencyKey {self.user_id}/{self.key}>"
+
+    @classmethod
+    def get(cls, user_id, key, ttl):
+        """
+        Get the request_hash, status_code, content_type and response_body of
+        a key younger than ttl seconds, or None.
+        """
+        return db.session.execute(
+            select(
+                cls.request_hash, cls.status_code, cls.content_type, cls.response_body
+            ).where(
+                cls.user_id == user_id,
+                cls.key == key,
+                cls.created_at >= cutoff(ttl),
+            )
+        ).one_or_none()
+
+    @classmethod
+    def claim(cls, user_id, key, request_hash, ttl, lease):
+        """
+        Record that a request with key has started, taking over a row older
+        than ttl seconds or one still running after lease seconds - its
+        worker died or gave up. Returns the claim's created_at, to pass to
+        complete() and release(), or None if the request is running or done
+        elsewhere. Does not commit.
+        """
+        statement = insert(cls).values(
+            user_id=user_id, key=key, request_hash=request_hash
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=["user_id", "key"],
+            set_={
+                "request_hash": statement.excluded.request_hash,
+                "status_code": None,
+                "content_type": None,
+                "response_body": None,
+                "created_at": func.now(),
+            },
+            where=or_(
+                cls.created_at < cutoff(ttl),
+                and_(cls.status_code.is_(None), cls.created_at < cutoff(lease)),
+            ),
+        ).returning(cls.created_at)
+        return db.session.scalar(statement)
+
+    @classmethod
+    def complete(
+        cls, user_id, key, claimed_at, status_code, content_type, response_body
+    ):
+        """
+        Store the response of the claim made at claimed_at. Returns False if
+        the claim was taken over after its lease ran out. Does not commit.
+        """
+        result = db.session.execute(
+            update(cls)
+            .where(
+                cls.user_id == user_id,
+                cls.key == key,
+                cls.created_at == claimed_at,
+            )
+            .values(
+                status_code=status_code,
+                content_type=content_type,
+                response_body=response_body,
+            )
+        )
+        return result.rowcount == 1
+
+    @classmethod
+    def release(cls, user_id, key, claimed_at):
+        """
+        Forget the claim made at claimed_at, whose request failed, so it can
+        be retried. Does not commit.
+        """
+        db.session.execute(
+            delete(cls).where(
+                cls.user_id == user_id,
+                cls.key == key,
+                cls.created_at == claimed_at,
+            )
+        )
+
+    @classmethod
+    def purge(cls, ttl):
+        "Delete keys older than ttl seconds and return how many. Does not commit."
+        result = db.session.execute(delete(cls).where(cls.created_at < cutoff(ttl)))
+        return result.rowcount
+
+
+def cutoff(ttl):
+    "Creation time before which keys with a ttl in seconds have expired (database clock)."
+    return func.now() - timedelta(seconds=ttl)
@@ -3,6 +3,18 @@ from . import db
 
 class SessionExercise(db.Model):
     __tablename__ = "session_exercises"
+    __table_args__ = (
+        # Session detail loads and edits look exercises up within a session;
+        # plan exercise deletes cascade through the second index.
+        db.Index(
+            "ix_session_exercises_session_id_plan_exercise_id",
+            "workout_session_id",
+            "workout_plan_exercise_id",
+        ),
+        db.Index(
+            "ix_session_exercises_workout_plan_exercise_id", "workout_plan_exercise_id"
+        ),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     workout_session_id = db.Column(
@@ -12,7 +12,11 @@ class User(db.Model):
 
     # Relationships
     workout_plans = db.relationship(
-        "WorkoutPlan", backref="user", lazy=True, cascade="all, delete-orphan"
+        "WorkoutPlan",
+        backref="user",
+        lazy=True,
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
     def __repr__(self):
@@ -0,0 +1,235 @@
+from sqlalchemy import delete, func, or_, select
+from sqlalchemy.dialects.postgresql import insert
+
+from . import db
+
+STAT_FIELDS = (
+    "total_sets",
+    "total_reps",
+    "total_volume",
+    "max_weight",
+    "last_performed_at",
+    "session_count",
+)
+
+
+class UserExerciseStats(db.Model):
+    """
+    Running totals of everything a user has logged for an exercise, so
+    progress questions read one row instead of the whole history. Kept up
+    to date by the session write paths in the same transaction; rebuild()
+    and find_drift() recompute it from session_exercises.
+    """
+
+    __tablename__ = "user_exercise_stats"
+    __table_args__ = (
+        # Exercise deletes cascade through here
+        db.Index("ix_user_exercise_stats_exercise_id", "exercise_id"),
+    )
+
+    user_id = db.Column(
+        db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    exercise_id = db.Column(
+        db.Integer, db.ForeignKey("exercises.id", ondelete="CASCADE"), primary_key=True
+    )
+    total_sets = db.Column(db.Integer, nullable=False, default=0)
+    total_reps = db.Column(db.Integer, nullable=False, default=0)
+    total_volume = db.Column(db.Float, nullable=False, default=0.0)
+    max_weight = db.Column(db.Float)
+    # Latest completed_at of a session that logged the exercise
+    last_performed_at = db.Column(db.DateTime)
+    session_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<UserExerciseStats {self.user_id}/{self.exercise_id}>"
+
+    @classmethod
+    def get_for_user(cls, user_id, exercise_id=None):
+        """
+        Get a user's stats with each exercise's name, ordered by name, or the
+        (stats, name) row for one exercise by primary key.
+        """
+        from . import Exercise
+
+        query = (
+            db.session.query(cls, Exercise.name)
+            .join(Exercise, cls.exercise_id == Exercise.id)
+            .filter(cls.user_id == user_id)
+        )
+        if exercise_id is not None:
+            return query.filter(cls.exercise_id == exercise_id).one_or_none()
+        return query.order_by(Exercise.name).all()
+
+    @classmethod
+    def aggregate(cls, *conditions):
+        """
+        Select the stats of every (user, exercise) pair from the session
+        exercises matching conditions, in STAT_FIELDS order after the keys.
+        """
+        from . import SessionExercise, WorkoutPlan, WorkoutPlanExercise, WorkoutSession
+
+        sets = func.coalesce(SessionExercise.actual_sets, 0)
+        reps = sets * func.coalesce(SessionExercise.actual_reps, 0)
+        return (
+            select(
+                WorkoutPlan.user_id,
+                WorkoutPlanExercise.exercise_id,
+                func.sum(sets).label("total_sets"),
+                func.sum(reps).label("total_reps"),
+                func.coalesce(
+                    func.sum(reps * SessionExercise.actual_weight), 0.0
+                ).label("total_volume"),
+                func.max(SessionExercise.actual_weight).label("max_weight"),
+                func.max(WorkoutSession.completed_at).label("last_performed_at"),
+                func.count(SessionExercise.workout_session_id.distinct()).label(
+                    "session_count"
+                ),
+            )
+            .select_from(SessionExercise)
+            .join(WorkoutSession, SessionExercise.workout_session_id == WorkoutSession.id)
+            .join(
+                WorkoutPlanExercise,
+                SessionExercise.workout_plan_exercise_id == WorkoutPlanExercise.id,
+            )
+            .join(WorkoutPlan, WorkoutSession.workout_plan_id == WorkoutPlan.id)
+            .where(*conditions)
+            .group_by(WorkoutPlan.user_id, WorkoutPlanExercise.exercise_id)
+        )
+
+    @classmethod
+    def exercise_ids(cls, *conditions):
+        "Get the ids of the exercises logged in the session exercises matching conditions."
+        from . import SessionExercise, WorkoutPlanExercise, WorkoutSession
+
+        return set(
+            db.session.scalars(
+                select(WorkoutPlanExercise.exercise_id)
+                .select_from(SessionExercise)
+                .join(
+                    WorkoutSession,
+                    SessionExercise.workout_session_id == WorkoutSession.id,
+                )
+                .join(
+                    WorkoutPlanExercise,
+                    SessionExercise.workout_plan_exercise_id == WorkoutPlanExercise.id,
+                )
+                .where(*conditions)
+                .distinct()
+            )
+        )
+
+    @classmethod
+    def add_session(cls, workout_session_id):
+        """
+        Add a newly created, flushed session's exercises to the running
+        totals in one statement. Does not commit.
+        """
+        cls.add_sessions([workout_session_id])
+
+    @classmethod
+    def add_sessions(cls, workout_session_ids):
+        "Add several newly created, flushed sessions at once, as add_session does."
+        from . import SessionExercise
+
+        if not workout_session_ids:
+            return
+        statement = insert(cls).from_select(
+            ["user_id", "exercise_id", *STAT_FIELDS],
+            cls.aggregate(SessionExercise.workout_session_id.in_(workout_session_ids)),
+        )
+        excluded = statement.excluded
+        statement = statement.on_conflict_do_update(
+            index_elements=["user_id", "exercise_id"],
+            set_={
+                "total_sets": cls.total_sets + excluded.total_sets,
+                "total_reps": cls.total_reps + excluded.total_reps,
+                "total_volume": cls.total_volume + excluded.total_volume,
+                # greatest() ignores NULLs
+                "max_weight": func.greatest(cls.max_weight, excluded.max_weight),
+                "last_performed_at": func.greatest(
+                    cls.last_performed_at, excluded.last_performed_at
+                ),
+                "session_count": cls.session_count + excluded.session_count,
+            },
+        )
+        db.session.execute(statement)
+
+    @classmethod
+    def refresh(cls, user_id, exercise_ids):
+        """
+        Recompute a user's stats for exercise_ids from their history, e.g.
+        after session exercises were edited or deleted. Maxima cannot be
+        un-applied, so this rereads the user's rows for those exercises
+        only. A row that a concurrent add_session inserts between the
+        DELETE and the INSERT is overwritten rather than failing the
+        refresh. Does not commit.
+        """
+        from . import WorkoutPlan, WorkoutPlanExercise
+
+        if not exercise_ids:
+            return
+        db.session.execute(
+            delete(cls).where(
+                cls.user_id == user_id, cls.exercise_id.in_(exercise_ids)
+            )
+        )
+        statement = insert(cls).from_select(
+            ["user_id", "exercise_id", *STAT_FIELDS],
+            cls.aggregate(
+                WorkoutPlan.user_id == user_id,
+                WorkoutPlanExercise.exercise_id.in_(exercise_ids),
+            ),
+        )
+        db.session.execute(
+            statement.on_conflict_do_update(
+                index_elements=["user_id", "exercise_id"],
+                set_={field: statement.excluded[field] for field in STAT_FIELDS},
+            )
+        )
+
+    @classmethod
+    def rebuild(cls):
+        "Recompute every user's stats from scratch. Returns the row count. Does not commit."
+        db.session.execute(delete(cls))
+        result = db.session.execute(
+            insert(cls).from_select(
+                ["user_id", "exercise_id", *STAT_FIELDS], cls.aggregate()
+            )
+        )
+        return result.rowcount
+
+    @classmethod
+    def find_drift(cls):
+        """
+        Compare the stored stats with a full recomputation and return the
+        (user_id, exercise_id) pairs that differ, are missing or are stale.
+        """
+        expected = cls.aggregate().subquery()
+        user_id = func.coalesce(cls.user_id, expected.c.user_id)
+        exercise_id = func.coalesce(cls.exercise_id, expected.c.exercise_id)
+        differs = [
+            getattr(cls, field).is_distinct_from(expected.c[field])
+            for field in STAT_FIELDS
+            if field != "total_volume"
+        ]
+        # Running float sums drift from a recomputed sum by rounding error
+        differs.append(
+            or_(
+                cls.total_volume.is_(None),
+                expected.c.total_volume.is_(None),
+                func.abs(cls.total_volume - expected.c.total_volume) > 1e-6,
+            )
+        )
+        return db.session.execute(
+            select(user_id, exercise_id)
+            .select_from(cls.__table__)
+            .join(
+                expected,
+                (cls.user_id == expected.c.user_id)
+                & (cls.exercise_id == expected.c.exercise_id),
+                full=True,
+            )
+            .where(or_(*differs))
+            .order_by(user_id, exercise_id)
+        ).all()
@@ -1,9 +1,13 @@
-from sqlalchemy import func
+from sqlalchemy import func, select, update
 from . import db
 
 
 class WorkoutPlan(db.Model):
     __tablename__ = "workout_plans"
+    __table_args__ = (
+        # Every ownership check filters plans by user
+        db.Index("ix_workout_plans_user_id", "user_id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(
@@ -18,31 +22,78 @@ class WorkoutPlan(db.Model):
         onupdate=func.now(),
         nullable=True,
     )
+    # Bumped by every write to the plan or anything under it; cached
+    # reports are keyed on it
+    data_version = db.Column(db.Integer, nullable=False, default=1, server_default="1")
 
-    # Relationships
+    # Relationships. Children are removed by the ON DELETE CASCADE foreign
+    # keys, so deleting a plan never loads its history.
     workout_plan_exercises = db.relationship(
         "WorkoutPlanExercise",
         backref="workout_plan",
         lazy=True,
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     workout_sessions = db.relationship(
         "WorkoutSession",
         backref="workout_plan",
         lazy=True,
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
     def __repr__(self):
         return f"<WorkoutPlan {self.name}>"
 
     @classmethod
-    def get_user_workout_plan(cls, user_id, workout_plan_id=None):
-        "Get workout plan/all plans for a user."
-        query = db.session.query(cls).filter(cls.user_id == user_id)
+    def get_user_workout_plan(cls, user_id, workout_plan_id=None, options=()):
+        """
+        Get workout plan/all plans for a user. options are loader options
+        (e.g. selectinload) applied to the query.
+        """
+        query = db.session.query(cls).filter(cls.user_id == user_id).options(*options)
 
         if workout_plan_id is not None:
             query = query.filter(cls.id == workout_plan_id)
             return query.one_or_none()
         else:
             return query.all()
+
+    @classmethod
+    def user_has_plans(cls, user_id):
+        "Check whether a user has any workout plans."
+        return db.session.query(
+            db.session.query(cls.id).filter(cls.user_id == user_id).exists()
+        ).scalar()
+
+    @classmethod
+    def get_data_version(cls, user_id, workout_plan_id, *columns):
+        """
+        Get (id, name, data_version, *columns) of a user's plan, or None.
+        columns are read in the same query, e.g. other cache versions.
+        """
+        return db.session.execute(
+            select(cls.id, cls.name, cls.data_version, *columns).where(
+                cls.id == workout_plan_id, cls.user_id == user_id
+            )
+        ).one_or_none()
+
+    @classmethod
+    def bump_data_version(cls, ids):
+        """
+        Mark plans' exercises, sessions or session exercises as changed in
+        one statement. Does not commit.
+        """
+        if not ids:
+            return
+        db.session.execute(
+            update(cls)
+            .where(cls.id.in_(ids))
+            # updated_at tracks edits to the plan itself, so leave it alone
+            .values(
+                data_version=cls.data_version + 1,
+                updated_at=cls.updated_at,
+            ),
+            execution_options={"synchronize_session": False},
+        )
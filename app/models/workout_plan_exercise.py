@@ -1,8 +1,22 @@
+from sqlalchemy.dialects.postgresql import insert
+
 from . import db
 
+TARGET_DEFAULTS = {"target_sets": 1, "target_reps": 1, "target_weight": 1.0}
+
 
 class WorkoutPlanExercise(db.Model):
     __tablename__ = "workout_plan_exercises"
+    __table_args__ = (
+        # An exercise appears in a plan at most once; upserts key on this
+        db.UniqueConstraint(
+            "workout_plan_id",
+            "exercise_id",
+            name="uq_workout_plan_exercises_plan_exercise",
+        ),
+        # Exercise deletes cascade through here
+        db.Index("ix_workout_plan_exercises_exercise_id", "exercise_id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     workout_plan_id = db.Column(
@@ -23,6 +37,7 @@ class WorkoutPlanExercise(db.Model):
         "SessionExercise",
         back_populates="workout_plan_exercise",
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
     def __repr__(self):
@@ -45,3 +60,50 @@ class WorkoutPlanExercise(db.Model):
             .filter(cls.id == id, cls.workout_plan_id == workout_plan_id)
             .one_or_none()
         )
+
+    @classmethod
+    def get_ids_in_workout(cls, ids, workout_plan_id):
+        "Get the subset of ids that are workout plan exercises of workout_plan_id."
+        if not ids:
+            return set()
+        return set(
+            db.session.scalars(
+                db.select(cls.id).where(
+                    cls.id.in_(ids), cls.workout_plan_id == workout_plan_id
+                )
+            )
+        )
+
+    @classmethod
+    def upsert_for_plan(cls, workout_plan_id, targets):
+        """
+        Add or update a plan's exercises in bulk. targets maps exercise_id to
+        the target fields that were sent; new plan exercises get defaults for
+        the rest and existing ones keep their other values. Issues one
+        statement per distinct set of sent fields. Returns the ids of the
+        plan exercises inserted or updated.
+        """
+        groups = {}
+        ids = []
+        for exercise_id, values in targets.items():
+            row = {
+                "workout_plan_id": workout_plan_id,
+                "exercise_id": exercise_id,
+                **TARGET_DEFAULTS,
+                **values,
+            }
+            groups.setdefault(tuple(sorted(values)), []).append(row)
+
+        for fields, rows in groups.items():
+            statement = insert(cls)
+            if fields:
+                statement = statement.on_conflict_do_update(
+                    constraint="uq_workout_plan_exercises_plan_exercise",
+                    set_={field: statement.excluded[field] for field in fields},
+                )
+            else:
+                statement = statement.on_conflict_do_nothing(
+                    constraint="uq_workout_plan_exercises_plan_exercise"
+                )
+            ids.extend(db.session.scalars(statement.returning(cls.id), rows))
+        return ids
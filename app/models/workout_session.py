@@ -1,8 +1,31 @@
+from sqlalchemy import (
+    and_,
+    column,
+    delete,
+    insert,
+    literal,
+    or_,
+    select,
+    text,
+    true,
+    tuple_,
+    values,
+)
+
 from . import db
 
 
 class WorkoutSession(db.Model):
     __tablename__ = "workout_sessions"
+    __table_args__ = (
+        # Session history walks each plan's sessions newest first
+        db.Index(
+            "ix_workout_sessions_plan_id_scheduled_at",
+            "workout_plan_id",
+            text("scheduled_at DESC NULLS LAST"),
+            text("id DESC"),
+        ).ddl_if(dialect="postgresql"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     workout_plan_id = db.Column(
@@ -19,6 +42,7 @@ class WorkoutSession(db.Model):
         "SessionExercise",
         back_populates="workout_session",
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
     def __repr__(self):
@@ -29,8 +53,13 @@ class WorkoutSession(db.Model):
         return db.session.query(self).filter(self.id == id).one_or_none()
 
     @classmethod
-    def get_session_for_user_plan(cls, user_id, workout_plan_id, session_id):
-        "Get workout session for specific workout plan and user."
+    def get_session_for_user_plan(
+        cls, user_id, workout_plan_id, session_id, options=()
+    ):
+        """
+        Get workout session for specific workout plan and user. options are
+        loader options (e.g. selectinload) applied to the query.
+        """
         from . import WorkoutPlan
 
         return (
@@ -41,5 +70,177 @@ class WorkoutSession(db.Model):
                 cls.workout_plan_id == workout_plan_id,
                 WorkoutPlan.user_id == user_id,
             )
+            .options(*options)
             .one_or_none()
         )
+
+    @classmethod
+    def newest_first(cls):
+        "Session history order: newest scheduled_at first, unscheduled last."
+        return (cls.scheduled_at.desc().nulls_last(), cls.id.desc())
+
+    @classmethod
+    def after_cursor(cls, after):
+        "Filter for sessions after the (scheduled_at, id) pair in newest_first order."
+        scheduled_at, id = after
+        if scheduled_at is None:
+            return and_(cls.scheduled_at.is_(None), cls.id < id)
+        return or_(
+            tuple_(cls.scheduled_at, cls.id) < (scheduled_at, id),
+            cls.scheduled_at.is_(None),
+        )
+
+    @classmethod
+    def get_page_for_user(
+        cls, user_id, limit, scheduled_from=None, scheduled_to=None, after=None
+    ):
+        """
+        Get up to limit + 1 of a user's sessions with their plan name in one
+        query, newest scheduled_at first (unscheduled last, ties by id), starting
+        after the (scheduled_at, id) pair in after. The extra row tells the
+        caller whether there is a next page.
+        """
+        from . import WorkoutPlan
+
+        # Take the first page of every plan from its index and merge those,
+        # rather than sorting the user's whole history.
+        sessions = (
+            select(
+                cls.id,
+                cls.workout_plan_id,
+                cls.scheduled_at,
+                cls.started_at,
+                cls.completed_at,
+            )
+            .where(cls.workout_plan_id == WorkoutPlan.id)
+            .order_by(*cls.newest_first())
+            .limit(limit + 1)
+        )
+        if scheduled_from is not None:
+            sessions = sessions.where(cls.scheduled_at >= scheduled_from)
+        if scheduled_to is not None:
+            sessions = sessions.where(cls.scheduled_at <= scheduled_to)
+        if after is not None:
+            sessions = sessions.where(cls.after_cursor(after))
+        sessions = sessions.lateral()
+
+        return (
+            db.session.query(
+                sessions.c.id,
+                sessions.c.workout_plan_id,
+                WorkoutPlan.name.label("workout_name"),
+                sessions.c.scheduled_at,
+                sessions.c.started_at,
+                sessions.c.completed_at,
+            )
+            .select_from(WorkoutPlan)
+            .join(sessions, true())
+            .filter(WorkoutPlan.user_id == user_id)
+            .order_by(
+                sessions.c.scheduled_at.desc().nulls_last(), sessions.c.id.desc()
+            )
+            .limit(limit + 1)
+            .all()
+        )
+
+    @classmethod
+    def get_scheduled_at(cls, workout_plan_id, dates):
+        "Get which of dates already have a session of the plan scheduled at them."
+        if not dates:
+            return set()
+        return set(
+            db.session.scalars(
+                select(cls.scheduled_at).where(
+                    cls.workout_plan_id == workout_plan_id,
+                    cls.scheduled_at.in_(dates),
+                )
+            )
+        )
+
+    @classmethod
+    def schedule(cls, workout_plan_id, dates):
+        """
+        Create an empty session of the plan at each of dates that does not
+        have one yet, in one INSERT ... SELECT. Returns the (id, scheduled_at)
+        rows created, by date.
+        Locks the plan row first, so concurrent runs of the same schedule
+        cannot both insert a date. Does not commit.
+        """
+        from . import WorkoutPlan
+
+        if not dates:
+            return []
+        db.session.execute(
+            select(WorkoutPlan.id)
+            .where(WorkoutPlan.id == workout_plan_id)
+            .with_for_update()
+        )
+        occurrences = values(
+            column("scheduled_at", db.DateTime), name="occurrences"
+        ).data([(date,) for date in dates])
+        taken = (
+            select(cls.id)
+            .where(
+                cls.workout_plan_id == workout_plan_id,
+                cls.scheduled_at == occurrences.c.scheduled_at,
+            )
+            .exists()
+        )
+        created = db.session.execute(
+            insert(cls)
+            .from_select(
+                ["workout_plan_id", "scheduled_at"],
+                select(literal(workout_plan_id), occurrences.c.scheduled_at).where(
+                    ~taken
+                ),
+            )
+            .returning(cls.id, cls.scheduled_at)
+        )
+        return sorted(created, key=lambda row: row.scheduled_at)
+
+    @classmethod
+    def delete_for_user(
+        cls,
+        user_id,
+        ids=None,
+        scheduled_from=None,
+        scheduled_to=None,
+        workout_plan_id=None,
+    ):
+        """
+        Delete a user's sessions matching all given filters in one statement;
+        session exercises go with them through ON DELETE CASCADE, the user's
+        stats for the exercises they logged are recomputed, the data version
+        of every plan that lost sessions is bumped and the deletes are added
+        to the change log. Returns the number of sessions deleted. Does not
+        commit.
+        """
+        from . import ChangeLog, UserExerciseStats, WorkoutPlan
+
+        conditions = [
+            cls.workout_plan_id.in_(
+                select(WorkoutPlan.id).where(WorkoutPlan.user_id == user_id)
+            )
+        ]
+        if ids is not None:
+            conditions.append(cls.id.in_(ids))
+        if workout_plan_id is not None:
+            conditions.append(cls.workout_plan_id == workout_plan_id)
+        if scheduled_from is not None:
+            conditions.append(cls.scheduled_at >= scheduled_from)
+        if scheduled_to is not None:
+            conditions.append(cls.scheduled_at <= scheduled_to)
+
+        exercise_ids = UserExerciseStats.exercise_ids(*conditions)
+        deleted = db.session.execute(
+            delete(cls)
+            .where(*conditions)
+            .returning(cls.id, cls.workout_plan_id),
+            execution_options={"synchronize_session": False},
+        ).all()
+        UserExerciseStats.refresh(user_id, exercise_ids)
+        WorkoutPlan.bump_data_version({row.workout_plan_id for row in deleted})
+        ChangeLog.record(
+            user_id, deleted=True, workout_session=[row.id for row in deleted]
+        )
+        return len(deleted)
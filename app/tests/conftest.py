@@ -1,7 +1,15 @@
 import pytest
 from app import create_app, db
 from ..config_test import TestConfig
-from sqlalchemy.orm import scoped_session, sessionmaker
+from app.models.db import CommitHoldingMixin
+from sqlalchemy.orm import Session, scoped_session, sessionmaker
+from app.utils.exercise_catalog import exercise_catalog
+from app.utils.identity_cache import identity_cache
+from app.utils.workout_report import report_cache, report_flight
+
+class TestSession(CommitHoldingMixin, Session):
+    "The app's session behaviour, bound to the test's connection."
+
 
 @pytest.fixture(scope="session")
 def app():
@@ -17,7 +25,7 @@ def session(app):
     connection = db.engine.connect()
     transaction = connection.begin()
 
-    session_factory = sessionmaker(bind=connection)
+    session_factory = sessionmaker(bind=connection, class_=TestSession)
     scoped_sess = scoped_session(session_factory)
 
     db.session = scoped_sess
@@ -25,10 +33,22 @@ def session(app):
     yield scoped_sess
 
     scoped_sess.remove()   
-    transaction.rollback()
+    # committed_data rolls back early to release its locks
+    if transaction.is_active:
+        transaction.rollback()
     connection.close()
 
 
+@pytest.fixture(scope="function", autouse=True)
+def reset_caches():
+    """In-process caches outlive the rolled back transaction, so start empty."""
+    identity_cache.clear()
+    exercise_catalog.clear()
+    report_cache.clear()
+    report_flight.clear()
+    yield
+
+
 @pytest.fixture
 def seed_data(session):
     """Populate the database. Session is now per-test and rolls back."""
@@ -141,3 +161,69 @@ def seed_data(session):
     }
 
 
+
+
+@pytest.fixture
+def committed_data(session):
+    """
+    A user with a plan and one logged session committed outside the test's
+    transaction, for tests that race a second connection against it.
+    Deleted again afterwards; everything else goes with the user and the
+    exercise through ON DELETE CASCADE.
+    """
+    from datetime import datetime
+    from sqlalchemy import delete
+    from ..models import (
+        Exercise,
+        SessionExercise,
+        User,
+        WorkoutPlan,
+        WorkoutPlanExercise,
+        WorkoutSession,
+    )
+
+    other = sessionmaker(bind=db.engine)()
+    user = User(
+        name="Committed",
+        surname="User",
+        email="committed@example.com",
+        password_hash="fakehashedpassword",
+    )
+    exercise = Exercise(name="Committed Row")
+    other.add_all([user, exercise])
+    other.flush()
+    plan = WorkoutPlan(name="Committed Plan", user_id=user.id)
+    other.add(plan)
+    other.flush()
+    plan_exercise = WorkoutPlanExercise(workout_plan_id=plan.id, exercise_id=exercise.id)
+    workout_session = WorkoutSession(
+        workout_plan_id=plan.id, completed_at=datetime(2024, 1, 1, 9)
+    )
+    other.add_all([plan_exercise, workout_session])
+    other.flush()
+    other.add(
+        SessionExercise(
+            workout_session_id=workout_session.id,
+            workout_plan_exercise_id=plan_exercise.id,
+            actual_sets=3,
+            actual_reps=10,
+            actual_weight=50.0,
+        )
+    )
+    other.commit()
+    data = {
+        "user_id": user.id,
+        "exercise_id": exercise.id,
+        "workout_plan_id": plan.id,
+        "workout_plan_exercise_id": plan_exercise.id,
+        "workout_session_id": workout_session.id,
+    }
+
+    yield data
+
+    # Release the test transaction's row locks before deleting
+    session.rollback()
+    other.execute(delete(User).where(User.id == data["user_id"]))
+    other.execute(delete(Exercise).where(Exercise.id == data["exercise_id"]))
+    other.commit()
+    other.close()
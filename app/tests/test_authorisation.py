@@ -0,0 +1,88 @@
+from sqlalchemy import event
+
+from app import db
+from app.models import User
+from app.utils.caching import TTLCache
+from app.utils.identity_cache import UserIdentity, identity_cache
+
+from .utils.test_utilities import create_jwt_token
+
+
+def count_user_lookups(app, client, url):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        if "FROM users" in statement:
+            statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        response = client.get(url)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+    return response, len(statements)
+
+
+def test_cached_token_skips_user_lookup(client, seed_data, app):
+    user = seed_data["plan_user"]
+    token = create_jwt_token(user.id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+
+    response, lookups = count_user_lookups(app, client, "/api/workout-plans")
+    assert response.status_code == 200
+    assert lookups == 1
+
+    response, lookups = count_user_lookups(app, client, "/api/workout-plans")
+    assert response.status_code == 200
+    assert lookups == 0
+
+    stats = identity_cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert identity_cache.get(token) == UserIdentity(user.id, user.email, user.name)
+
+
+def test_user_update_invalidates_cached_identity(client, seed_data, app, session):
+    user = seed_data["plan_user"]
+    token = create_jwt_token(user.id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+
+    assert client.get("/api/workout-plans").status_code == 200
+    assert len(identity_cache) == 1
+
+    session.get(User, user.id).name = "Renamed"
+    session.commit()
+    assert len(identity_cache) == 0
+
+
+def test_deleted_user_token_rejected(client, seed_data, app, session):
+    user = seed_data["no_plan_user"]
+    token = create_jwt_token(user.id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+
+    assert client.get("/api/workout-plans").status_code == 200
+
+    session.delete(session.get(User, user.id))
+    session.commit()
+
+    response = client.get("/api/workout-plans")
+    assert response.status_code == 401
+    assert response.get_json()["message"] == "User not found"
+
+
+def test_ttl_cache_expiry_and_eviction():
+    now = [0.0]
+    cache = TTLCache(maxsize=2, ttl=10, clock=lambda: now[0])
+
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=5)
+    assert cache.get("a") == 1
+
+    now[0] = 6
+    assert cache.get("b") is None
+
+    cache.set("c", 3)
+    cache.set("d", 4)
+    assert cache.get("a") is None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["misses"] == 2
@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+from app.models import CacheVersion
+from app.utils.exercise_catalog import CATALOG_CACHE
+from app.utils.exercise_loader import load_exercises, read_catalog
+from ..models import Exercise
+
+
+def catalog_rows(count, description="Loaded"):
+    return [
+        {
+            "name": f"Loaded {i}",
+            "description": description,
+            "category": "Strength",
+            "muscle_group": "Back",
+        }
+        for i in range(count)
+    ]
+
+
+def test_load_exercises_is_idempotent(session):
+    version = CacheVersion.get(CATALOG_CACHE)
+    result = load_exercises(catalog_rows(25), batch_size=10)
+    assert (result.inserted, result.updated, result.skipped) == (25, 0, 0)
+    # Running servers see the load at their next version check
+    assert CacheVersion.get(CATALOG_CACHE) == version + 1
+
+    result = load_exercises(catalog_rows(25), batch_size=10)
+    assert (result.inserted, result.updated, result.skipped) == (0, 0, 25)
+    assert CacheVersion.get(CATALOG_CACHE) == version + 1
+
+    assert session.query(Exercise).filter(Exercise.name.like("Loaded %")).count() == 25
+
+
+def test_load_exercises_updates_changed_rows(session):
+    load_exercises(catalog_rows(5))
+
+    rows = catalog_rows(6)
+    rows[2]["description"] = "Changed"
+    result = load_exercises(rows)
+    assert (result.inserted, result.updated, result.skipped) == (1, 1, 4)
+
+    exercise = session.query(Exercise).filter_by(name="Loaded 2").one()
+    assert exercise.description == "Changed"
+
+
+def test_read_catalog_csv_and_json(tmp_path):
+    csv_path = tmp_path / "catalog.csv"
+    csv_path.write_text(
+        "name,description,category,muscle_group\n"
+        "Row,Cable row,Strength,Back\n"
+        "Plank,,Core,Abdominals\n"
+    )
+    exercises = read_catalog(str(csv_path))
+    assert [e["name"] for e in exercises] == ["Row", "Plank"]
+    assert exercises[1]["description"] is None
+
+    json_path = tmp_path / "catalog.json"
+    json_path.write_text(json.dumps([{"name": "Row", "category": "Strength"}]))
+    assert read_catalog(str(json_path))[0]["muscle_group"] is None
+
+    bad_path = tmp_path / "catalog.json"
+    bad_path.write_text(json.dumps([{"description": "No name"}]))
+    with pytest.raises(ValueError):
+        read_catalog(str(bad_path))
+
+
+def test_load_exercises_command(app, session, tmp_path):
+    path = tmp_path / "catalog.json"
+    path.write_text(json.dumps(catalog_rows(3)))
+
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=["load-exercises", str(path)])
+    assert result.exit_code == 0
+    assert "3 inserted, 0 updated, 0 skipped" in result.output
+
+    result = runner.invoke(args=["load-exercises", str(path)])
+    assert "0 inserted, 0 updated, 3 skipped" in result.output
@@ -0,0 +1,177 @@
+from datetime import datetime
+
+from sqlalchemy import event, insert
+
+from app.models import UserExerciseStats, db
+from .test_utils import create_jwt_token
+from .utils.test_utilities import assert_max_queries
+
+
+def login(client, app, user):
+    token = create_jwt_token(user.id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+
+
+def stats_by_name(client):
+    response = client.get("/api/stats/exercises")
+    assert response.status_code == 200
+    return {row["exercise_name"]: row for row in response.get_json()}
+
+
+def log_push_ups(client, seed_data, weight):
+    plan = seed_data["workout_plan"]
+    push_up = next(
+        wp_ex for wp_ex in seed_data["plan_exercises"] if wp_ex.exercise.name == "Push-Up"
+    )
+    response = client.post(
+        f"/api/workout-sessions/{plan.id}",
+        json={
+            "scheduled_at": "2024-02-01T08:00:00",
+            "completed_at": "2024-02-01T09:00:00",
+            "exercises": [
+                {
+                    "workout_plan_exercise_id": push_up.id,
+                    "actual_sets": 4,
+                    "actual_reps": 10,
+                    "actual_weight": weight,
+                }
+            ],
+        },
+    )
+    assert response.status_code == 200
+    return response.get_json()["workout_session_id"], push_up.id
+
+
+def test_stats_follow_session_writes(client, seed_data, app, session):
+    UserExerciseStats.rebuild()
+    session.commit()
+    plan = seed_data["workout_plan"]
+    login(client, app, seed_data["plan_user"])
+
+    before = stats_by_name(client)
+    assert before["Push-Up"]["total_sets"] == 3
+    assert before["Push-Up"]["total_reps"] == 36
+    assert before["Push-Up"]["session_count"] == 1
+
+    session_id, push_up_id = log_push_ups(client, seed_data, 20.0)
+    stats = stats_by_name(client)["Push-Up"]
+    assert stats["total_sets"] == 7
+    assert stats["total_reps"] == 76
+    assert stats["total_volume"] == 800.0
+    assert stats["max_weight"] == 20.0
+    assert stats["session_count"] == 2
+    # The seeded session was completed after this one
+    assert stats["last_performed_at"] == before["Push-Up"]["last_performed_at"]
+    assert stats_by_name(client)["Squat"] == before["Squat"]
+    assert UserExerciseStats.find_drift() == []
+
+    response = client.patch(
+        f"/api/workout-sessions/{plan.id}/{session_id}",
+        json={
+            "exercises": [{"workout_plan_exercise_id": push_up_id, "actual_weight": 10}]
+        },
+    )
+    assert response.status_code == 200
+    stats = stats_by_name(client)["Push-Up"]
+    assert (stats["total_volume"], stats["max_weight"]) == (400.0, 10.0)
+    assert UserExerciseStats.find_drift() == []
+
+    response = client.delete(f"/api/workout-sessions/{plan.id}/{session_id}")
+    assert response.status_code == 200
+    assert stats_by_name(client) == before
+    assert UserExerciseStats.find_drift() == []
+
+
+def test_stats_follow_bulk_and_plan_deletes(client, seed_data, app, session):
+    UserExerciseStats.rebuild()
+    session.commit()
+    plan_id = seed_data["workout_plan"].id
+    login(client, app, seed_data["plan_user"])
+    log_push_ups(client, seed_data, 20.0)
+
+    response = client.delete("/api/workout-sessions", json={"to": "2024-12-31"})
+    assert response.status_code == 200
+    assert stats_by_name(client)["Push-Up"]["session_count"] == 1
+    assert UserExerciseStats.find_drift() == []
+
+    response = client.delete(f"/api/workout-plans/{plan_id}")
+    assert response.status_code == 200
+    assert stats_by_name(client) == {}
+    assert UserExerciseStats.find_drift() == []
+
+
+def test_get_exercise_stats(client, seed_data, app, session):
+    UserExerciseStats.rebuild()
+    session.commit()
+    exercise_id = seed_data["plan_exercises"][0].exercise_id
+    login(client, app, seed_data["plan_user"])
+    client.get("/api/workout-plans")
+
+    # One primary key lookup joined to the exercise name
+    with assert_max_queries(1):
+        response = client.get(f"/api/stats/exercises/{exercise_id}")
+    assert response.status_code == 200
+    assert response.get_json()["exercise_id"] == exercise_id
+
+    response = client.get("/api/stats/exercises/999999")
+    assert response.status_code == 404
+
+    login(client, app, seed_data["no_plan_user"])
+    response = client.get(f"/api/stats/exercises/{exercise_id}")
+    assert response.status_code == 404
+
+
+def test_check_and_rebuild_commands(app, seed_data, session):
+    user_id = seed_data["plan_user"].id
+    runner = app.test_cli_runner()
+
+    # The seeded history was inserted without going through the views
+    result = runner.invoke(args=["check-exercise-stats"])
+    assert result.exit_code == 1
+    assert f"user {user_id}, exercise" in result.output
+
+    result = runner.invoke(args=["rebuild-exercise-stats"])
+    assert result.exit_code == 0
+    assert "2 rows" in result.output
+
+    result = runner.invoke(args=["check-exercise-stats"])
+    assert result.exit_code == 0
+    assert "consistent" in result.output
+
+    stats = session.query(UserExerciseStats).filter_by(user_id=user_id).first()
+    stats.last_performed_at = datetime(2000, 1, 1)
+    session.commit()
+    result = runner.invoke(args=["check-exercise-stats"])
+    assert result.exit_code == 1
+    assert f"user {user_id}, exercise {stats.exercise_id}" in result.output
+
+
+def test_refresh_survives_concurrent_add_session(committed_data, session):
+    user_id = committed_data["user_id"]
+    exercise_id = committed_data["exercise_id"]
+
+    added = []
+
+    # Another request adds the same (user, exercise) row between the
+    # refresh's DELETE and its INSERT
+    def add_concurrently(conn, clauseelement, *args):
+        statement = str(clauseelement)
+        if added or not statement.startswith("DELETE FROM user_exercise_stats"):
+            return
+        added.append(True)
+        with db.engine.begin() as other:
+            other.execute(
+                insert(UserExerciseStats).values(
+                    user_id=user_id, exercise_id=exercise_id, total_sets=99
+                )
+            )
+
+    event.listen(db.engine, "after_execute", add_concurrently)
+    try:
+        UserExerciseStats.refresh(user_id, [exercise_id])
+    finally:
+        event.remove(db.engine, "after_execute", add_concurrently)
+    assert added
+
+    stats = session.get(UserExerciseStats, (user_id, exercise_id))
+    assert (stats.total_sets, stats.total_reps, stats.session_count) == (3, 30, 1)
@@ -1,5 +1,13 @@
 import json
 
+from sqlalchemy import event, insert, inspect
+
+from app import create_app, db
+from app.models import CacheVersion, Exercise, User
+from app.utils.exercise_catalog import CATALOG_CACHE, exercise_catalog
+from app.utils.exercise_search import has_trigram_support, search_backend
+from app.utils.pagination import encode_cursor
+from ..config_test import TestConfig
 from .utils.test_utilities import create_jwt_token
 
 
@@ -22,6 +30,11 @@ def test_list_exercises(client, seed_data, app):
         assert "id" in data[0]
         assert "name" in data[0]
         assert "category" in data[0]
+        assert "muscle_group" in data[0]
+
+        # Filtered pages serialize each exercise the same way
+        filtered = client.get(f"/api/exercises?name={data[0]['name']}").get_json()
+        assert filtered[0] == data[0]
 
 
 def test_get_exercise(client, seed_data, app):
@@ -71,3 +84,239 @@ def test_token_missing(client):
     assert response.status_code == 401
     data = json.loads(response.data)
     assert data["message"] == "Token is missing!"
+
+
+def test_list_exercises_conditional_get(client, seed_data, app):
+    """A matching If-None-Match is answered with 304 and no body."""
+    token = create_jwt_token(seed_data["plan_user"].id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+
+    response = client.get("/api/exercises")
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    assert not etag.startswith("W/")
+
+    response = client.get("/api/exercises", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""
+
+    exercise = seed_data["exercises"][0]
+    response = client.get(f"/api/exercises/{exercise.id}")
+    detail_etag = response.headers["ETag"]
+    response = client.get(
+        f"/api/exercises/{exercise.id}", headers={"If-None-Match": detail_etag}
+    )
+    assert response.status_code == 304
+
+
+def test_exercise_catalog_served_from_snapshot(client, seed_data, app, session):
+    """Only the first read loads the catalog; writes bump the version."""
+    token = create_jwt_token(seed_data["plan_user"].id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        if "FROM exercises" in statement:
+            statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        first = client.get("/api/exercises")
+        client.get("/api/exercises")
+        client.get(f"/api/exercises/{seed_data['exercises'][0].id}")
+        assert len(statements) == 1
+
+        session.add(Exercise(name="Row", category="Strength", muscle_group="Back"))
+        session.commit()
+
+        second = client.get("/api/exercises")
+        assert len(statements) == 2
+    finally:
+        event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+
+    assert first.headers["ETag"] != second.headers["ETag"]
+    assert "Row" in [e["name"] for e in second.get_json()]
+
+
+def test_exercise_catalog_sees_other_processes_writes(
+    client, seed_data, app, session, monkeypatch
+):
+    """Writes from another process are picked up at the next version check."""
+    token = create_jwt_token(seed_data["plan_user"].id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+    monkeypatch.setattr(exercise_catalog, "check_interval", 60)
+    client.get("/api/exercises")
+
+    # What another worker or `flask load-exercises` commits: a Core write
+    # and the shared version bump, but no local bump_version()
+    session.execute(insert(Exercise).values(name="Deadlift"))
+    CacheVersion.bump(CATALOG_CACHE)
+    session.commit()
+
+    names = [e["name"] for e in client.get("/api/exercises").get_json()]
+    assert "Deadlift" not in names
+
+    monkeypatch.setattr(exercise_catalog, "check_interval", 0)
+    names = [e["name"] for e in client.get("/api/exercises").get_json()]
+    assert "Deadlift" in names
+
+
+def test_list_exercises_empty_catalog(client, session, app):
+    """An empty catalog is an empty list, not a 404."""
+    user = User(name="No", surname="Exercises", email="none@example.com", password_hash="x")
+    session.add(user)
+    session.commit()
+
+    client.set_cookie(key="jwt_token", value=create_jwt_token(user.id, app), domain="localhost")
+    response = client.get("/api/exercises")
+    assert response.status_code == 200
+    assert response.get_json() == []
+
+
+def test_list_exercises_filters(client, seed_data, app):
+    """category, muscle_group and name prefix narrow the listing."""
+    token = create_jwt_token(seed_data["plan_user"].id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+
+    response = client.get("/api/exercises?muscle_group=Legs")
+    assert response.status_code == 200
+    assert [e["name"] for e in response.get_json()] == ["Squat"]
+
+    response = client.get("/api/exercises?category=Strength&name=push")
+    assert [e["name"] for e in response.get_json()] == ["Push-Up"]
+
+    response = client.get("/api/exercises?category=Cardio")
+    assert response.get_json() == []
+
+
+def test_list_exercises_keyset_pagination(client, seed_data, app, session):
+    """Pages follow (name, id) order and the cursor is returned in a header."""
+    session.add_all(
+        [Exercise(name=f"Curl {i}", category="Strength") for i in range(5)]
+    )
+    session.commit()
+    token = create_jwt_token(seed_data["plan_user"].id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+
+    names = []
+    url = "/api/exercises?limit=3"
+    while True:
+        response = client.get(url)
+        assert response.status_code == 200
+        page = response.get_json()
+        assert len(page) <= 3
+        names.extend(e["name"] for e in page)
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        url = f"/api/exercises?limit=3&cursor={cursor}"
+
+    assert names == sorted(names)
+    assert len(names) == 7
+
+
+def test_list_exercises_invalid_pagination(client, seed_data, app):
+    token = create_jwt_token(seed_data["plan_user"].id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+
+    response = client.get("/api/exercises?limit=0&cursor=not-a-cursor")
+    assert response.status_code == 400
+    errors = response.get_json()["errors"]
+    assert "limit" in errors
+    assert "cursor" in errors
+
+    # Well-formed cursors with the wrong types never reach the query
+    for values in [["x", "y"], [1, 2], ["Squat", True], ["Squat", None]]:
+        response = client.get(f"/api/exercises?cursor={encode_cursor(values)}")
+        assert response.status_code == 400
+        assert "cursor" in response.get_json()["errors"]
+
+
+def test_search_exercises(client, seed_data, app, session):
+    """Search matches name and description prefixes, best match first."""
+    session.add_all(
+        [
+            Exercise(name="Bench Press", description="Barbell press on a bench"),
+            Exercise(name="Incline Press", description="Press on an incline bench"),
+        ]
+    )
+    session.commit()
+    token = create_jwt_token(seed_data["plan_user"].id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+
+    response = client.get("/api/exercises/search?q=bench")
+    assert response.status_code == 200
+    assert [e["name"] for e in response.get_json()] == ["Bench Press", "Incline Press"]
+
+    response = client.get("/api/exercises/search?q=squ")
+    assert [e["name"] for e in response.get_json()] == ["Squat"]
+
+    response = client.get("/api/exercises/search?q=press&limit=1")
+    assert len(response.get_json()) == 1
+
+
+def test_search_exercises_memory_backend(client, seed_data, app, session, monkeypatch):
+    """The in-memory index ranks name matches first and tolerates typos."""
+    monkeypatch.setitem(app.config, "EXERCISE_SEARCH_BACKEND", "memory")
+    session.add_all(
+        [
+            Exercise(name="Bench Press", description="Barbell press on a bench"),
+            Exercise(name="Incline Press", description="Press on an incline bench"),
+        ]
+    )
+    session.commit()
+    token = create_jwt_token(seed_data["plan_user"].id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+
+    response = client.get("/api/exercises/search?q=bench")
+    assert [e["name"] for e in response.get_json()] == ["Bench Press", "Incline Press"]
+
+    response = client.get("/api/exercises/search?q=sqat")
+    assert [e["name"] for e in response.get_json()] == ["Squat"]
+
+    response = client.get("/api/exercises/search?q=bodyweight push")
+    assert [e["name"] for e in response.get_json()] == ["Push-Up"]
+
+    response = client.get("/api/exercises/search?q=deadlift")
+    assert response.get_json() == []
+
+
+def test_search_schema_without_postgres():
+    """Other databases get the schema minus the full-text DDL, and search
+    falls back to the in-memory index."""
+
+    class SQLiteConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = "sqlite://"
+
+    sqlite_app = create_app(config_class=SQLiteConfig)
+    with sqlite_app.app_context():
+        db.create_all()
+        with db.engine.begin() as connection:
+            connection.execute(
+                insert(Exercise), {"name": "Bench Press", "description": "Chest"}
+            )
+            row = connection.execute(Exercise.__table__.select()).one()
+        assert row.name == "Bench Press"
+
+        indexes = inspect(db.engine).get_indexes("exercises")
+        assert "ix_exercises_search_vector" not in {index["name"] for index in indexes}
+        assert search_backend() == "memory"
+
+
+def test_search_schema_trigram_index(app):
+    """create_all builds the fuzzy-search index wherever pg_trgm exists, as
+    the migrations do."""
+    with app.app_context():
+        indexes = {index["name"] for index in inspect(db.engine).get_indexes("exercises")}
+        assert "ix_exercises_search_vector" in indexes
+        assert ("ix_exercises_lower_name_trgm" in indexes) == has_trigram_support()
+
+
+def test_search_exercises_requires_query(client, seed_data, app):
+    token = create_jwt_token(seed_data["plan_user"].id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+
+    response = client.get("/api/exercises/search?q=%20")
+    assert response.status_code == 400
+    assert "q" in response.get_json()["errors"]
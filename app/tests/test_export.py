@@ -0,0 +1,112 @@
+import csv
+import io
+import json
+import os
+from datetime import datetime
+
+from sqlalchemy import text
+
+from ..models import WorkoutSession
+from .test_utils import create_jwt_token
+
+
+def login(client, app, user):
+    token = create_jwt_token(user.id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+
+
+def rss_bytes():
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def test_export_sessions_ndjson(client, seed_data, app, session):
+    plan = seed_data["workout_plan"]
+    # Sessions without exercises are exported too, newest first per plan
+    session.add(WorkoutSession(workout_plan_id=plan.id, scheduled_at=datetime(2024, 1, 1)))
+    session.commit()
+    login(client, app, seed_data["plan_user"])
+
+    response = client.get("/api/export/sessions")
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    assert "workout-sessions.ndjson" in response.headers["Content-Disposition"]
+    logged, empty = [json.loads(line) for line in response.data.splitlines()]
+    assert logged["workout_session_id"] == seed_data["workout_session"].id
+    assert logged["workout_plan_name"] == plan.name
+    assert [exercise["exercise_name"] for exercise in logged["exercises"]] == [
+        "Push-Up",
+        "Squat",
+    ]
+    assert logged["exercises"][0]["notes"] == "Felt strong"
+    assert empty["scheduled_at"] == "2024-01-01T00:00:00"
+    assert empty["completed_at"] is None
+    assert empty["exercises"] == []
+
+
+def test_export_sessions_csv(client, seed_data, app):
+    login(client, app, seed_data["plan_user"])
+
+    response = client.get("/api/export/sessions?format=csv")
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/csv"
+    header, *rows = csv.reader(io.StringIO(response.get_data(as_text=True)))
+    assert header[:2] == ["workout_session_id", "workout_plan_id"]
+    assert len(rows) == 2
+    records = [dict(zip(header, row)) for row in rows]
+    assert [record["exercise_name"] for record in records] == ["Push-Up", "Squat"]
+    assert records[1]["actual_sets"] == "4"
+
+    login(client, app, seed_data["no_plan_user"])
+    response = client.get("/api/export/sessions?format=csv")
+    assert response.get_data(as_text=True).splitlines() == [",".join(header)]
+
+
+def test_export_sessions_invalid_format(client, seed_data, app):
+    login(client, app, seed_data["plan_user"])
+
+    response = client.get("/api/export/sessions?format=xml")
+
+    assert response.status_code == 400
+    assert "format" in response.get_json()["errors"]
+
+
+def test_export_large_history_streams(client, seed_data, app, session):
+    plan = seed_data["workout_plan"]
+    # 100,000 sessions x 2 exercises on top of the seeded session
+    session.execute(
+        text(
+            """
+            WITH sessions AS (
+                INSERT INTO workout_sessions (workout_plan_id, scheduled_at, completed_at)
+                SELECT :plan_id, timestamp '2000-01-01' + g * interval '1 hour',
+                       timestamp '2000-01-01' + g * interval '1 hour' + interval '50 minutes'
+                FROM generate_series(1, 100000) AS g
+                RETURNING id
+            )
+            INSERT INTO session_exercises
+                (workout_session_id, workout_plan_exercise_id, actual_sets,
+                 actual_reps, actual_weight)
+            SELECT sessions.id, wpe.id, 3, 10, 42.5
+            FROM sessions CROSS JOIN workout_plan_exercises AS wpe
+            WHERE wpe.workout_plan_id = :plan_id
+            """
+        ),
+        {"plan_id": plan.id},
+    )
+    session.commit()
+    login(client, app, seed_data["plan_user"])
+
+    baseline = peak = rss_bytes()
+    response = client.get("/api/export/sessions?format=csv", buffered=False)
+    lines = 0
+    for chunk in response.response:
+        lines += chunk.count(b"\n")
+        peak = max(peak, rss_bytes())
+    response.close()
+
+    # The header and 200,002 rows went out without holding them in memory
+    assert lines == 200003
+    assert peak - baseline < 32 * 2**20
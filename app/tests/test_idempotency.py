@@ -0,0 +1,183 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models import IdempotencyKey, WorkoutPlan, WorkoutSession
+from app.utils.idempotency import request_fingerprint
+from .test_utils import create_jwt_token
+from .utils.test_utilities import assert_max_queries
+
+SESSION = {"scheduled_at": "2024-04-01T07:00:00", "exercises": []}
+
+
+def login(client, app, user):
+    token = create_jwt_token(user.id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+
+
+def count_sessions(plan_id):
+    return WorkoutSession.query.filter_by(workout_plan_id=plan_id).count()
+
+
+def test_retry_replays_stored_response(client, seed_data, app):
+    plan_id = seed_data["workout_plan"].id
+    login(client, app, seed_data["plan_user"])
+    url = f"/api/workout-sessions/{plan_id}"
+    headers = {"Idempotency-Key": "retry-1"}
+
+    first = client.post(url, json=SESSION, headers=headers)
+    assert first.status_code == 200
+    assert "Idempotent-Replayed" not in first.headers
+
+    # One primary key lookup; the handler does not run again
+    with assert_max_queries(1):
+        retry = client.post(url, json=SESSION, headers=headers)
+    assert retry.status_code == 200
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.get_json() == first.get_json()
+    assert count_sessions(plan_id) == 2
+
+    # Without a key, or with a new one, the request runs as usual
+    client.post(url, json=SESSION)
+    client.post(url, json=SESSION, headers={"Idempotency-Key": "retry-2"})
+    assert count_sessions(plan_id) == 4
+
+
+def test_key_reused_for_another_request(client, seed_data, app):
+    plan_id = seed_data["workout_plan"].id
+    login(client, app, seed_data["plan_user"])
+    headers = {"Idempotency-Key": "reused"}
+
+    client.post("/api/workout-plans", json={"name": "Push"}, headers=headers)
+    response = client.post("/api/workout-plans", json={"name": "Pull"}, headers=headers)
+    assert response.status_code == 422
+
+    # Keys belong to a user
+    login(client, app, seed_data["no_plan_user"])
+    response = client.post("/api/workout-plans", json={"name": "Pull"}, headers=headers)
+    assert response.status_code != 422
+    names = {plan.name for plan in WorkoutPlan.query.all()}
+    assert {"Push", "Pull"} <= names
+    response = client.post(
+        f"/api/workout-sessions/{plan_id}",
+        json=SESSION,
+        headers={"Idempotency-Key": ""},
+    )
+    assert response.status_code == 400
+
+
+def test_key_in_progress_and_expired(client, seed_data, app, session):
+    user_id = seed_data["plan_user"].id
+    plan_id = seed_data["workout_plan"].id
+    url = f"/api/workout-sessions/{plan_id}"
+    with app.test_request_context(url, method="POST", json=SESSION):
+        fingerprint = request_fingerprint()
+    # Claimed by a request that has not finished yet
+    assert IdempotencyKey.claim(user_id, "running", fingerprint, 60, 60)
+    assert IdempotencyKey.claim(user_id, "running", fingerprint, 60, 60) is None
+    session.add(
+        IdempotencyKey(
+            user_id=user_id,
+            key="expired",
+            request_hash="hash",
+            status_code=200,
+            content_type="application/json",
+            response_body=b"{}",
+            created_at=datetime.now(timezone.utc) - timedelta(days=2),
+        )
+    )
+    session.commit()
+    login(client, app, seed_data["plan_user"])
+
+    response = client.post(url, json=SESSION, headers={"Idempotency-Key": "running"})
+    assert response.status_code == 409
+    assert response.headers["Retry-After"] == "1"
+
+    # An expired key is taken over by the next request that uses it
+    response = client.post(url, json=SESSION, headers={"Idempotency-Key": "expired"})
+    assert response.status_code == 200
+    assert "workout_session_id" in response.get_json()
+    assert count_sessions(plan_id) == 2
+
+
+def test_stuck_claim_is_taken_over_after_its_lease(client, seed_data, app, session):
+    user_id = seed_data["plan_user"].id
+    plan_id = seed_data["workout_plan"].id
+    url = f"/api/workout-sessions/{plan_id}"
+    with app.test_request_context(url, method="POST", json=SESSION):
+        fingerprint = request_fingerprint()
+    # Claimed by a worker that died before finishing
+    session.add(
+        IdempotencyKey(
+            user_id=user_id,
+            key="stuck",
+            request_hash=fingerprint,
+            created_at=datetime.now(timezone.utc) - timedelta(minutes=10),
+        )
+    )
+    session.commit()
+    login(client, app, seed_data["plan_user"])
+
+    response = client.post(url, json=SESSION, headers={"Idempotency-Key": "stuck"})
+    assert response.status_code == 200
+    assert count_sessions(plan_id) == 2
+
+    # The dead worker's claim no longer fences anything
+    stale = datetime.now(timezone.utc) - timedelta(minutes=10)
+    assert not IdempotencyKey.complete(user_id, "stuck", stale, 200, None, b"{}")
+    retry = client.post(url, json=SESSION, headers={"Idempotency-Key": "stuck"})
+    assert retry.headers["Idempotent-Replayed"] == "true"
+
+
+def test_response_is_stored_with_the_write(client, seed_data, app, monkeypatch):
+    plan_id = seed_data["workout_plan"].id
+    login(client, app, seed_data["plan_user"])
+    url = f"/api/workout-sessions/{plan_id}"
+
+    def fail(*args):
+        raise RuntimeError("worker died")
+
+    monkeypatch.setattr(IdempotencyKey, "complete", fail)
+    with pytest.raises(RuntimeError):
+        client.post(url, json=SESSION, headers={"Idempotency-Key": "atomic"})
+    monkeypatch.undo()
+
+    # Neither the session nor the claim survived, so a retry runs again
+    assert count_sessions(plan_id) == 1
+    response = client.post(url, json=SESSION, headers={"Idempotency-Key": "atomic"})
+    assert response.status_code == 200
+    assert "Idempotent-Replayed" not in response.headers
+    assert count_sessions(plan_id) == 2
+
+
+def test_client_errors_are_replayed(client, seed_data, app):
+    login(client, app, seed_data["plan_user"])
+    headers = {"Idempotency-Key": "missing-plan"}
+
+    first = client.post("/api/workout-sessions/999999", json=SESSION, headers=headers)
+    retry = client.post("/api/workout-sessions/999999", json=SESSION, headers=headers)
+
+    assert first.status_code == retry.status_code == 404
+    assert retry.headers["Idempotent-Replayed"] == "true"
+
+
+def test_purge_idempotency_keys_command(app, seed_data, session):
+    user_id = seed_data["plan_user"].id
+    session.add_all(
+        [
+            IdempotencyKey(user_id=user_id, key="fresh", request_hash="hash"),
+            IdempotencyKey(
+                user_id=user_id,
+                key="old",
+                request_hash="hash",
+                created_at=datetime.now(timezone.utc) - timedelta(days=2),
+            ),
+        ]
+    )
+    session.commit()
+
+    result = app.test_cli_runner().invoke(args=["purge-idempotency-keys"])
+
+    assert result.exit_code == 0
+    assert "purged: 1" in result.output
+    assert [key.key for key in IdempotencyKey.query.all()] == ["fresh"]
@@ -0,0 +1,151 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from app.utils.progression import compute_progression, lttb_indices
+from ..models import SessionExercise, WorkoutSession
+from .test_utils import create_jwt_token
+from .utils.test_utilities import assert_max_queries
+
+DAY = 86400 * 10**6
+START = int((datetime(2024, 1, 1, 9) - datetime(1970, 1, 1)).total_seconds()) * 10**6
+ROWS = [
+    (1, START, 3, 10, 50.0),
+    (1, START, 1, 5, 60.0),
+    (2, START + 2 * DAY, 3, 10, 55.0),
+    (3, START + 4 * DAY, 3, 8, 60.0),
+]
+
+
+def columns(rows):
+    return [list(column) for column in zip(*rows)] or [None] * 5
+
+
+def test_compute_progression():
+    progress = compute_progression(columns(ROWS), window=2)
+
+    assert progress["completed_at"] == [
+        "2024-01-01T09:00:00",
+        "2024-01-03T09:00:00",
+        "2024-01-05T09:00:00",
+    ]
+    series = progress["series"]
+    assert series["volume"] == [1800.0, 1650.0, 1440.0]
+    assert series["top_weight"] == [60.0, 55.0, 60.0]
+    assert series["estimated_1rm"] == pytest.approx([70.0, 55 * 4 / 3, 76.0])
+    assert progress["rolling_mean"]["volume"] == [1800.0, 1725.0, 1545.0]
+    assert progress["trend_per_day"]["volume"] == pytest.approx(-90.0)
+    assert progress["trend_per_day"]["estimated_1rm"] == pytest.approx(1.5)
+
+
+def test_compute_progression_short_histories():
+    empty = compute_progression(columns([]))
+    assert empty["completed_at"] == []
+    assert empty["trend_per_day"]["volume"] is None
+
+    single = compute_progression(columns(ROWS[:2]))
+    assert single["series"]["volume"] == [1800.0]
+    assert single["rolling_mean"]["volume"] == [1800.0]
+    assert single["trend_per_day"]["top_weight"] is None
+
+
+def test_lttb_indices_keep_shape():
+    x = np.arange(1000, dtype=np.float64)
+    series = np.vstack([np.zeros(1000), np.ones(1000)])
+    series[0, 437] = 50.0
+
+    keep = lttb_indices(x, series, 20)
+
+    assert len(keep) == 20
+    assert keep[0] == 0 and keep[-1] == 999
+    assert np.all(np.diff(keep) > 0)
+    # The spike survives even though a flat series is sampled alongside
+    assert 437 in keep
+    assert list(lttb_indices(x[:10], series[:, :10], 20)) == list(range(10))
+
+
+def test_compute_progression_max_points():
+    rows = [(day, START + day * DAY, 3, 10, 40.0 + day % 7) for day in range(300)]
+
+    progress = compute_progression(columns(rows), window=3, max_points=50)
+    full = compute_progression(columns(rows), window=3)
+
+    assert progress["total_points"] == full["total_points"] == 300
+    assert len(progress["completed_at"]) == 50
+    assert all(len(values) == 50 for values in progress["series"].values())
+    assert progress["completed_at"][0] == full["completed_at"][0]
+    assert progress["completed_at"][-1] == full["completed_at"][-1]
+    # Trends and rolling means still come from every session
+    assert progress["trend_per_day"] == full["trend_per_day"]
+    kept = [full["completed_at"].index(at) for at in progress["completed_at"]]
+    assert progress["rolling_mean"]["volume"] == [
+        full["rolling_mean"]["volume"][i] for i in kept
+    ]
+
+
+def test_get_progress_report(client, seed_data, app, session):
+    user = seed_data["plan_user"]
+    plan = seed_data["workout_plan"]
+    plan_exercise = seed_data["plan_exercises"][0]
+    for day, weight in [(10, 20.0), (12, 22.5)]:
+        workout_session = WorkoutSession(
+            workout_plan_id=plan.id, completed_at=datetime(2024, 2, day)
+        )
+        # Scheduled but never completed sessions are left out
+        session.add_all([workout_session, WorkoutSession(workout_plan_id=plan.id)])
+        session.flush()
+        session.add(
+            SessionExercise(
+                workout_session_id=workout_session.id,
+                workout_plan_exercise_id=plan_exercise.id,
+                actual_sets=3,
+                actual_reps=10,
+                actual_weight=weight,
+            )
+        )
+    session.commit()
+    exercise_id = plan_exercise.exercise_id
+    token = create_jwt_token(user.id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+    client.get("/api/workout-plans")
+
+    with assert_max_queries(1):
+        response = client.get(f"/api/reports/progress/{exercise_id}?window=2")
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["exercise_id"] == exercise_id
+    assert data["window"] == 2
+    assert data["total_points"] == 3
+    # The seeded session was completed today, after the two above
+    assert data["completed_at"][:2] == ["2024-02-10T00:00:00", "2024-02-12T00:00:00"]
+    assert data["series"]["top_weight"][:2] == [20.0, 22.5]
+    assert data["trend_per_day"]["volume"] is not None
+
+
+def test_get_progress_report_errors(client, seed_data, app):
+    user = seed_data["no_plan_user"]
+    exercise_id = seed_data["plan_exercises"][0].exercise_id
+    token = create_jwt_token(user.id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+
+    # Someone else's history is not visible
+    response = client.get(f"/api/reports/progress/{exercise_id}")
+    assert response.status_code == 200
+    assert response.get_json()["series"]["volume"] == []
+
+    response = client.get("/api/reports/progress/999999")
+    assert response.status_code == 404
+
+    for window in ["0", "many", "1000"]:
+        response = client.get(f"/api/reports/progress/{exercise_id}?window={window}")
+        assert response.status_code == 400
+        assert "window" in response.get_json()["errors"]
+
+    for max_points in ["2", "all", "100000"]:
+        response = client.get(
+            f"/api/reports/progress/{exercise_id}?max_points={max_points}"
+        )
+        assert response.status_code == 400
+        assert "max_points" in response.get_json()["errors"]
@@ -0,0 +1,219 @@
+"""
+EXPLAIN the statements issued by the hot lookups against a seeded database
+and fail if any of them sequentially scans a large table.
+"""
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+
+from app import db
+from app.models import (
+    Exercise,
+    UserExerciseStats,
+    WorkoutPlan,
+    WorkoutPlanExercise,
+    WorkoutSession,
+)
+from app.utils.progression import fetch_progression_columns
+from app.views.workout_plan_views import WORKOUT_DETAIL_OPTIONS
+from app.views.workout_session_views import SESSION_DETAIL_OPTIONS
+
+USERS = 500
+PLANS_PER_USER = 5
+SESSIONS_PER_PLAN = 4
+EXERCISES = 2000
+EXERCISES_PER_PLAN = 8
+
+SEED_STATEMENTS = [
+    f"""
+    INSERT INTO users (name, surname, email, password_hash)
+    SELECT 'Explain', 'User', 'explain' || g || '@example.com', 'x'
+    FROM generate_series(1, {USERS}) AS g
+    """,
+    f"""
+    INSERT INTO exercises (name, category, muscle_group)
+    SELECT 'Explain ' || g, 'Strength', 'Back' FROM generate_series(1, {EXERCISES}) AS g
+    """,
+    f"""
+    INSERT INTO workout_plans (user_id, name)
+    SELECT u.id, 'Plan ' || g
+    FROM users AS u CROSS JOIN generate_series(1, {PLANS_PER_USER}) AS g
+    WHERE u.email LIKE 'explain%'
+    """,
+    f"""
+    INSERT INTO workout_plan_exercises (workout_plan_id, exercise_id)
+    SELECT p.id, first.id + (p.id * {EXERCISES_PER_PLAN} + g) % {EXERCISES}
+    FROM workout_plans AS p
+    CROSS JOIN generate_series(0, {EXERCISES_PER_PLAN - 1}) AS g
+    CROSS JOIN (SELECT min(id) AS id FROM exercises WHERE name LIKE 'Explain %') AS first
+    """,
+    f"""
+    INSERT INTO workout_sessions (workout_plan_id, scheduled_at)
+    SELECT p.id, now() - g * interval '1 day'
+    FROM workout_plans AS p CROSS JOIN generate_series(1, {SESSIONS_PER_PLAN}) AS g
+    """,
+    """
+    INSERT INTO session_exercises (workout_session_id, workout_plan_exercise_id)
+    SELECT ws.id, wpe.id
+    FROM workout_sessions AS ws
+    JOIN workout_plan_exercises AS wpe ON wpe.workout_plan_id = ws.workout_plan_id
+    """,
+]
+SEEDED_TABLES = [
+    "users",
+    "exercises",
+    "workout_plans",
+    "workout_plan_exercises",
+    "workout_sessions",
+    "session_exercises",
+]
+# Tables that grow with every user's history. The exercise catalog stays
+# small enough that hashing all of it can legitimately win.
+LARGE_TABLES = {
+    "workout_plans",
+    "workout_plan_exercises",
+    "workout_sessions",
+    "session_exercises",
+}
+
+
+@pytest.fixture(scope="module")
+def large_dataset(app):
+    """Commit a few hundred thousand rows for this module, then remove them."""
+    with db.engine.begin() as connection:
+        for statement in SEED_STATEMENTS:
+            connection.execute(text(statement))
+        for table in SEEDED_TABLES:
+            connection.execute(text(f"ANALYZE {table}"))
+        row = connection.execute(
+            text(
+                """
+                SELECT p.user_id, p.id, ws.id, wpe.id, wpe.exercise_id
+                FROM workout_plans AS p
+                JOIN workout_sessions AS ws ON ws.workout_plan_id = p.id
+                JOIN workout_plan_exercises AS wpe ON wpe.workout_plan_id = p.id
+                ORDER BY p.id DESC LIMIT 1
+                """
+            )
+        ).one()
+
+    yield dict(
+        zip(
+            ["user_id", "workout_plan_id", "session_id", "plan_exercise_id", "exercise_id"],
+            row,
+        )
+    )
+
+    with db.engine.begin() as connection:
+        connection.execute(text(f"TRUNCATE {', '.join(SEEDED_TABLES)} CASCADE"))
+
+
+@contextmanager
+def captured_statements():
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not statement.startswith("EXPLAIN"):
+            statements.append((statement, parameters))
+
+    event.listen(Engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(Engine, "before_cursor_execute", capture)
+
+
+def plan_nodes(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def assert_no_seq_scans(statements):
+    assert statements
+    connection = db.session.connection()
+    for statement, parameters in statements:
+        plan = connection.exec_driver_sql(
+            "EXPLAIN (FORMAT JSON) " + statement, parameters
+        ).scalar()
+        scanned = [
+            node["Relation Name"]
+            for node in plan_nodes(plan[0]["Plan"])
+            if node["Node Type"] == "Seq Scan" and node["Relation Name"] in LARGE_TABLES
+        ]
+        assert not scanned, f"Sequential scan on {scanned} for:\n{statement}\n{plan}"
+
+
+def test_get_user_workout_plans(large_dataset):
+    with captured_statements() as statements:
+        WorkoutPlan.get_user_workout_plan(large_dataset["user_id"])
+    assert_no_seq_scans(statements)
+
+
+def test_get_user_workout_plan_detail(large_dataset):
+    with captured_statements() as statements:
+        WorkoutPlan.get_user_workout_plan(
+            large_dataset["user_id"],
+            large_dataset["workout_plan_id"],
+            options=WORKOUT_DETAIL_OPTIONS,
+        )
+    assert_no_seq_scans(statements)
+
+
+def test_get_session_for_user_plan_detail(large_dataset):
+    with captured_statements() as statements:
+        WorkoutSession.get_session_for_user_plan(
+            large_dataset["user_id"],
+            large_dataset["workout_plan_id"],
+            large_dataset["session_id"],
+            options=SESSION_DETAIL_OPTIONS,
+        )
+    assert_no_seq_scans(statements)
+
+
+def test_get_page_for_user(large_dataset):
+    with captured_statements() as statements:
+        WorkoutSession.get_page_for_user(large_dataset["user_id"], 50)
+    assert_no_seq_scans(statements)
+
+
+def test_plan_exercise_lookups(large_dataset):
+    with captured_statements() as statements:
+        WorkoutPlanExercise.get_ids_in_workout(
+            {large_dataset["plan_exercise_id"]}, large_dataset["workout_plan_id"]
+        )
+        Exercise.get_existing_ids({large_dataset["exercise_id"]})
+    assert_no_seq_scans(statements)
+
+
+def test_exercise_stats_maintenance(large_dataset):
+    with captured_statements() as statements:
+        UserExerciseStats.exercise_ids(
+            WorkoutSession.id == large_dataset["session_id"]
+        )
+        UserExerciseStats.refresh(
+            large_dataset["user_id"], {large_dataset["exercise_id"]}
+        )
+    assert_no_seq_scans(statements)
+
+
+def test_fetch_progression_columns(large_dataset):
+    with captured_statements() as statements:
+        fetch_progression_columns(large_dataset["user_id"], large_dataset["exercise_id"])
+    assert_no_seq_scans(statements)
+
+
+@pytest.mark.parametrize(
+    "table, column",
+    [
+        (fk.parent.table.name, fk.parent.name)
+        for table in db.metadata.sorted_tables
+        for fk in table.foreign_keys
+    ],
+)
+def test_foreign_keys_are_indexed(large_dataset, table, column):
+    # Cascading deletes look referencing rows up by the foreign key column
+    statement = f"SELECT 1 FROM {table} WHERE {column} = %(value)s"
+    assert_no_seq_scans([(statement, {"value": large_dataset["workout_plan_id"]})])
@@ -0,0 +1,75 @@
+import logging
+
+from sqlalchemy import text
+
+from app import db
+from app.utils.query_stats import collect_queries
+from .utils.test_utilities import assert_max_queries, create_jwt_token
+
+
+def test_collect_queries_flags_repeated_shapes(app, session):
+    with collect_queries() as stats:
+        for i in range(3):
+            db.session.execute(text("SELECT :value"), {"value": i})
+        db.session.execute(text("SELECT 1"))
+
+    assert stats.count == 4
+    assert stats.duration > 0
+    suspects = stats.n_plus_one_suspects(threshold=3)
+    assert suspects == [("SELECT %(value)s", 3)]
+
+
+def test_query_stats_headers_in_debug_mode(client, seed_data, app, monkeypatch):
+    monkeypatch.setitem(app.config, "QUERY_STATS_ENABLED", True)
+    token = create_jwt_token(seed_data["plan_user"].id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+
+    with collect_queries() as stats:
+        response = client.get("/api/workout-plans")
+
+    assert response.status_code == 200
+    assert response.headers["X-Query-Count"] == str(stats.count)
+    assert float(response.headers["X-Query-Time-Ms"]) >= 0
+    assert response.headers["X-Query-N-Plus-One"] == "0"
+
+
+def test_query_stats_headers_off_by_default(client, seed_data, app):
+    token = create_jwt_token(seed_data["plan_user"].id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+
+    response = client.get("/api/workout-plans")
+    assert "X-Query-Count" not in response.headers
+
+
+def test_list_workouts_query_budget(client, seed_data, app):
+    token = create_jwt_token(seed_data["plan_user"].id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+    client.get("/api/workout-plans")
+
+    # Identity cache hit + one plans query
+    with assert_max_queries(1):
+        response = client.get("/api/workout-plans")
+    assert response.status_code == 200
+
+
+def test_query_stats_streamed_response_logged_after_body(
+    client, seed_data, app, monkeypatch, caplog
+):
+    monkeypatch.setitem(app.config, "QUERY_STATS_ENABLED", True)
+    token = create_jwt_token(seed_data["plan_user"].id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+
+    with collect_queries() as stats, caplog.at_level(logging.INFO):
+        response = client.get("/api/export/sessions")
+        response.get_data()
+        response.close()
+
+    assert response.status_code == 200
+    # The export queries run while the body streams, after the headers
+    assert "X-Query-Count" not in response.headers
+    [logged] = [
+        record.getMessage()
+        for record in caplog.records
+        if record.getMessage().startswith("GET /api/export/sessions 200")
+    ]
+    assert f"queries={stats.count} " in logged
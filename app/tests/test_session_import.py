@@ -0,0 +1,121 @@
+import json
+
+from app.models import UserExerciseStats, WorkoutPlan, WorkoutSession
+from app.utils.session_import import import_sessions
+from .test_utils import create_jwt_token
+from .utils.test_utilities import assert_max_queries
+
+
+def login(client, app, user):
+    token = create_jwt_token(user.id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+
+
+def session_line(plan_exercise_id, day, **exercise):
+    return json.dumps(
+        {
+            "scheduled_at": f"2023-05-{day:02d}T07:00:00",
+            "completed_at": f"2023-05-{day:02d}T08:00:00",
+            "exercises": [
+                {
+                    "workout_plan_exercise_id": plan_exercise_id,
+                    "actual_sets": 3,
+                    **exercise,
+                }
+            ],
+        }
+    )
+
+
+def count_sessions(plan_id):
+    return WorkoutSession.query.filter_by(workout_plan_id=plan_id).count()
+
+
+def test_import_workout_sessions(client, seed_data, app, session):
+    UserExerciseStats.rebuild()
+    session.commit()
+    plan_id = seed_data["workout_plan"].id
+    plan_exercise_id = seed_data["plan_exercises"][0].id
+    login(client, app, seed_data["plan_user"])
+    user_id = seed_data["plan_user"].id
+    version = WorkoutPlan.get_data_version(user_id, plan_id).data_version
+    body = "\n".join(
+        [
+            session_line(plan_exercise_id, 1, actual_reps=10, actual_weight=20),
+            "",
+            "{not json",
+            session_line(plan_exercise_id, 2, notes="Easy"),
+            session_line(999999, 3),
+            json.dumps({"scheduled_at": "someday"}),
+            json.dumps({"scheduled_at": "2023-05-04"}),
+        ]
+    )
+
+    response = client.post(f"/api/workout-sessions/{plan_id}/import", data=body)
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["imported"] == 3
+    assert data["failed"] == 3
+    assert [error["line"] for error in data["errors"]] == [3, 5, 6]
+    assert "line" in data["errors"][0]["errors"]
+    assert "workout_plan_exercise_id" in data["errors"][1]["errors"]
+    assert "scheduled_at" in data["errors"][2]["errors"]
+
+    assert count_sessions(plan_id) == 4
+    imported = (
+        WorkoutSession.query.filter_by(workout_plan_id=plan_id)
+        .order_by(WorkoutSession.scheduled_at)
+        .first()
+    )
+    [exercise] = imported.session_exercises
+    assert (exercise.actual_sets, exercise.actual_reps, exercise.actual_weight) == (
+        3,
+        10,
+        20.0,
+    )
+    assert UserExerciseStats.find_drift() == []
+    assert WorkoutPlan.get_data_version(user_id, plan_id).data_version > version
+
+
+def test_import_round_trips_export(client, seed_data, app):
+    plan_id = seed_data["workout_plan"].id
+    login(client, app, seed_data["plan_user"])
+    exported = client.get("/api/export/sessions").data
+
+    response = client.post(f"/api/workout-sessions/{plan_id}/import", data=exported)
+
+    assert response.get_json()["imported"] == 1
+    reexported = client.get("/api/export/sessions").data.splitlines()
+    assert len(reexported) == 2
+    first, second = (
+        [(e["exercise_name"], e["actual_sets"], e["notes"]) for e in s["exercises"]]
+        for s in map(json.loads, reexported)
+    )
+    assert first == second
+
+
+def test_import_sessions_batches(seed_data, session):
+    plan_id = seed_data["workout_plan"].id
+    plan_exercise_id = seed_data["plan_exercises"][0].id
+    lines = [session_line(plan_exercise_id, day) for day in range(1, 5)]
+
+    # Per batch of two: plan exercise lookup, sessions, session exercises,
+    # exercise stats, plan version, change log lock and change log
+    with assert_max_queries(14):
+        result = import_sessions(
+            seed_data["plan_user"].id, plan_id, lines, batch_size=2
+        )
+
+    assert result.imported == 4
+    assert result.errors == []
+    assert count_sessions(plan_id) == 5
+
+
+def test_import_workout_sessions_not_found(client, seed_data, app):
+    plan_id = seed_data["workout_plan"].id
+    login(client, app, seed_data["no_plan_user"])
+
+    response = client.post(f"/api/workout-sessions/{plan_id}/import", data="{}")
+
+    assert response.status_code == 404
@@ -0,0 +1,120 @@
+from datetime import datetime
+
+from app.models import WorkoutSession
+from app.utils.recurrence import parse_recurrence
+from .test_utils import create_jwt_token
+from .utils.test_utilities import assert_max_queries
+
+BLOCK = {
+    "start": "2024-06-03T07:00:00",
+    "weekdays": ["MO", "we", "FR"],
+    "count": 36,
+}
+
+
+def login(client, app, user):
+    token = create_jwt_token(user.id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+
+
+def count_sessions(plan_id):
+    return WorkoutSession.query.filter_by(workout_plan_id=plan_id).count()
+
+
+def test_schedule_preview_writes_nothing(client, seed_data, app):
+    plan_id = seed_data["workout_plan"].id
+    login(client, app, seed_data["plan_user"])
+
+    response = client.post(
+        f"/api/workout-sessions/{plan_id}/schedule", json={**BLOCK, "preview": True}
+    )
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["preview"] is True
+    assert len(data["scheduled"]) == 36
+    assert data["scheduled"][:4] == [
+        "2024-06-03T07:00:00",
+        "2024-06-05T07:00:00",
+        "2024-06-07T07:00:00",
+        "2024-06-10T07:00:00",
+    ]
+    # 12 weeks of three sessions
+    assert data["scheduled"][-1] == "2024-08-23T07:00:00"
+    assert count_sessions(plan_id) == 1
+
+
+def test_schedule_skips_existing_sessions(client, seed_data, app, session):
+    plan_id = seed_data["workout_plan"].id
+    session.add(
+        WorkoutSession(workout_plan_id=plan_id, scheduled_at=datetime(2024, 6, 5, 7))
+    )
+    session.commit()
+    login(client, app, seed_data["plan_user"])
+    client.get("/api/workout-plans")
+
+    preview = client.post(
+        f"/api/workout-sessions/{plan_id}/schedule", json={**BLOCK, "preview": True}
+    ).get_json()
+    assert preview["skipped"] == ["2024-06-05T07:00:00"]
+
+    # Plan lookup, plan lock, one INSERT ... SELECT, the version bump and
+    # the change log lock and entries
+    with assert_max_queries(6):
+        response = client.post(f"/api/workout-sessions/{plan_id}/schedule", json=BLOCK)
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["scheduled"] == preview["scheduled"]
+    assert len(data["scheduled"]) == 35
+    assert count_sessions(plan_id) == 37
+
+    response = client.post(f"/api/workout-sessions/{plan_id}/schedule", json=BLOCK)
+    data = response.get_json()
+    assert data["scheduled"] == []
+    assert len(data["skipped"]) == 36
+    assert count_sessions(plan_id) == 37
+
+
+def test_schedule_validation(client, seed_data, app):
+    plan_id = seed_data["workout_plan"].id
+    login(client, app, seed_data["plan_user"])
+    url = f"/api/workout-sessions/{plan_id}/schedule"
+
+    for body, field in [
+        ({"count": 3}, "start"),
+        ({"start": "2024-06-03"}, "count"),
+        ({"start": "2024-06-03", "count": 3, "until": "2024-07-01"}, "count"),
+        ({"start": "2024-06-03", "count": 3, "weekdays": ["XX"]}, "weekdays"),
+        ({"start": "2024-06-03", "count": 3, "frequency": "hourly"}, "frequency"),
+        ({"start": "2024-06-03", "count": 3, "interval": 0}, "interval"),
+        ({"start": "2024-06-03", "count": 1000}, "count"),
+        ({"start": "2024-06-03", "frequency": "daily", "until": "2030-01-01"}, "until"),
+    ]:
+        response = client.post(url, json=body)
+        assert response.status_code == 400, body
+        assert field in response.get_json()["errors"], body
+
+    login(client, app, seed_data["no_plan_user"])
+    response = client.post(url, json={**BLOCK, "preview": True})
+    assert response.status_code == 404
+
+
+def test_parse_recurrence():
+    errors = {}
+    dates = parse_recurrence(
+        {
+            "start": "2024-01-01T18:00:00+02:00",
+            "frequency": "daily",
+            "interval": 2,
+            "until": "2024-01-05",
+        },
+        errors,
+    )
+
+    assert errors == {}
+    # The whole last day is included, and times are stored in UTC
+    assert dates == [
+        datetime(2024, 1, 1, 16),
+        datetime(2024, 1, 3, 16),
+        datetime(2024, 1, 5, 16),
+    ]
@@ -0,0 +1,229 @@
+import threading
+
+from sqlalchemy.orm import sessionmaker
+
+from app.models import ChangeLog, db
+from .test_utils import create_jwt_token
+from .utils.test_utilities import assert_max_queries
+
+
+def login(client, app, user):
+    token = create_jwt_token(user.id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+
+
+def sync(client, since, **params):
+    response = client.get("/api/sync", query_string={"since": since, **params})
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def start_sync(client):
+    response = client.get("/api/sync")
+    assert response.status_code == 200
+    return response.get_json()["cursor"]
+
+
+def test_sync_reports_writes_and_deletes(client, seed_data, app):
+    login(client, app, seed_data["plan_user"])
+    plan_exercise = seed_data["plan_exercises"][0]
+    cursor = start_sync(client)
+
+    response = client.post(
+        "/api/workout-plans",
+        json={"name": "Legs", "exercises": [{"exercise_id": plan_exercise.exercise_id}]},
+    )
+    plan_id = response.get_json()["workout_plan_id"]
+    response = client.post(
+        f"/api/workout-sessions/{seed_data['workout_plan'].id}",
+        json={
+            "scheduled_at": "2024-03-01T08:00:00",
+            "exercises": [
+                {"workout_plan_exercise_id": plan_exercise.id, "actual_reps": 8}
+            ],
+        },
+    )
+    session_id = response.get_json()["workout_session_id"]
+
+    data = sync(client, cursor)
+    assert data["has_more"] is False
+    assert data["deleted"] == {}
+    changes = data["changes"]
+    assert [plan["id"] for plan in changes["workout_plan"]] == [plan_id]
+    assert changes["workout_plan"][0]["name"] == "Legs"
+    assert [row["workout_plan_id"] for row in changes["workout_plan_exercise"]] == [
+        plan_id
+    ]
+    assert changes["workout_session"] == [
+        {
+            "id": session_id,
+            "workout_plan_id": seed_data["workout_plan"].id,
+            "scheduled_at": "2024-03-01T08:00:00",
+            "started_at": None,
+            "completed_at": None,
+        }
+    ]
+    assert changes["session_exercise"][0]["actual_reps"] == 8
+
+    # A row written and then deleted is only reported as deleted
+    cursor = data["cursor"]
+    client.patch(f"/api/workout-plans/{plan_id}", json={"name": "Legs day"})
+    client.delete(f"/api/workout-plans/{plan_id}")
+    client.delete(f"/api/workout-sessions/{seed_data['workout_plan'].id}/{session_id}")
+
+    data = sync(client, cursor)
+    assert data["changes"] == {}
+    assert data["deleted"] == {
+        "workout_plan": [plan_id],
+        "workout_session": [session_id],
+    }
+
+
+def test_sync_reports_scheduled_and_bulk_deleted_sessions(client, seed_data, app):
+    plan_id = seed_data["workout_plan"].id
+    login(client, app, seed_data["plan_user"])
+    cursor = start_sync(client)
+
+    response = client.post(
+        f"/api/workout-sessions/{plan_id}/schedule",
+        json={"start": "2030-01-01T07:00:00", "frequency": "daily", "count": 3},
+    )
+    assert response.status_code == 200
+    scheduled = sync(client, cursor)
+    ids = [row["id"] for row in scheduled["changes"]["workout_session"]]
+    assert len(ids) == 3
+
+    client.delete("/api/workout-sessions", json={"from": "2030-01-01"})
+    data = sync(client, scheduled["cursor"])
+    assert data["deleted"] == {"workout_session": ids}
+
+
+def test_sync_steady_state(client, seed_data, app):
+    login(client, app, seed_data["plan_user"])
+    client.post("/api/workout-plans", json={"name": "Legs"})
+    cursor = start_sync(client)
+
+    # Nothing changed: one range scan of the change log and a tiny body
+    with assert_max_queries(1):
+        response = client.get("/api/sync", query_string={"since": cursor})
+    assert response.status_code == 200
+    assert len(response.data) < 200
+    assert response.get_json() == {
+        "changes": {},
+        "deleted": {},
+        "cursor": cursor,
+        "has_more": False,
+    }
+
+
+def test_sync_pages_through_the_log(client, seed_data, app):
+    login(client, app, seed_data["plan_user"])
+    cursor = start_sync(client)
+    plan_ids = [
+        client.post("/api/workout-plans", json={"name": f"Plan {n}"}).get_json()[
+            "workout_plan_id"
+        ]
+        for n in range(5)
+    ]
+
+    seen = []
+    pages = 0
+    while True:
+        data = sync(client, cursor, limit=2)
+        pages += 1
+        seen.extend(plan["id"] for plan in data["changes"].get("workout_plan", []))
+        cursor = data["cursor"]
+        if not data["has_more"]:
+            break
+    assert pages == 3
+    assert seen == plan_ids
+
+
+def test_sync_is_per_user(client, seed_data, app):
+    login(client, app, seed_data["no_plan_user"])
+    cursor = start_sync(client)
+
+    login(client, app, seed_data["plan_user"])
+    client.post("/api/workout-plans", json={"name": "Legs"})
+
+    login(client, app, seed_data["no_plan_user"])
+    data = sync(client, cursor)
+    assert data["changes"] == {} and data["deleted"] == {}
+    assert ChangeLog.latest_id(seed_data["no_plan_user"].id) == 0
+
+
+def test_sync_rejects_invalid_parameters(client, seed_data, app):
+    login(client, app, seed_data["plan_user"])
+
+    for since in ["", "not-a-cursor", "WyJhIl0", "Wy0xXQ"]:
+        response = client.get("/api/sync", query_string={"since": since})
+        assert response.status_code == 400
+        assert "since" in response.get_json()["errors"]
+
+    response = client.get("/api/sync", query_string={"limit": 5000})
+    assert response.status_code == 400
+    assert "limit" in response.get_json()["errors"]
+
+
+def test_sync_does_not_skip_changes_committed_out_of_order(
+    client, app, committed_data
+):
+    user_id = committed_data["user_id"]
+    token = create_jwt_token(user_id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+    cursor = start_sync(client)
+    bind = db.engine
+
+    def write(changes, recorded, commit):
+        # Each writer gets its own connection and transaction
+        db.session.registry.set(sessionmaker(bind=bind)())
+        try:
+            ChangeLog.record(user_id, **changes)
+            recorded.set()
+            commit.wait(5)
+            db.session.commit()
+        finally:
+            db.session.close()
+
+    first_recorded, first_commit = threading.Event(), threading.Event()
+    second_recorded, second_commit = threading.Event(), threading.Event()
+    second_commit.set()
+    first = threading.Thread(
+        target=write,
+        args=(
+            {"workout_plan": [committed_data["workout_plan_id"]]},
+            first_recorded,
+            first_commit,
+        ),
+    )
+    second = threading.Thread(
+        target=write,
+        args=(
+            {"workout_session": [committed_data["workout_session_id"]]},
+            second_recorded,
+            second_commit,
+        ),
+    )
+    first.start()
+    assert first_recorded.wait(5)
+    # The second writer would commit a later id before the first one
+    second.start()
+    second.join(0.5)
+
+    try:
+        pages = [sync(client, cursor)]
+    finally:
+        first_commit.set()
+        first.join(5)
+        second.join(5)
+    pages.append(sync(client, pages[0]["cursor"]))
+
+    delivered = {}
+    for page in pages:
+        for entity, rows in page["changes"].items():
+            delivered.setdefault(entity, []).extend(row["id"] for row in rows)
+
+    assert delivered == {
+        "workout_plan": [committed_data["workout_plan_id"]],
+        "workout_session": [committed_data["workout_session_id"]],
+    }
@@ -1,7 +1,16 @@
 import json
-
-from werkzeug.security import generate_password_hash
-
+import threading
+import time
+
+import pytest
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from app.utils import password_hashing
+from app.utils.password_hashing import (
+    HashingPoolSaturated,
+    PasswordHasher,
+    password_hasher,
+)
 from ..models import User
 
 
@@ -98,3 +107,76 @@ def test_logout_clears_token(client):
     )
     assert "HttpOnly" in cookie_header
     assert "SameSite=Strict" in cookie_header
+
+
+def test_login_rehashes_outdated_hash(client, session):
+    password = "secret123"
+    user = User(
+        name="Old",
+        surname="Hash",
+        email="oldhash@example.com",
+        password_hash=generate_password_hash(password, method="pbkdf2:sha256:1000"),
+    )
+    session.add(user)
+    session.commit()
+
+    payload = {"email": "oldhash@example.com", "password": password}
+    response = client.post(
+        "/api/auth/login", data=json.dumps(payload), content_type="application/json"
+    )
+    assert response.status_code == 200
+
+    session.expire_all()
+    user = session.query(User).filter_by(email="oldhash@example.com").one()
+    assert not password_hasher.needs_rehash(user.password_hash)
+    assert check_password_hash(user.password_hash, password)
+
+
+def test_login_returns_503_when_hashing_pool_saturated(client, session, monkeypatch):
+    def saturated(*args):
+        raise HashingPoolSaturated()
+
+    monkeypatch.setattr(password_hasher, "verify", saturated)
+    user = User(
+        name="Busy",
+        surname="Tester",
+        email="busy@example.com",
+        password_hash=generate_password_hash("secret123"),
+    )
+    session.add(user)
+    session.commit()
+
+    payload = {"email": "busy@example.com", "password": "secret123"}
+    response = client.post(
+        "/api/auth/login", data=json.dumps(payload), content_type="application/json"
+    )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(password_hasher.retry_after)
+
+
+def test_password_hasher_rejects_when_queue_full(monkeypatch):
+    hasher = PasswordHasher(workers=1, queue_depth=1)
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocked(password, method):
+        started.set()
+        release.wait(5)
+        return "hash"
+
+    # Hashes block until released, so two fill the worker and the queue
+    monkeypatch.setattr(password_hashing, "generate_password_hash", blocked)
+    running = threading.Thread(target=hasher.hash, args=("first",))
+    queued = threading.Thread(target=hasher.hash, args=("second",))
+    running.start()
+    started.wait(5)
+    queued.start()
+    time.sleep(0.05)
+
+    with pytest.raises(HashingPoolSaturated):
+        hasher.verify("hash", "password")
+
+    release.set()
+    running.join()
+    queued.join()
+    assert hasher.verify(generate_password_hash("pw"), "pw")
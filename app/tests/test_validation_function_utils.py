@@ -1,4 +1,8 @@
-from ..utils.validation_functions import validate_field
+from ..utils.validation_functions import (
+    is_date_only,
+    parse_int_in_range,
+    validate_field,
+)
 
 
 def test_validate_field_datetime_valid():
@@ -44,3 +48,24 @@ def test_validate_field_unsupported_datatype():
     data = {"field": "value"}
     err = validate_field(data, "field", "unsupported")
     assert err == "Unsupported datatype 'unsupported' for field 'field'."
+
+
+def test_parse_int_in_range():
+    errors = {}
+    assert parse_int_in_range({}, "window", 5, 1, 10, errors) == 5
+    assert parse_int_in_range({"window": "7"}, "window", 5, 1, 10, errors) == 7
+    assert errors == {}
+
+    parse_int_in_range({"window": "11"}, "window", 5, 1, 10, errors)
+    assert errors == {"window": "'window' must be between 1 and 10."}
+    parse_int_in_range({"window": "wide"}, "window", 5, 1, 10, errors)
+    assert errors == {"window": "'window' must be a valid int."}
+
+
+def test_is_date_only():
+    assert is_date_only("2024-05-01")
+    assert is_date_only(" 2024-05-01 ")
+    # Ten characters, but with a time part
+    assert not is_date_only("20240501T9")
+    assert not is_date_only("2024-05-01T09:00")
+    assert not is_date_only("May 1 2024")
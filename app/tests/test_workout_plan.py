@@ -1,7 +1,13 @@
 import json
 
-from ..models import WorkoutPlan
-from .utils.test_utilities import create_jwt_token
+from ..models import (
+    Exercise,
+    SessionExercise,
+    WorkoutPlan,
+    WorkoutPlanExercise,
+    WorkoutSession,
+)
+from .utils.test_utilities import assert_max_queries, create_jwt_token
 
 
 def auth_headers(token):
@@ -31,6 +37,36 @@ def test_get_workout(client, seed_data, app):
     data = response.get_json()[0]["workout"]
     assert data["name"] == "Full Body Plan"
     assert len(data["exercises"]) == 2
+    # Session exercises are created from the plan exercise id
+    assert {
+        (ex["id"], ex["workout_plan_exercise_id"]) for ex in data["exercises"]
+    } == {
+        (wp_ex.exercise_id, wp_ex.id) for wp_ex in seed_data["plan_exercises"]
+    }
+
+
+def test_get_workout_query_count_is_fixed(client, seed_data, app, session):
+    user = seed_data["plan_user"]
+    plan = seed_data["workout_plan"]
+    exercises = [Exercise(name=f"Extra {i}") for i in range(10)]
+    session.add_all(exercises)
+    session.flush()
+    session.add_all(
+        WorkoutPlanExercise(workout_plan_id=plan.id, exercise_id=e.id) for e in exercises
+    )
+    session.commit()
+    plan_id = plan.id
+
+    token = create_jwt_token(user.id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+    client.get(f"/api/workout-plans/{plan_id}")
+    session.expunge_all()
+
+    # Plan, then plan exercises joined to their exercises
+    with assert_max_queries(2):
+        response = client.get(f"/api/workout-plans/{plan_id}")
+    assert response.status_code == 200
+    assert len(response.get_json()[0]["workout"]["exercises"]) == 12
 
 
 def test_get_workout_not_found(client, seed_data, app):
@@ -71,6 +107,32 @@ def test_delete_workout_owned(client, seed_data, app, session):
     assert deleted_plan is None
 
 
+def test_delete_workout_leaves_children_to_the_database(
+    client, seed_data, app, session
+):
+    user = seed_data["plan_user"]
+    plan = seed_data["workout_plan"]
+    plan_id = plan.id
+    session.add_all(WorkoutSession(workout_plan_id=plan_id) for _ in range(20))
+    session.commit()
+
+    token = create_jwt_token(user.id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+    client.get("/api/workout-plans")
+    session.expunge_all()
+
+    # Plan lookup, logged exercises, one DELETE, the two statements
+    # refreshing their stats and the change log lock and entry; sessions
+    # are never loaded
+    with assert_max_queries(7):
+        response = client.delete(f"/api/workout-plans/{plan_id}")
+    assert response.status_code == 200
+
+    assert session.query(WorkoutSession).filter_by(workout_plan_id=plan_id).count() == 0
+    assert session.query(WorkoutPlanExercise).filter_by(workout_plan_id=plan_id).count() == 0
+    assert session.query(SessionExercise).count() == 0
+
+
 def test_delete_workout_plan_not_owned(client, seed_data, app):
     user = seed_data["no_plan_user"]
     plan = seed_data["workout_plan"]
@@ -198,3 +260,100 @@ def test_update_workout_plan_not_owned(client, seed_data, app):
 
     assert response.status_code == 404
     assert "No workout plan with id" in response.get_json().get("message", "")
+
+
+def test_create_workout_plan_with_many_exercises(client, seed_data, app, session):
+    user = seed_data["plan_user"]
+    exercises = [Exercise(name=f"Movement {i}") for i in range(40)]
+    session.add_all(exercises)
+    session.commit()
+    exercise_ids = [e.id for e in exercises]
+
+    token = create_jwt_token(user.id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+    client.get("/api/workout-plans")
+
+    payload = {
+        "name": "Big Plan",
+        "exercises": [{"exercise_id": id, "target_sets": 4} for id in exercise_ids],
+    }
+    # Exercise lookup, plan insert, one insert for all plan exercises, the
+    # change log lock and entries and the plan id refresh after commit
+    with assert_max_queries(6):
+        response = client.post(
+            "/api/workout-plans", data=json.dumps(payload), content_type="application/json"
+        )
+    assert response.status_code == 200
+
+    plan_exercises = (
+        session.query(WorkoutPlanExercise)
+        .filter_by(workout_plan_id=response.get_json()["workout_plan_id"])
+        .all()
+    )
+    assert sorted(wp_ex.exercise_id for wp_ex in plan_exercises) == sorted(exercise_ids)
+    assert {(wp_ex.target_sets, wp_ex.target_reps) for wp_ex in plan_exercises} == {(4, 1)}
+
+
+def test_create_workout_plan_reports_unknown_exercises(client, seed_data, app):
+    user = seed_data["plan_user"]
+    exercises = seed_data["exercises"]
+    token = create_jwt_token(user.id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+
+    payload = {
+        "name": "New Plan",
+        "exercises": [
+            {"exercise_id": 99998},
+            {"exercise_id": exercises[0].id},
+            {"exercise_id": 99999},
+        ],
+    }
+    response = client.post(
+        "/api/workout-plans", data=json.dumps(payload), content_type="application/json"
+    )
+    assert response.status_code == 400
+    assert response.get_json()["unknown_exercise_ids"] == [99998, 99999]
+    assert response.get_json()["message"] == "Exercises with ids 99998, 99999 do not exist."
+
+    payload["exercises"] = [{"exercise_id": exercises[0].id, "target_sets": "three"}]
+    response = client.post(
+        "/api/workout-plans", data=json.dumps(payload), content_type="application/json"
+    )
+    assert response.status_code == 400
+    assert "target_sets" in response.get_json()["errors"]
+
+
+def test_update_workout_plan_upserts_exercises(client, seed_data, app, session):
+    user = seed_data["plan_user"]
+    plan = seed_data["workout_plan"]
+    existing = seed_data["plan_exercises"][0]
+    new_exercise = Exercise(name="Lunge")
+    session.add(new_exercise)
+    session.commit()
+    plan_id, existing_exercise_id = plan.id, existing.exercise_id
+
+    token = create_jwt_token(user.id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+    payload = {
+        "exercises": [
+            {"exercise_id": existing_exercise_id, "target_reps": 6},
+            {"exercise_id": new_exercise.id, "target_weight": 12.5},
+            {"exercise_id": new_exercise.id, "target_sets": 2},
+        ]
+    }
+    response = client.patch(
+        f"/api/workout-plans/{plan_id}",
+        data=json.dumps(payload),
+        content_type="application/json",
+    )
+    assert response.status_code == 200
+
+    session.expire_all()
+    rows = {
+        wp_ex.exercise_id: wp_ex
+        for wp_ex in session.query(WorkoutPlanExercise).filter_by(workout_plan_id=plan_id)
+    }
+    assert len(rows) == 3
+    assert (rows[existing_exercise_id].target_sets, rows[existing_exercise_id].target_reps) == (3, 6)
+    added = rows[new_exercise.id]
+    assert (added.target_sets, added.target_reps, added.target_weight) == (2, 1, 12.5)
@@ -1,4 +1,23 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from app.models import Exercise, WorkoutPlan
+from app.utils import workout_report
+from app.utils.caching import SingleFlight, SizedLRUCache
+from app.utils.query_stats import collect_queries
+from app.utils.workout_report import report_flight
+from ..models import SessionExercise, WorkoutSession
 from .test_utils import create_jwt_token
+from .utils.test_utilities import assert_max_queries
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
 
 
 def test_get_workout_report_success(client, seed_data, app):
@@ -40,6 +59,37 @@ def test_get_workout_report_success(client, seed_data, app):
             assert "notes" in ex
 
 
+def test_get_workout_report_contents(client, seed_data, app, session):
+    user = seed_data["plan_user"]
+    workout_plan = seed_data["workout_plan"]
+    workout_session = seed_data["workout_session"]
+    session.add_all(WorkoutSession(workout_plan_id=workout_plan.id) for _ in range(20))
+    session.commit()
+    plan_id, session_id = workout_plan.id, workout_session.id
+
+    token = create_jwt_token(user.id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+    client.get("/api/workout-plans")
+
+    # Plan and catalog versions, plan exercises, sessions, session exercises
+    # and two summary totals
+    with assert_max_queries(6):
+        response = client.get(f"/api/reports/workout-plan/{plan_id}")
+    data = response.get_json()
+
+    assert [ex["name"] for ex in data["workout_plan_exercises"]] == ["Push-Up", "Squat"]
+    assert len(data["workout_plan_sessions"]) == 21
+    logged = data["workout_plan_sessions"][0]
+    assert logged["session_id"] == session_id
+    assert [
+        (ex["exercise_name"], ex["actual_sets"], ex["notes"])
+        for ex in logged["session_exercises"]
+    ] == [
+        ("Push-Up", 3, "Felt strong"),
+        ("Squat", 4, "Challenging but completed"),
+    ]
+    assert all(s["session_exercises"] == [] for s in data["workout_plan_sessions"][1:])
+
 
 def test_get_workout_report_not_found(client, seed_data, app):
     user = seed_data["plan_user"]
@@ -65,3 +115,282 @@ def test_get_workout_report_wrong_user(client, seed_data, app):
     response = client.get(f"/api/reports/workout-plan/{workout_plan.id}")
 
     assert response.status_code == 404
+
+
+def seed_history(session, workout_plan, days=10):
+    "One session a day from 2024-01-01, each logging the first plan exercise."
+    plan_exercise = workout_plan.workout_plan_exercises[0]
+    sessions = [
+        WorkoutSession(
+            workout_plan_id=workout_plan.id,
+            scheduled_at=datetime(2024, 1, 1) + timedelta(days=day),
+            completed_at=datetime(2024, 1, 1, 1) + timedelta(days=day) if day % 2 else None,
+        )
+        for day in range(days)
+    ]
+    session.add_all(sessions)
+    session.flush()
+    session.add_all(
+        SessionExercise(
+            workout_session_id=ws.id,
+            workout_plan_exercise_id=plan_exercise.id,
+            actual_sets=3,
+            actual_reps=10,
+            actual_weight=20.0 + day,
+        )
+        for day, ws in enumerate(sessions)
+    )
+    session.commit()
+    return sessions
+
+
+def test_get_workout_report_window_summary(client, seed_data, app, session):
+    user = seed_data["plan_user"]
+    workout_plan = seed_data["workout_plan"]
+    seed_history(session, workout_plan)
+    token = create_jwt_token(user.id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+
+    response = client.get(
+        f"/api/reports/workout-plan/{workout_plan.id}?from=2024-01-03&to=2024-01-06"
+    )
+
+    assert response.status_code == 200
+    assert "X-Next-Cursor" not in response.headers
+    data = response.get_json()
+    assert [s["scheduled_at"][:10] for s in data["workout_plan_sessions"]] == [
+        "2024-01-06",
+        "2024-01-05",
+        "2024-01-04",
+        "2024-01-03",
+    ]
+    summary = data["summary"]
+    assert summary["total_sessions"] == 4
+    assert summary["completed_sessions"] == 2
+    assert summary["first_scheduled_at"] == "2024-01-03T00:00:00"
+    assert summary["last_scheduled_at"] == "2024-01-06T00:00:00"
+    assert summary["last_completed_at"] == "2024-01-06T01:00:00"
+    assert summary["total_sets"] == 12
+    assert summary["total_reps"] == 120
+    assert summary["total_volume"] == 30 * (22 + 23 + 24 + 25)
+    [exercise] = summary["exercises"]
+    assert exercise["sessions"] == 4
+    assert exercise["max_weight"] == 25.0
+
+
+def test_get_workout_report_pages(client, seed_data, app, session):
+    user = seed_data["plan_user"]
+    workout_plan = seed_data["workout_plan"]
+    seed_history(session, workout_plan)
+    plan_id = workout_plan.id
+    token = create_jwt_token(user.id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+    url = f"/api/reports/workout-plan/{plan_id}?to=2024-12-31&limit=4"
+
+    seen, cursor = [], None
+    while True:
+        response = client.get(url + (f"&cursor={cursor}" if cursor else ""))
+        assert response.status_code == 200
+        data = response.get_json()
+        # The summary always covers the whole window, not just the page
+        assert data["summary"]["total_sessions"] == 10
+        assert len(data["workout_plan_sessions"]) <= 4
+        for workout_session in data["workout_plan_sessions"]:
+            assert len(workout_session["session_exercises"]) == 1
+        seen += [s["scheduled_at"][:10] for s in data["workout_plan_sessions"]]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert seen == [f"2024-01-{day:02d}" for day in range(10, 0, -1)]
+
+
+def test_get_workout_report_invalid_params(client, seed_data, app):
+    user = seed_data["plan_user"]
+    workout_plan = seed_data["workout_plan"]
+    token = create_jwt_token(user.id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+
+    response = client.get(
+        f"/api/reports/workout-plan/{workout_plan.id}?from=soon&limit=0&cursor=x"
+    )
+
+    assert response.status_code == 400
+    assert set(response.get_json()["errors"]) == {"from", "limit", "cursor"}
+
+
+def test_get_workout_report_conditional(client, seed_data, app, session):
+    user = seed_data["plan_user"]
+    plan_id = seed_data["workout_plan"].id
+    session_id = seed_data["workout_session"].id
+    token = create_jwt_token(user.id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+    url = f"/api/reports/workout-plan/{plan_id}"
+
+    first = client.get(url)
+    assert first.status_code == 200
+    assert "no-cache" in first.headers["Cache-Control"]
+    etag = first.headers["ETag"]
+
+    # Dates are too coarse to validate against, so only the ETag counts
+    assert "Last-Modified" not in first.headers
+    response = client.get(
+        url, headers={"If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"}
+    )
+    assert response.status_code == 200
+
+    # Only the plan's version is read, never the session tables
+    with collect_queries() as stats:
+        response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""
+    assert response.headers["ETag"] == etag
+    assert stats.count == 1
+    assert not any("workout_sessions" in shape for shape in stats.shapes)
+
+    # Served from the report cache
+    with assert_max_queries(1):
+        cached = client.get(url)
+    assert cached.data == first.data
+
+    # Other parameters are a different representation
+    paged = client.get(url + "?limit=1", headers={"If-None-Match": etag})
+    assert paged.status_code == 200
+    assert paged.headers["ETag"] != etag
+
+    response = client.patch(
+        f"/api/workout-sessions/{plan_id}/{session_id}",
+        json={"completed_at": "2024-03-01T10:00:00"},
+    )
+    assert response.status_code == 200
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    [logged] = [
+        s for s in response.get_json()["workout_plan_sessions"] if s["session_id"] == session_id
+    ]
+    assert logged["completed_at"] == "2024-03-01T10:00:00"
+
+
+def test_get_workout_report_etag_follows_catalog(client, seed_data, app, session):
+    """Renaming an exercise changes the names in the report, so its ETag."""
+    user = seed_data["plan_user"]
+    plan_id = seed_data["workout_plan"].id
+    token = create_jwt_token(user.id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+    url = f"/api/reports/workout-plan/{plan_id}"
+
+    etag = client.get(url).headers["ETag"]
+    session.query(Exercise).filter_by(name="Push-Up").one().name = "Press-Up"
+    session.commit()
+
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    names = [ex["name"] for ex in response.get_json()["workout_plan_exercises"]]
+    assert names == ["Press-Up", "Squat"]
+
+
+def test_plan_writes_bump_data_version(client, seed_data, app, session):
+    user = seed_data["plan_user"]
+    plan_id = seed_data["workout_plan"].id
+    token = create_jwt_token(user.id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+
+    def version():
+        return WorkoutPlan.get_data_version(user.id, plan_id).data_version
+
+    versions = [version()]
+    client.post(f"/api/workout-sessions/{plan_id}", json={"scheduled_at": "2024-01-01"})
+    versions.append(version())
+    client.delete("/api/workout-sessions", json={"to": "2024-12-31"})
+    versions.append(version())
+    client.patch(f"/api/workout-plans/{plan_id}", json={"name": "Renamed"})
+    versions.append(version())
+
+    assert versions == sorted(set(versions))
+    assert len(versions) == 4
+
+
+def test_sized_lru_cache_accounting():
+    cache = SizedLRUCache(max_bytes=10)
+
+    cache.set("a", "A", 4)
+    cache.set("b", "B", 4)
+    assert cache.get("a") == "A"
+    cache.set("c", "C", 4)
+
+    # "b" was least recently used
+    assert cache.get("b") is None
+    assert cache.stats()["bytes"] == 8
+    assert cache.stats()["evictions"] == 1
+
+    cache.set("a", "AA", 6)
+    assert cache.stats()["bytes"] == 10
+    cache.set("huge", "H", 11)
+    assert cache.get("huge") is None
+    assert len(cache) == 2
+
+
+def test_concurrent_report_requests_coalesce(client, seed_data, app, monkeypatch):
+    user = seed_data["plan_user"]
+    plan_id = seed_data["workout_plan"].id
+    token = create_jwt_token(user.id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+    client.get("/api/workout-plans")
+    plan = workout_report.get_report_plan(user.id, plan_id)
+    requests = 8
+
+    # Keep the threads off the test's single connection, and hold the build
+    # open until every other request is waiting on it
+    monkeypatch.setattr(
+        WorkoutPlan, "get_data_version", classmethod(lambda cls, *args: plan)
+    )
+    builds = []
+
+    def build_plan_report(plan, **query):
+        builds.append(query)
+        wait_for(lambda: report_flight.stats()["coalesced"] == requests - 1)
+        return {"workout_plan_id": plan.id}, None
+
+    monkeypatch.setattr(workout_report, "build_plan_report", build_plan_report)
+
+    def fetch(_):
+        with app.test_client() as thread_client:
+            thread_client.set_cookie(key="jwt_token", value=token, domain="localhost")
+            return thread_client.get(f"/api/reports/workout-plan/{plan_id}")
+
+    with ThreadPoolExecutor(max_workers=requests) as pool:
+        responses = list(pool.map(fetch, range(requests)))
+
+    assert len(builds) == 1
+    assert [response.status_code for response in responses] == [200] * requests
+    assert {response.data for response in responses} == {responses[0].data}
+    assert report_flight.stats() == {
+        "calls": 1,
+        "coalesced": requests - 1,
+        "in_flight": 0,
+    }
+
+
+def test_single_flight_shares_errors():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def fail():
+        release.wait(5)
+        raise ValueError("boom")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(flight.do, "key", fail)
+        wait_for(lambda: flight.stats()["in_flight"] == 1)
+        follower = pool.submit(flight.do, "key", lambda: "not called")
+        wait_for(lambda: flight.stats()["coalesced"] == 1)
+        release.set()
+
+        assert follower.exception() is leader.exception()
+    assert isinstance(leader.exception(), ValueError)
+
+    # Finished calls are not remembered
+    assert flight.do("key", lambda: "again") == "again"
+    assert flight.stats() == {"calls": 2, "coalesced": 1, "in_flight": 0}
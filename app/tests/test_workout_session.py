@@ -1,7 +1,14 @@
 import json
+from datetime import datetime, timedelta
 
-from ..models import WorkoutSession
-from .utils.test_utilities import create_jwt_token
+from ..models import (
+    Exercise,
+    SessionExercise,
+    WorkoutPlan,
+    WorkoutPlanExercise,
+    WorkoutSession,
+)
+from .utils.test_utilities import assert_max_queries, create_jwt_token
 
 
 def auth_headers(token):
@@ -44,6 +51,85 @@ def test_list_workout_sessions_no_plan(client, seed_data, app):
     assert response.get_json()["message"] == "No workout plans found for the user."
 
 
+def add_sessions(session, user, count, start=datetime(2024, 1, 1)):
+    plans = [WorkoutPlan(name=f"Plan {i}", user_id=user.id) for i in range(3)]
+    session.add_all(plans)
+    session.flush()
+    session.add_all(
+        WorkoutSession(
+            workout_plan_id=plans[i % 3].id, scheduled_at=start + timedelta(days=i)
+        )
+        for i in range(count)
+    )
+    session.commit()
+
+
+def test_list_workout_sessions_paginates_newest_first(client, seed_data, app, session):
+    user = seed_data["plan_user"]
+    add_sessions(session, user, 25)
+    # Unscheduled sessions come last, including across a page boundary
+    session.add_all(
+        WorkoutSession(workout_plan_id=seed_data["workout_plan"].id) for _ in range(3)
+    )
+    session.commit()
+    token = create_jwt_token(user.id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+
+    seen = []
+    cursor = None
+    while True:
+        url = "/api/workout-sessions?limit=13" + (f"&cursor={cursor}" if cursor else "")
+        response = client.get(url)
+        assert response.status_code == 200
+        seen.extend(response.get_json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert len(seen) == 29
+    assert len({ws["id"] for ws in seen}) == 29
+    scheduled = [ws["scheduled_at"] for ws in seen]
+    assert scheduled[-3:] == [None, None, None]
+    assert scheduled[:-3] == sorted(scheduled[:-3], reverse=True)
+    assert {ws["workout_name"] for ws in seen} == {
+        "Full Body Plan", "Plan 0", "Plan 1", "Plan 2"
+    }
+
+
+def test_list_workout_sessions_date_range(client, seed_data, app, session):
+    user = seed_data["plan_user"]
+    add_sessions(session, user, 10)
+    token = create_jwt_token(user.id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+
+    response = client.get("/api/workout-sessions?from=2024-01-03&to=2024-01-05")
+    assert response.status_code == 200
+    assert [ws["scheduled_at"][:10] for ws in response.get_json()] == [
+        "2024-01-05", "2024-01-04", "2024-01-03"
+    ]
+
+
+def test_list_workout_sessions_invalid_params(client, seed_data, app):
+    token = create_jwt_token(seed_data["plan_user"].id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+
+    response = client.get("/api/workout-sessions?from=soon&limit=0&cursor=abc")
+    assert response.status_code == 400
+    assert set(response.get_json()["errors"]) == {"from", "limit", "cursor"}
+
+
+def test_list_workout_sessions_single_query(client, seed_data, app, session):
+    user = seed_data["plan_user"]
+    add_sessions(session, user, 30)
+    token = create_jwt_token(user.id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+    client.get("/api/workout-sessions")
+
+    with assert_max_queries(1):
+        response = client.get("/api/workout-sessions")
+    assert len(response.get_json()) == 31
+
+
 def test_get_workout_session_found(client, seed_data, app):
     user = seed_data["plan_user"]
     plan = seed_data["workout_plan"]
@@ -61,6 +147,41 @@ def test_get_workout_session_found(client, seed_data, app):
     assert len(data["session_exercises"]) >= 1
 
 
+def test_get_workout_session_query_count_is_fixed(client, seed_data, app, session):
+    user = seed_data["plan_user"]
+    plan = seed_data["workout_plan"]
+    workout_session = seed_data["workout_session"]
+    exercises = [Exercise(name=f"Extra {i}") for i in range(10)]
+    session.add_all(exercises)
+    session.flush()
+    plan_exercises = [
+        WorkoutPlanExercise(workout_plan_id=plan.id, exercise_id=e.id) for e in exercises
+    ]
+    session.add_all(plan_exercises)
+    session.flush()
+    session.add_all(
+        SessionExercise(
+            workout_session_id=workout_session.id, workout_plan_exercise_id=wp_ex.id
+        )
+        for wp_ex in plan_exercises
+    )
+    session.commit()
+    url = f"/api/workout-sessions/{plan.id}/{workout_session.id}"
+
+    token = create_jwt_token(user.id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+    client.get(url)
+    session.expunge_all()
+
+    # Session, then session exercises joined to plan exercises and exercises
+    with assert_max_queries(2):
+        response = client.get(url)
+    assert response.status_code == 200
+    session_exercises = response.get_json()[0]["workout_session"]["session_exercises"]
+    assert len(session_exercises) == 12
+    assert all(ws_ex["name"] for ws_ex in session_exercises)
+
+
 def test_get_workout_session_not_found(client, seed_data, app):
     user = seed_data["plan_user"]
     plan = seed_data["workout_plan"]
@@ -94,6 +215,79 @@ def test_delete_workout_session_found(client, seed_data, app, session):
     assert deleted is None
 
 
+def test_bulk_delete_workout_sessions_by_range(client, seed_data, app, session):
+    user = seed_data["plan_user"]
+    add_sessions(session, user, 10)
+    other_plan = WorkoutPlan(name="Other", user_id=seed_data["no_plan_user"].id)
+    session.add(other_plan)
+    session.flush()
+    session.add(
+        WorkoutSession(workout_plan_id=other_plan.id, scheduled_at=datetime(2024, 1, 4))
+    )
+    session.commit()
+    token = create_jwt_token(user.id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+    client.get("/api/workout-sessions")
+
+    # Logged exercises, one DELETE, the stats refresh when any were logged
+    # and one data version bump for the plans that lost sessions
+    with assert_max_queries(5):
+        response = client.delete(
+            "/api/workout-sessions", json={"from": "2024-01-03", "to": "2024-01-05"}
+        )
+    assert response.status_code == 200
+    assert response.get_json()["deleted"] == 3
+
+    remaining = session.query(WorkoutSession.scheduled_at).all()
+    assert len(remaining) == 9
+    # Another user's session in the same range is untouched
+    assert sum(1 for (at,) in remaining if at == datetime(2024, 1, 4)) == 1
+
+
+def test_bulk_delete_workout_sessions_by_ids(client, seed_data, app, session):
+    user = seed_data["plan_user"]
+    workout_session = seed_data["workout_session"]
+    session_id = workout_session.id
+    other_plan = WorkoutPlan(name="Other", user_id=seed_data["no_plan_user"].id)
+    session.add(other_plan)
+    session.flush()
+    other_session = WorkoutSession(workout_plan_id=other_plan.id)
+    session.add(other_session)
+    session.commit()
+    other_session_id = other_session.id
+
+    token = create_jwt_token(user.id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+    response = client.delete(
+        "/api/workout-sessions", json={"ids": [session_id, other_session_id]}
+    )
+    assert response.status_code == 200
+    assert response.get_json()["deleted"] == 1
+
+    session.expire_all()
+    assert session.query(WorkoutSession).filter_by(id=session_id).count() == 0
+    assert session.query(WorkoutSession).filter_by(id=other_session_id).count() == 1
+    assert (
+        session.query(SessionExercise).filter_by(workout_session_id=session_id).count()
+        == 0
+    )
+
+
+def test_bulk_delete_workout_sessions_invalid(client, seed_data, app):
+    token = create_jwt_token(seed_data["plan_user"].id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+
+    response = client.delete("/api/workout-sessions", json={})
+    assert response.status_code == 400
+    assert "Provide 'ids'" in response.get_json()["message"]
+
+    response = client.delete(
+        "/api/workout-sessions", json={"ids": ["1"], "to": "someday"}
+    )
+    assert response.status_code == 400
+    assert set(response.get_json()["errors"]) == {"ids", "to"}
+
+
 def test_delete_workout_session_not_found(client, seed_data, app):
     user = seed_data["plan_user"]
     plan = seed_data["workout_plan"]
@@ -236,6 +430,91 @@ def test_update_workout_session_valid(client, seed_data, app, session):
     assert updated.scheduled_at.isoformat().startswith("2025-07-07")
 
 
+def test_update_workout_session_batches_exercises(client, seed_data, app, session):
+    user = seed_data["plan_user"]
+    plan = seed_data["workout_plan"]
+    workout_session = seed_data["workout_session"]
+    existing = seed_data["plan_exercises"][0]
+    exercises = [Exercise(name=f"Extra {i}") for i in range(28)]
+    session.add_all(exercises)
+    session.flush()
+    plan_exercises = [
+        WorkoutPlanExercise(workout_plan_id=plan.id, exercise_id=e.id) for e in exercises
+    ]
+    session.add_all(plan_exercises)
+    session.commit()
+    new_ids = [wp_ex.id for wp_ex in plan_exercises]
+    url = f"/api/workout-sessions/{plan.id}/{workout_session.id}"
+    session_id = workout_session.id
+
+    payload = {
+        "scheduled_at": "2025-07-07T10:00:00",
+        "exercises": [{"workout_plan_exercise_id": existing.id, "notes": "Updated"}]
+        + [
+            {"workout_plan_exercise_id": id, "actual_sets": 5, "actual_reps": 5}
+            for id in new_ids
+        ],
+    }
+    token = create_jwt_token(user.id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+    client.get(f"/api/workout-sessions/{plan.id}/{session_id}")
+    session.expunge_all()
+
+    # Session, plan exercise ids, existing session exercises, the session
+    # row itself, one UPDATE and one INSERT for all exercises, then the
+    # logged exercises, the two statements refreshing their stats, the
+    # plan data version bump and the change log lock and entries
+    with assert_max_queries(12):
+        response = client.patch(
+            url, data=json.dumps(payload), content_type="application/json"
+        )
+    assert response.status_code == 200
+
+    rows = {
+        ws_ex.workout_plan_exercise_id: ws_ex
+        for ws_ex in session.query(SessionExercise).filter_by(
+            workout_session_id=session_id
+        )
+    }
+    assert len(rows) == 30
+    assert rows[existing.id].notes == "Updated"
+    assert rows[existing.id].actual_sets == 3
+    assert all(rows[id].actual_sets == 5 for id in new_ids)
+    assert rows[new_ids[0]].actual_weight == 1.0
+
+
+def test_update_workout_session_reports_first_bad_exercise(client, seed_data, app):
+    user = seed_data["plan_user"]
+    plan = seed_data["workout_plan"]
+    workout_session = seed_data["workout_session"]
+    plan_exercise = seed_data["plan_exercises"][0]
+    url = f"/api/workout-sessions/{plan.id}/{workout_session.id}"
+    token = create_jwt_token(user.id, app)
+    client.set_cookie(key="jwt_token", value=token, domain="localhost")
+
+    exercises = [
+        {"workout_plan_exercise_id": plan_exercise.id},
+        {"workout_plan_exercise_id": 999},
+        {"workout_plan_exercise_id": plan_exercise.id, "actual_sets": "many"},
+    ]
+    response = client.patch(
+        url, data=json.dumps({"exercises": exercises}), content_type="application/json"
+    )
+    assert response.status_code == 400
+    assert response.get_json()["message"] == (
+        "Exercise with id 999 does not exist in workout plan. "
+        "Add exercise to workout plan first."
+    )
+
+    response = client.patch(
+        url,
+        data=json.dumps({"exercises": [exercises[2], exercises[1]]}),
+        content_type="application/json",
+    )
+    assert response.status_code == 400
+    assert "actual_sets" in response.get_json()["errors"]
+
+
 def test_update_workout_session_not_found(client, seed_data, app):
     user = seed_data["plan_user"]
     plan = seed_data["workout_plan"]
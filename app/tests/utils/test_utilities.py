@@ -1,7 +1,24 @@
 import jwt
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 
+from app.utils.query_stats import collect_queries
+
+
 # Helper function to create a JWT token
 def create_jwt_token(user_id, app):
     payload = {"id": user_id, "exp": datetime.now() + timedelta(hours=1)}
-    return jwt.encode(payload, app.config["SECRET_KEY"], algorithm="HS256")
\ No newline at end of file
+    return jwt.encode(payload, app.config["SECRET_KEY"], algorithm="HS256")
+
+
+@contextmanager
+def assert_max_queries(max_count):
+    """Fail if the block issues more than max_count SQL statements."""
+    with collect_queries() as stats:
+        yield stats
+    statements = "\n".join(
+        f"  {count} x {statement}" for statement, count in stats.shapes.items()
+    )
+    assert stats.count <= max_count, (
+        f"Expected at most {max_count} queries, got {stats.count}:\n{statements}"
+    )
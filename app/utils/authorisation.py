@@ -2,6 +2,7 @@ from functools import wraps
 import jwt
 from flask import current_app, jsonify, request
 from ..models import User, db
+from .identity_cache import cache_identity, identity_cache, identity_for_user
 
 def token_required(f):
     @wraps(f)
@@ -22,7 +23,12 @@ def token_required(f):
         
         if not token:
             return jsonify({"message": "Token is missing!"}), 401
-        
+
+        # Tokens seen recently were already verified - skip decode and lookup
+        current_user = identity_cache.get(token)
+        if current_user is not None:
+            return f(current_user, *args, **kwargs)
+
         try:
             # Decode token - jwt automatically checks 'exp' claim
             data = jwt.decode(
@@ -30,12 +36,13 @@ def token_required(f):
                 current_app.config["SECRET_KEY"], 
                 algorithms=["HS256"]
             )
-            current_user = (
-                db.session.query(User).filter_by(id=data.get("id")).one_or_none()
-            )
-            if not current_user:
+            user = db.session.query(User).filter_by(id=data.get("id")).one_or_none()
+            if not user:
                 return jsonify({"message": "User not found"}), 401
-                
+
+            current_user = identity_for_user(user)
+            cache_identity(token, current_user, exp=data.get("exp"))
+
         except jwt.ExpiredSignatureError:
             return jsonify({"message": "Token has expired"}), 401
         except jwt.InvalidTokenError:
@@ -0,0 +1,248 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Bounded, thread-safe in-process cache.
+
+    Entries expire after ``ttl`` seconds (or a per-entry ttl passed to ``set``)
+    and the least recently used entry is evicted once ``maxsize`` is reached.
+    Hit/miss/eviction counters are kept for ``stats()``.
+    """
+
+    def __init__(self, maxsize=1024, ttl=300, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def configure(self, maxsize=None, ttl=None):
+        "Change the size limit and/or default ttl, dropping existing entries."
+        with self._lock:
+            if maxsize is not None:
+                self.maxsize = maxsize
+            if ttl is not None:
+                self.ttl = ttl
+            self._data.clear()
+
+    def get(self, key, default=None):
+        "Return the cached value for key, or default if missing or expired."
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        "Store value under key, evicting the least recently used entries if full."
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if self.maxsize <= 0 or ttl <= 0:
+            return
+
+        with self._lock:
+            self._data[key] = (self._clock() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key, default=None):
+        "Remove key from the cache and return its value."
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def discard_where(self, predicate):
+        "Remove every entry whose value matches predicate. Returns the count."
+        with self._lock:
+            keys = [key for key, (_, value) in self._data.items() if predicate(value)]
+            for key in keys:
+                del self._data[key]
+        return len(keys)
+
+    def clear(self):
+        "Remove all entries and reset the counters."
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self):
+        "Return a snapshot of the cache counters."
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class SizedLRUCache:
+    """
+    Thread-safe in-process LRU cache bounded by the total size of its values.
+
+    Callers pass each value's size in bytes to ``set``; the least recently
+    used entries are evicted until the total fits in ``max_bytes``. Values
+    larger than the whole budget are not cached.
+    """
+
+    def __init__(self, max_bytes=64 * 2**20):
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def configure(self, max_bytes):
+        "Change the size budget, dropping existing entries."
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._data.clear()
+            self.bytes = 0
+
+    def get(self, key, default=None):
+        "Return the cached value for key, or default if missing."
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, size):
+        "Store value under key, evicting the least recently used entries to fit."
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._data.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[0]
+            self._data[key] = (size, value)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                evicted_size, _ = self._data.popitem(last=False)[1]
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        "Remove all entries and reset the counters."
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self):
+        "Return a snapshot of the cache counters."
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls for the same key into one.
+
+    The first caller of ``do`` for a key runs the function; callers arriving
+    while it runs wait for it and get the same result, or the same
+    exception. Nothing is kept once the call finishes - pair it with a cache
+    for that. Leader/coalesced counters are kept for ``stats()``.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.coalesced = 0
+
+    def do(self, key, func):
+        "Return func(), shared with any concurrent call for key."
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def clear(self):
+        "Reset the counters. Calls in flight are left to finish."
+        with self._lock:
+            self.calls = 0
+            self.coalesced = 0
+
+    def stats(self):
+        "Return a snapshot of the counters."
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls),
+            }
+
+
+class _Call:
+    "One SingleFlight call and the callers waiting on it."
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
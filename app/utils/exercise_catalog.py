@@ -0,0 +1,178 @@
+import hashlib
+import json
+import threading
+import time
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from ..models import CacheVersion, Exercise, db
+
+# Row of cache_versions that exercise writes bump
+CATALOG_CACHE = "exercise_catalog"
+# Fields of each exercise in listings, filtered or not
+LIST_FIELDS = ("id", "name", "category", "muscle_group")
+# How stale another process's writes can leave this process's catalog
+DEFAULT_CHECK_INTERVAL = 5
+
+
+def _etag(payload):
+    return hashlib.sha256(payload).hexdigest()[:32]
+
+
+def _dumps(data):
+    return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+
+class CatalogSnapshot:
+    """
+    Immutable view of the exercises table at one catalog version.
+
+    The list payload and every detail payload are serialized once, when the
+    snapshot is built, so requests only copy bytes.
+    """
+
+    __slots__ = ("version", "exercises", "list_payload", "list_etag", "_details")
+
+    def __init__(self, version, rows):
+        self.version = version
+        self.exercises = tuple(
+            {
+                "id": row.id,
+                "name": row.name,
+                "description": row.description,
+                "category": row.category,
+                "muscle_group": row.muscle_group,
+            }
+            for row in rows
+        )
+        self.list_payload = _dumps(
+            [{field: e[field] for field in LIST_FIELDS} for e in self.exercises]
+        )
+        self.list_etag = _etag(self.list_payload)
+        self._details = {}
+        for exercise in self.exercises:
+            payload = _dumps(exercise)
+            self._details[exercise["id"]] = (payload, _etag(payload))
+
+    def __len__(self):
+        return len(self.exercises)
+
+    def detail(self, exercise_id):
+        "Return (payload, etag) for one exercise, or None if it does not exist."
+        return self._details.get(exercise_id)
+
+
+class ExerciseCatalog:
+    """
+    Process-local cache of the exercise catalog.
+
+    The catalog is read-mostly, so it is loaded once and served from memory
+    until the version is bumped. Exercise writes made through the ORM bump
+    the version automatically, at once in this process and, through the
+    shared CacheVersion row they bump in their transaction, in every other
+    process within check_interval seconds. Bulk Core writes must call
+    CacheVersion.bump(CATALOG_CACHE) before committing and bump_version()
+    after.
+    """
+
+    def __init__(self, check_interval=DEFAULT_CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self._version = 0
+        self._shared_version = None
+        self._checked_at = None
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def configure(self, check_interval):
+        self.check_interval = check_interval
+
+    @property
+    def version(self):
+        self._check_shared_version()
+        return self._version
+
+    def _check_shared_version(self):
+        """
+        Bump the version if another process wrote to the catalog, reading
+        the shared version at most once every check_interval seconds.
+        """
+        now = time.monotonic()
+        checked_at = self._checked_at
+        if checked_at is not None and now - checked_at < self.check_interval:
+            return
+        shared_version = CacheVersion.get(CATALOG_CACHE)
+        with self._lock:
+            self._checked_at = now
+            if shared_version != self._shared_version:
+                self._shared_version = shared_version
+                self._version += 1
+
+    def bump_version(self):
+        "Mark the current snapshot stale; the next read reloads it."
+        with self._lock:
+            self._version += 1
+
+    def snapshot(self):
+        "Return the current snapshot, loading it if the version moved on."
+        self._check_shared_version()
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == self._version:
+            return snapshot
+
+        with self._lock:
+            version = self._version
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.version != version:
+                rows = db.session.execute(
+                    select(
+                        Exercise.id,
+                        Exercise.name,
+                        Exercise.description,
+                        Exercise.category,
+                        Exercise.muscle_group,
+                    ).order_by(Exercise.id)
+                ).all()
+                snapshot = CatalogSnapshot(version, rows)
+                self._snapshot = snapshot
+        return snapshot
+
+    def clear(self):
+        "Drop the snapshot entirely."
+        with self._lock:
+            self._snapshot = None
+            self._shared_version = None
+            self._checked_at = None
+            self._version += 1
+
+
+exercise_catalog = ExerciseCatalog()
+
+
+def init_exercise_catalog(app):
+    "Set how often the catalog checks for other processes' writes from the app config."
+    exercise_catalog.configure(
+        app.config.get("EXERCISE_CATALOG_CHECK_INTERVAL", DEFAULT_CHECK_INTERVAL)
+    )
+
+
+@event.listens_for(Exercise, "after_insert")
+@event.listens_for(Exercise, "after_update")
+@event.listens_for(Exercise, "after_delete")
+def _exercise_written(mapper, connection, target):
+    exercise_catalog.bump_version()
+    session = Session.object_session(target)
+    # Once per transaction, on the flush's connection so it commits with it
+    if session is None or not session.info.get("exercise_catalog_dirty"):
+        CacheVersion.bump(CATALOG_CACHE, connection)
+    if session is not None:
+        session.info["exercise_catalog_dirty"] = True
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_soft_rollback")
+def _exercise_transaction_ended(session, *args):
+    # A snapshot loaded mid-transaction may hold rows that were never
+    # committed (or miss ones that now are), so reload once it ends.
+    if session.info.pop("exercise_catalog_dirty", False):
+        exercise_catalog.bump_version()
@@ -0,0 +1,89 @@
+import csv
+import json
+import os
+from collections import namedtuple
+
+from sqlalchemy import literal_column, or_
+from sqlalchemy.dialects.postgresql import insert
+
+from ..models import CacheVersion, Exercise, db
+from .exercise_catalog import CATALOG_CACHE, exercise_catalog
+
+CATALOG_FIELDS = ("name", "description", "category", "muscle_group")
+DEFAULT_BATCH_SIZE = 5000
+
+LoadResult = namedtuple("LoadResult", ["inserted", "updated", "skipped"])
+
+
+def read_catalog(path):
+    """
+    Read exercises from a .json (list of objects) or .csv (header row) file.
+    Raises ValueError if the format is unknown or a row has no name.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, newline="", encoding="utf-8") as f:
+        if extension == ".json":
+            rows = json.load(f)
+        elif extension == ".csv":
+            rows = list(csv.DictReader(f))
+        else:
+            raise ValueError(f"Unsupported catalog format '{extension}'.")
+
+    exercises = []
+    for line, row in enumerate(rows, start=1):
+        name = (row.get("name") or "").strip()
+        if not name:
+            raise ValueError(f"Exercise {line} in {path} has no name.")
+        exercise = {field: row.get(field) or None for field in CATALOG_FIELDS}
+        exercise["name"] = name
+        exercises.append(exercise)
+    return exercises
+
+
+def load_exercises(exercises, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Upsert exercises keyed on their unique name, batch_size rows per statement.
+
+    New names are inserted, existing names whose fields changed are updated
+    and unchanged rows are left alone, so loading the same catalog again is
+    a no-op. Everything is committed as one transaction.
+    """
+    # Later duplicates of a name win, as they would with row-by-row upserts
+    rows = list({exercise["name"]: exercise for exercise in exercises}.values())
+    table = Exercise.__table__
+    inserted = updated = 0
+
+    statement = insert(table)
+    excluded = statement.excluded
+    statement = statement.on_conflict_do_update(
+        constraint="uq_exercises_name",
+        set_={field: excluded[field] for field in CATALOG_FIELDS[1:]},
+        # Only touch rows that actually changed
+        where=or_(
+            *(
+                table.c[field].is_distinct_from(excluded[field])
+                for field in CATALOG_FIELDS[1:]
+            )
+        ),
+    ).returning(literal_column("xmax = 0").label("inserted"))
+
+    for start in range(0, len(rows), batch_size):
+        batch = [
+            {field: row.get(field) for field in CATALOG_FIELDS}
+            for row in rows[start:start + batch_size]
+        ]
+        # xmax is 0 for freshly inserted rows and set for updated ones;
+        # skipped rows are not returned at all.
+        for (was_inserted,) in db.session.execute(statement, batch):
+            if was_inserted:
+                inserted += 1
+            else:
+                updated += 1
+
+    if inserted or updated:
+        CacheVersion.bump(CATALOG_CACHE)
+    db.session.commit()
+    if inserted or updated:
+        exercise_catalog.bump_version()
+
+    return LoadResult(inserted, updated, len(exercises) - inserted - updated)
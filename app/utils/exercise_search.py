@@ -0,0 +1,215 @@
+import bisect
+import heapq
+import re
+import threading
+from collections import defaultdict
+
+from flask import current_app
+from sqlalchemy import bindparam, func, or_, select, text
+
+from ..models import Exercise, db
+from .exercise_catalog import exercise_catalog
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Relative weight of a term found in the name vs only in the description, and
+# how much a prefix or fuzzy (misspelt) match is worth next to an exact one.
+NAME_WEIGHT = 2.0
+DESCRIPTION_WEIGHT = 1.0
+PREFIX_FACTOR = 0.8
+FUZZY_FACTOR = 0.6
+FUZZY_THRESHOLD = 0.3
+MIN_PREFIX_LENGTH = 2
+
+
+def tokenize(value):
+    return TOKEN_RE.findall(value.lower()) if value else []
+
+
+def trigrams(term):
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class InvertedIndex:
+    """
+    In-memory search index over the exercise catalog.
+
+    Used when the database has no full-text index (e.g. non-Postgres test
+    runs). Every query token must match a name or description term, exactly,
+    as a prefix, or - if nothing else matches - by trigram similarity.
+    """
+
+    def __init__(self, exercises):
+        self._exercises = {e["id"]: e for e in exercises}
+
+        postings = defaultdict(dict)
+        for exercise in exercises:
+            for term in tokenize(exercise["description"]):
+                postings[term][exercise["id"]] = DESCRIPTION_WEIGHT
+            for term in tokenize(exercise["name"]):
+                postings[term][exercise["id"]] = NAME_WEIGHT
+
+        self._terms = sorted(postings)
+        self._postings = [postings[term] for term in self._terms]
+
+        self._trigrams = defaultdict(list)
+        for position, term in enumerate(self._terms):
+            for gram in trigrams(term):
+                self._trigrams[gram].append(position)
+
+    def _expand(self, token):
+        "Yield (postings, factor) for every index term the token matches."
+        start = bisect.bisect_left(self._terms, token)
+        end = start
+        if len(token) >= MIN_PREFIX_LENGTH:
+            end = bisect.bisect_right(self._terms, token + "\uffff", lo=start)
+        elif start < len(self._terms) and self._terms[start] == token:
+            end = start + 1
+
+        if start < end:
+            for position in range(start, end):
+                factor = 1.0 if self._terms[position] == token else PREFIX_FACTOR
+                yield self._postings[position], factor
+            return
+
+        # Nothing starts with the token - fall back to similar looking terms
+        grams = trigrams(token)
+        shared = defaultdict(int)
+        for gram in grams:
+            for position in self._trigrams.get(gram, ()):
+                shared[position] += 1
+        for position, count in shared.items():
+            term_grams = len(trigrams(self._terms[position]))
+            similarity = count / (len(grams) + term_grams - count)
+            if similarity >= FUZZY_THRESHOLD:
+                yield self._postings[position], FUZZY_FACTOR * similarity
+
+    def search(self, query, limit):
+        "Return up to limit (exercise, score) pairs, best match first."
+        scores = None
+        for token in dict.fromkeys(tokenize(query)):
+            token_scores = {}
+            for postings, factor in self._expand(token):
+                for exercise_id, weight in postings.items():
+                    score = weight * factor
+                    if score > token_scores.get(exercise_id, 0):
+                        token_scores[exercise_id] = score
+
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {
+                    exercise_id: scores[exercise_id] + score
+                    for exercise_id, score in token_scores.items()
+                    if exercise_id in scores
+                }
+            if not scores:
+                return []
+
+        if not scores:
+            return []
+        best = heapq.nlargest(
+            limit, scores.items(), key=lambda item: (item[1], -item[0])
+        )
+        return [(self._exercises[exercise_id], score) for exercise_id, score in best]
+
+
+_index_lock = threading.Lock()
+_index = None
+_trigram_support = {}
+_search_statements = {}
+
+
+def catalog_index():
+    "Return the inverted index for the current catalog snapshot."
+    global _index
+
+    snapshot = exercise_catalog.snapshot()
+    index = _index
+    if index is None or index[0] is not snapshot:
+        with _index_lock:
+            index = _index
+            if index is None or index[0] is not snapshot:
+                index = (snapshot, InvertedIndex(snapshot.exercises))
+                _index = index
+    return index[1]
+
+
+def has_trigram_support():
+    "True if pg_trgm is installed in the database (checked once per engine)."
+    url = str(db.engine.url)
+    if url not in _trigram_support:
+        _trigram_support[url] = (
+            db.session.execute(
+                text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            ).scalar()
+            is not None
+        )
+    return _trigram_support[url]
+
+
+def search_backend():
+    backend = current_app.config.get("EXERCISE_SEARCH_BACKEND", "auto")
+    if backend == "auto":
+        return "postgres" if db.engine.dialect.name == "postgresql" else "memory"
+    return backend
+
+
+def search_statement(fuzzy):
+    """
+    Return the ranked full-text search, fuzzy matching names if asked.
+
+    Built once with bound parameters: the search is hit on every keystroke,
+    and rebuilding the query each time cost more than running it.
+    """
+    statement = _search_statements.get(fuzzy)
+    if statement is None:
+        exercises = Exercise.__table__
+        ts_query = func.to_tsquery("simple", bindparam("query"))
+        vector = exercises.c.search_vector
+        rank = func.ts_rank(vector, ts_query)
+        condition = vector.op("@@")(ts_query)
+
+        if fuzzy:
+            name = func.lower(exercises.c.name)
+            phrase = bindparam("phrase")
+            rank = rank + func.similarity(name, phrase)
+            condition = or_(condition, name.op("%")(phrase))
+
+        statement = (
+            select(
+                exercises.c.id,
+                exercises.c.name,
+                exercises.c.description,
+                exercises.c.category,
+                exercises.c.muscle_group,
+            )
+            .where(condition)
+            .order_by(rank.desc(), exercises.c.name, exercises.c.id)
+            .limit(bindparam("limit"))
+        )
+        _search_statements[fuzzy] = statement
+    return statement
+
+
+def search_exercises(query, limit):
+    "Search exercise names and descriptions, best match first."
+    if search_backend() == "memory":
+        return [exercise for exercise, _ in catalog_index().search(query, limit)]
+
+    tokens = list(dict.fromkeys(tokenize(query)))
+    if not tokens:
+        return []
+
+    # Prefix match every token, e.g. "bench pre" -> 'bench':* & 'pre':*
+    params = {
+        "query": " & ".join(f"'{token}':*" for token in tokens),
+        "limit": limit,
+    }
+    fuzzy = has_trigram_support()
+    if fuzzy:
+        params["phrase"] = " ".join(tokens)
+
+    rows = db.session.execute(search_statement(fuzzy), params)
+    return [row._asdict() for row in rows]
@@ -0,0 +1,151 @@
+import hashlib
+from functools import wraps
+
+from flask import current_app, jsonify, request
+
+from ..models import IdempotencyKey, db
+
+DEFAULT_IDEMPOTENCY_KEY_TTL = 24 * 60 * 60
+# Longer than any request can run, so a live request is never taken over
+DEFAULT_IDEMPOTENCY_KEY_LEASE = 2 * 60
+MAX_KEY_LENGTH = 255
+
+
+def idempotency_key_ttl():
+    return current_app.config.get("IDEMPOTENCY_KEY_TTL", DEFAULT_IDEMPOTENCY_KEY_TTL)
+
+
+def idempotency_key_lease():
+    return current_app.config.get(
+        "IDEMPOTENCY_KEY_LEASE", DEFAULT_IDEMPOTENCY_KEY_LEASE
+    )
+
+
+def request_fingerprint():
+    "Hash of the method, path and body, to tell a retry from a reused key."
+    digest = hashlib.sha256()
+    for part in (request.method, request.full_path):
+        digest.update(part.encode("utf-8") + b"\0")
+    digest.update(request.get_data())
+    return digest.hexdigest()
+
+
+def idempotent(f):
+    """
+    Honour an Idempotency-Key header on a write handler; goes under
+    token_required. The first request with a key runs the handler and its
+    response is stored with the handler's writes, and retries within
+    IDEMPOTENCY_KEY_TTL seconds get that response back from one primary key
+    lookup, without running the handler again. Retries that arrive while
+    the first request is still running get a 409, and a key reused for a
+    different request a 422. A request still running after
+    IDEMPOTENCY_KEY_LEASE seconds is taken to have died, and the next retry
+    runs the handler again. Server errors are not stored, so the request
+    can be retried.
+    """
+
+    @wraps(f)
+    def decorated(current_user, *args, **kwargs):
+        key = request.headers.get("Idempotency-Key")
+        if key is None:
+            return f(current_user, *args, **kwargs)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return {
+                "status": "error",
+                "errors": {
+                    "Idempotency-Key": (
+                        f"'Idempotency-Key' must be 1 to {MAX_KEY_LENGTH} characters."
+                    )
+                },
+            }, 400
+
+        ttl = idempotency_key_ttl()
+        fingerprint = request_fingerprint()
+        stored = IdempotencyKey.get(current_user.id, key, ttl)
+        if stored is None or stored.status_code is None:
+            # Committed before the handler runs, so concurrent duplicates
+            # see the claim; only one of them can take it
+            claimed_at = IdempotencyKey.claim(
+                current_user.id, key, fingerprint, ttl, idempotency_key_lease()
+            )
+            db.session.commit()
+            if claimed_at is not None:
+                return run_and_store(f, current_user, key, claimed_at, args, kwargs)
+            stored = IdempotencyKey.get(current_user.id, key, ttl)
+
+        if stored is not None and stored.request_hash != fingerprint:
+            return jsonify(
+                {"message": "This Idempotency-Key was used for a different request."}
+            ), 422
+        # Running, or released by a failed request since the claim above
+        if stored is None or stored.status_code is None:
+            return in_progress_response()
+
+        response = current_app.response_class(
+            stored.response_body,
+            status=stored.status_code,
+            content_type=stored.content_type,
+        )
+        response.headers["Idempotent-Replayed"] = "true"
+        return response
+
+    return decorated
+
+
+def run_and_store(f, current_user, key, claimed_at, args, kwargs):
+    """
+    Run a handler for a claimed key with its commits held back, then store
+    its response and commit both at once, so a crash leaves either the
+    write and its response or neither. The handler runs in a savepoint, so
+    one that returns without committing leaves nothing behind. Releases
+    the key if the handler fails.
+    """
+    savepoint = db.session.begin_nested()
+    try:
+        with db.session().holding_commits() as held:
+            response = current_app.make_response(f(current_user, *args, **kwargs))
+        if response.status_code >= 500:
+            undo(savepoint)
+            IdempotencyKey.release(current_user.id, key, claimed_at)
+            db.session.commit()
+            return response
+
+        if not held["requested"]:
+            savepoint.rollback()
+        stored = IdempotencyKey.complete(
+            current_user.id,
+            key,
+            claimed_at,
+            response.status_code,
+            response.content_type,
+            response.get_data(),
+        )
+        if not stored:
+            # The lease ran out and a retry took the key over; its write wins
+            undo(savepoint)
+            return in_progress_response()
+        if savepoint.is_active:
+            savepoint.commit()
+        db.session.commit()
+        return response
+    except Exception:
+        undo(savepoint)
+        IdempotencyKey.release(current_user.id, key, claimed_at)
+        db.session.commit()
+        raise
+
+
+def undo(savepoint):
+    "Roll back to savepoint, or everything if the handler already rolled back."
+    if savepoint.is_active:
+        savepoint.rollback()
+    else:
+        db.session.rollback()
+
+
+def in_progress_response():
+    response = jsonify(
+        {"message": "A request with this Idempotency-Key is still in progress."}
+    )
+    response.headers["Retry-After"] = "1"
+    return response, 409
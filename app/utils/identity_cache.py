@@ -0,0 +1,52 @@
+import time
+from collections import namedtuple
+
+from sqlalchemy import event
+
+from ..models import User
+from .caching import TTLCache
+
+# Lightweight stand-in for the User row, handed to views as current_user.
+UserIdentity = namedtuple("UserIdentity", ["id", "email", "name"])
+
+DEFAULT_IDENTITY_CACHE_SIZE = 10000
+DEFAULT_IDENTITY_CACHE_TTL = 300
+
+# Decoded token -> UserIdentity. Entries never outlive the token's exp claim.
+identity_cache = TTLCache(
+    maxsize=DEFAULT_IDENTITY_CACHE_SIZE, ttl=DEFAULT_IDENTITY_CACHE_TTL
+)
+
+
+def init_identity_cache(app):
+    "Size the identity cache from the app config."
+    identity_cache.configure(
+        maxsize=app.config.get("IDENTITY_CACHE_SIZE", DEFAULT_IDENTITY_CACHE_SIZE),
+        ttl=app.config.get("IDENTITY_CACHE_TTL", DEFAULT_IDENTITY_CACHE_TTL),
+    )
+
+
+def identity_for_user(user):
+    "Build a UserIdentity from a User row."
+    return UserIdentity(id=user.id, email=user.email, name=user.name)
+
+
+def cache_identity(token, identity, exp=None):
+    "Cache identity for token, capped to the token's remaining lifetime."
+    ttl = None
+    if exp is not None:
+        ttl = exp - time.time()
+        if ttl <= 0:
+            return
+    identity_cache.set(token, identity, ttl=ttl)
+
+
+def invalidate_user(user_id):
+    "Drop every cached token belonging to user_id."
+    return identity_cache.discard_where(lambda identity: identity.id == user_id)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_changed_user(mapper, connection, target):
+    invalidate_user(target.id)
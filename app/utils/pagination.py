@@ -0,0 +1,49 @@
+import base64
+import binascii
+import json
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(values):
+    "Encode the sort key of the last row on a page as an opaque cursor."
+    raw = json.dumps(list(values), separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, size):
+    "Decode a cursor produced by encode_cursor. Raises ValueError if malformed."
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ValueError("'cursor' is not a valid cursor.")
+
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("'cursor' is not a valid cursor.")
+    return values
+
+
+def parse_limit(value, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    "Parse a page size query parameter. Raises ValueError if out of range."
+    if value is None:
+        return default
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("'limit' must be a valid int.")
+    if not 1 <= limit <= maximum:
+        raise ValueError(f"'limit' must be between 1 and {maximum}.")
+    return limit
+
+
+def paginate(rows, limit, sort_key):
+    """
+    Split a query result fetched with ``limit + 1`` rows into the page and
+    the cursor for the next page (None on the last page).
+    """
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    return page, encode_cursor(sort_key(page[-1]))
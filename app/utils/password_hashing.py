@@ -0,0 +1,101 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+DEFAULT_HASH_METHOD = "scrypt"
+DEFAULT_QUEUE_DEPTH = 64
+DEFAULT_RETRY_AFTER = 1
+
+
+class HashingPoolSaturated(Exception):
+    "Raised when every hashing worker is busy and the wait queue is full."
+
+
+class PasswordHasher:
+    """
+    Runs password hashing on a fixed-size thread pool.
+
+    hashlib releases the GIL while hashing, so the workers run in parallel
+    while request threads only wait on the result. At most ``workers`` hashes
+    run at once and at most ``queue_depth`` more may wait; anything beyond
+    that is rejected with HashingPoolSaturated instead of piling up.
+    """
+
+    def __init__(
+        self,
+        workers=None,
+        queue_depth=DEFAULT_QUEUE_DEPTH,
+        method=DEFAULT_HASH_METHOD,
+        retry_after=DEFAULT_RETRY_AFTER,
+    ):
+        self._executor = None
+        self.configure(workers, queue_depth, method, retry_after)
+
+    def configure(
+        self,
+        workers=None,
+        queue_depth=DEFAULT_QUEUE_DEPTH,
+        method=DEFAULT_HASH_METHOD,
+        retry_after=DEFAULT_RETRY_AFTER,
+    ):
+        "Resize the pool. Hashes already running finish on the old pool."
+        previous = self._executor
+
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_depth = queue_depth
+        self.method = method
+        self.retry_after = retry_after
+        self._method_prefix = None
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue_depth)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="password-hash"
+        )
+
+        if previous is not None:
+            previous.shutdown(wait=False)
+
+    def shutdown(self):
+        "Stop the workers once queued hashes have finished."
+        self._executor.shutdown(wait=True)
+
+    def _run(self, fn, *args):
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            raise HashingPoolSaturated()
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: slots.release())
+        return future.result()
+
+    def hash(self, password):
+        "Hash password with the configured method."
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, pw_hash, password):
+        "Check password against a stored hash."
+        return self._run(check_password_hash, pw_hash, password)
+
+    def needs_rehash(self, pw_hash):
+        "True if pw_hash was produced with different method parameters."
+        if self._method_prefix is None:
+            # e.g. "scrypt" -> "scrypt:32768:8:1", as werkzeug stores it
+            self._method_prefix = generate_password_hash("", self.method).split("$")[0]
+        return pw_hash.split("$", 1)[0] != self._method_prefix
+
+
+password_hasher = PasswordHasher()
+
+
+def init_password_hasher(app):
+    "Size the shared hashing pool from the app config."
+    password_hasher.configure(
+        workers=app.config.get("PASSWORD_HASH_WORKERS"),
+        queue_depth=app.config.get("PASSWORD_HASH_QUEUE_DEPTH", DEFAULT_QUEUE_DEPTH),
+        method=app.config.get("PASSWORD_HASH_METHOD", DEFAULT_HASH_METHOD),
+        retry_after=app.config.get("PASSWORD_HASH_RETRY_AFTER", DEFAULT_RETRY_AFTER),
+    )
@@ -0,0 +1,173 @@
+import numpy as np
+from sqlalchemy import BigInteger, cast, func, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+
+from ..models import (
+    SessionExercise,
+    WorkoutPlan,
+    WorkoutPlanExercise,
+    WorkoutSession,
+    db,
+)
+
+DEFAULT_WINDOW = 5
+MAX_WINDOW = 100
+# Charts are a few hundred pixels wide; longer histories are downsampled
+DEFAULT_MAX_POINTS = 1000
+MAX_POINTS = 5000
+SERIES = ("volume", "top_weight", "estimated_1rm")
+
+
+def fetch_progression_columns(user_id, exercise_id):
+    """
+    Get every logged set of an exercise in the user's completed sessions as
+    one row of five arrays - session ids, completed_at in microseconds since
+    the epoch, sets, reps and weight - ordered oldest first and grouped by
+    session. Missing values come back as 0; no history gives None arrays.
+    """
+    order = (WorkoutSession.completed_at, WorkoutSession.id, SessionExercise.id)
+    columns = [
+        WorkoutSession.id,
+        cast(func.extract("epoch", WorkoutSession.completed_at) * 1000000, BigInteger),
+        func.coalesce(SessionExercise.actual_sets, 0),
+        func.coalesce(SessionExercise.actual_reps, 0),
+        func.coalesce(SessionExercise.actual_weight, 0.0),
+    ]
+    return db.session.execute(
+        select(*[func.array_agg(aggregate_order_by(c, *order)) for c in columns])
+        .select_from(SessionExercise)
+        .join(WorkoutSession, SessionExercise.workout_session_id == WorkoutSession.id)
+        .join(
+            WorkoutPlanExercise,
+            SessionExercise.workout_plan_exercise_id == WorkoutPlanExercise.id,
+        )
+        .join(WorkoutPlan, WorkoutSession.workout_plan_id == WorkoutPlan.id)
+        .where(
+            WorkoutPlan.user_id == user_id,
+            WorkoutPlanExercise.exercise_id == exercise_id,
+            WorkoutSession.completed_at.is_not(None),
+        )
+    ).one()
+
+
+def compute_progression(columns, window=DEFAULT_WINDOW, max_points=None):
+    """
+    Turn the arrays from fetch_progression_columns into per-session series
+    of total volume (sets x reps x weight), top weight and estimated one-rep
+    max (Epley, weight x (1 + reps / 30)), each with its trailing
+    window-session rolling mean, plus the least-squares slope of each series
+    per day. completed_at is given to the second.
+
+    Rolling means and slopes use every session; with max_points, only the
+    sessions picked by lttb_indices are returned.
+
+    Each column is copied into a NumPy array once and everything after that
+    is vectorized, apart from LTTB's walk over its buckets; rows of the same
+    session are reduced with reduceat.
+    """
+    session_ids, completed_at, sets, reps, weight = columns
+    if not session_ids:
+        return {
+            "total_points": 0,
+            "completed_at": [],
+            "series": {name: [] for name in SERIES},
+            "rolling_mean": {name: [] for name in SERIES},
+            "trend_per_day": {name: None for name in SERIES},
+        }
+
+    session_ids = np.array(session_ids, dtype=np.int64)
+    sets = np.array(sets, dtype=np.float64)
+    reps = np.array(reps, dtype=np.float64)
+    weight = np.array(weight, dtype=np.float64)
+
+    starts = np.flatnonzero(np.r_[True, session_ids[1:] != session_ids[:-1]])
+    series = np.vstack(
+        [
+            np.add.reduceat(sets * reps * weight, starts),
+            np.maximum.reduceat(weight, starts),
+            np.maximum.reduceat(weight * (1 + reps / 30), starts),
+        ]
+    )
+    times = np.array(completed_at, dtype=np.int64)[starts].astype("datetime64[us]")
+    days = (times - times[0]) / np.timedelta64(1, "D")
+
+    means = rolling_mean(series, window)
+    slopes = trend_slope(days, series)
+    total_points = len(starts)
+    if max_points is not None and total_points > max_points:
+        keep = lttb_indices(days, series, max_points)
+        series, means, times = series[:, keep], means[:, keep], times[keep]
+    return {
+        "total_points": total_points,
+        "completed_at": np.datetime_as_string(times, unit="s").tolist(),
+        "series": dict(zip(SERIES, series.tolist())),
+        "rolling_mean": dict(zip(SERIES, means.tolist())),
+        "trend_per_day": dict(zip(SERIES, slopes)),
+    }
+
+
+def rolling_mean(series, window):
+    """
+    Trailing mean over the last window columns of each row of series; the
+    first window - 1 columns average what is available so far.
+    """
+    count = series.shape[1]
+    totals = np.zeros((series.shape[0], count + 1))
+    np.cumsum(series, axis=1, out=totals[:, 1:])
+    end = np.arange(1, count + 1)
+    start = np.maximum(end - window, 0)
+    return (totals[:, end] - totals[:, start]) / (end - start)
+
+
+def trend_slope(days, series):
+    """
+    Least-squares slope of each row of series against days. None for every
+    row when there are fewer than two distinct days.
+    """
+    offsets = days - days.mean()
+    spread = np.dot(offsets, offsets)
+    if spread == 0:
+        return [None] * series.shape[0]
+    return ((series - series.mean(axis=1, keepdims=True)) @ offsets / spread).tolist()
+
+
+def lttb_indices(x, series, max_points):
+    """
+    Pick max_points (at least 3) columns of series against x with
+    Largest-Triangle-Three-Buckets: keep the first and last point and, from
+    each of max_points - 2 equal buckets in between, the point forming the
+    largest triangle with the previously kept point and the next bucket's
+    average. Each row is scaled to unit spread and the triangle areas are
+    summed over rows, so every series keeps its shape at shared x values.
+    """
+    count = len(x)
+    if count <= max_points:
+        return np.arange(count)
+
+    spread = series.std(axis=1, keepdims=True)
+    y = series / np.where(spread == 0, 1, spread)
+
+    # Buckets [edges[i], edges[i + 1]) split the points between the ends
+    edges = np.linspace(1, count - 1, max_points - 1).astype(np.int64)
+    x_totals = np.r_[0, np.cumsum(x)]
+    y_totals = np.hstack([np.zeros((len(y), 1)), np.cumsum(y, axis=1)])
+    sizes = edges[1:] - edges[:-1]
+    x_means = (x_totals[edges[1:]] - x_totals[edges[:-1]]) / sizes
+    y_means = (y_totals[:, edges[1:]] - y_totals[:, edges[:-1]]) / sizes
+    # The last bucket looks ahead to the last point
+    x_next = np.r_[x_means[1:], x[-1]]
+    y_next = np.hstack([y_means[:, 1:], y[:, -1:]])
+
+    keep = np.empty(max_points, dtype=np.int64)
+    keep[0], keep[-1] = 0, count - 1
+    previous = 0
+    for bucket in range(max_points - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        x_a, y_a = x[previous], y[:, previous : previous + 1]
+        areas = np.abs(
+            (x_a - x_next[bucket]) * (y[:, start:end] - y_a)
+            - (x_a - x[start:end]) * (y_next[:, bucket : bucket + 1] - y_a)
+        ).sum(axis=0)
+        previous = start + int(np.argmax(areas))
+        keep[bucket + 1] = previous
+    return keep
@@ -0,0 +1,165 @@
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from flask import current_app, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+DEFAULT_N_PLUS_ONE_THRESHOLD = 3
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_local = threading.local()
+
+
+class QueryStats:
+    "Statement count, total DB time and statement shapes seen in one scope."
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+
+    @property
+    def duration_ms(self):
+        return self.duration * 1000
+
+    def record(self, statement, duration):
+        self.count += 1
+        self.duration += duration
+        # Statements are parametrised, so identical text means identical shape
+        self.shapes[_WHITESPACE_RE.sub(" ", statement).strip()] += 1
+
+    def n_plus_one_suspects(self, threshold=DEFAULT_N_PLUS_ONE_THRESHOLD):
+        "Statement shapes issued at least threshold times, most repeated first."
+        return [
+            (statement, count)
+            for statement, count in self.shapes.most_common()
+            if count >= threshold
+        ]
+
+
+def _collectors():
+    collectors = getattr(_local, "collectors", None)
+    if collectors is None:
+        collectors = _local.collectors = []
+    return collectors
+
+
+@contextmanager
+def collect_queries():
+    "Collect QueryStats for every statement executed on this thread."
+    stats = QueryStats()
+    collectors = _collectors()
+    collectors.append(stats)
+    try:
+        yield stats
+    finally:
+        collectors.remove(stats)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _collectors():
+        conn.info.setdefault("query_stats_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    collectors = _collectors()
+    starts = conn.info.get("query_stats_start")
+    if not collectors or not starts:
+        return
+    duration = time.perf_counter() - starts.pop()
+    for stats in collectors:
+        stats.record(statement, duration)
+
+
+@event.listens_for(Engine, "handle_error")
+def _cursor_execute_failed(context):
+    # after_cursor_execute never fires for a failed statement
+    connection = context.connection
+    if connection is not None and connection.info.get("query_stats_start"):
+        connection.info["query_stats_start"].pop()
+
+
+def _request_label():
+    return f"{request.method} {request.path}"
+
+
+def _enabled():
+    return current_app.config.get("QUERY_STATS_ENABLED", current_app.debug)
+
+
+def _log_query_stats(app, label, status_code, stats, suspects):
+    app.logger.info(
+        "%s %s queries=%d db_time_ms=%.2f n_plus_one=%d",
+        label,
+        status_code,
+        stats.count,
+        stats.duration_ms,
+        len(suspects),
+    )
+    for statement, count in suspects:
+        app.logger.warning("Possible N+1 in %s: %d x %s", label, count, statement)
+    budget = app.config.get("QUERY_BUDGET")
+    if budget is not None and stats.count > budget:
+        app.logger.warning(
+            "%s issued %d queries (budget %d)", label, stats.count, budget
+        )
+
+
+def init_query_stats(app):
+    """
+    Count statements and DB time per request when QUERY_STATS_ENABLED is set
+    (defaults to debug mode). Results go to X-Query-* response headers and
+    the app log; repeated statement shapes are logged as N+1 suspects and
+    QUERY_BUDGET, if set, logs requests that issue more statements.
+
+    Streamed responses run most of their queries after the headers are sent,
+    so they get no X-Query-* headers and are logged once the body has been
+    sent instead. Their generators must use stream_with_context to be counted.
+    """
+
+    @app.before_request
+    def start_query_stats():
+        if _enabled():
+            g.query_stats_scope = collect_queries()
+            g.query_stats = g.query_stats_scope.__enter__()
+
+    @app.after_request
+    def report_query_stats(response):
+        stats = g.pop("query_stats", None)
+        if stats is None:
+            return response
+
+        threshold = app.config.get(
+            "QUERY_STATS_N_PLUS_ONE_THRESHOLD", DEFAULT_N_PLUS_ONE_THRESHOLD
+        )
+        label = _request_label()
+        if response.is_streamed:
+            response.call_on_close(
+                lambda: _log_query_stats(
+                    app,
+                    label,
+                    response.status_code,
+                    stats,
+                    stats.n_plus_one_suspects(threshold),
+                )
+            )
+            return response
+
+        suspects = stats.n_plus_one_suspects(threshold)
+        response.headers["X-Query-Count"] = str(stats.count)
+        response.headers["X-Query-Time-Ms"] = f"{stats.duration_ms:.2f}"
+        response.headers["X-Query-N-Plus-One"] = str(len(suspects))
+        _log_query_stats(app, label, response.status_code, stats, suspects)
+        return response
+
+    @app.teardown_request
+    def stop_query_stats(exc=None):
+        scope = g.pop("query_stats_scope", None)
+        if scope is not None:
+            scope.__exit__(None, None, None)
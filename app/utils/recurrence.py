@@ -0,0 +1,87 @@
+from datetime import datetime, time, timezone
+from itertools import islice
+
+from dateutil.parser import parse
+from dateutil.rrule import DAILY, MONTHLY, WEEKLY, rrule, weekdays
+
+from .validation_functions import is_date_only, parse_int_in_range, validate_field
+
+FREQUENCIES = {"daily": DAILY, "weekly": WEEKLY, "monthly": MONTHLY}
+WEEKDAYS = {str(weekday): weekday for weekday in weekdays}
+MAX_INTERVAL = 52
+# A year of daily sessions
+MAX_OCCURRENCES = 366
+
+
+def parse_recurrence(data, errors):
+    """
+    Expand the recurrence rule in data into a list of naive datetimes,
+    recording invalid fields in errors:
+
+      start     first session (required); timezone-aware values become UTC
+      frequency daily, weekly (default) or monthly
+      interval  every n-th day/week/month (default 1)
+      weekdays  two-letter days, e.g. ["MO", "TH"] (default start's day)
+      count     number of sessions, or
+      until     last possible session; a bare date includes the whole day
+
+    One of count and until is required, and a rule may not produce more
+    than MAX_OCCURRENCES sessions.
+    """
+    values = {}
+    for field in ("start", "until"):
+        error = validate_field(data, field, "datetime")
+        if error:
+            errors[field] = error
+        elif data.get(field):
+            values[field] = naive_utc(parse(data[field]))
+    if "start" not in values and "start" not in errors:
+        errors["start"] = "'start' is required."
+    if "until" in values and is_date_only(data["until"]):
+        values["until"] = datetime.combine(values["until"].date(), time.max)
+
+    frequency = data.get("frequency", "weekly")
+    if frequency not in FREQUENCIES:
+        errors["frequency"] = f"'frequency' must be one of: {', '.join(FREQUENCIES)}."
+    interval = parse_int_in_range(data, "interval", 1, 1, MAX_INTERVAL, errors)
+
+    days = data.get("weekdays")
+    if days is not None:
+        if not isinstance(days, list) or not all(
+            isinstance(day, str) and day.upper() in WEEKDAYS for day in days
+        ):
+            errors["weekdays"] = (
+                f"'weekdays' must be a list of: {', '.join(WEEKDAYS)}."
+            )
+        else:
+            days = [WEEKDAYS[day.upper()] for day in days] or None
+
+    if data.get("count") is not None:
+        values["count"] = parse_int_in_range(
+            data, "count", 1, 1, MAX_OCCURRENCES, errors
+        )
+    if ("count" in values) == ("until" in values or "until" in errors):
+        errors["count"] = "Exactly one of 'count' and 'until' is required."
+    if errors:
+        return None
+
+    rule = rrule(
+        FREQUENCIES[frequency],
+        dtstart=values["start"],
+        interval=interval,
+        byweekday=days,
+        count=values.get("count"),
+        until=values.get("until"),
+    )
+    occurrences = list(islice(rule, MAX_OCCURRENCES + 1))
+    if len(occurrences) > MAX_OCCURRENCES:
+        errors["until"] = f"The rule may produce at most {MAX_OCCURRENCES} sessions."
+        return None
+    return occurrences
+
+
+def naive_utc(value):
+    "Sessions are stored as naive datetimes; aware values are converted to UTC."
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
@@ -0,0 +1,149 @@
+import csv
+import io
+import json
+from itertools import groupby
+
+from sqlalchemy import select
+
+from ..models import (
+    Exercise,
+    SessionExercise,
+    WorkoutPlan,
+    WorkoutPlanExercise,
+    WorkoutSession,
+    db,
+)
+
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+# Rows fetched per round trip from the server-side cursor
+EXPORT_BATCH_SIZE = 1000
+# Output is handed to the WSGI server in chunks of about this many characters
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+SESSION_COLUMNS = (
+    "workout_session_id",
+    "workout_plan_id",
+    "workout_plan_name",
+    "scheduled_at",
+    "started_at",
+    "completed_at",
+)
+DATETIME_COLUMNS = ("scheduled_at", "started_at", "completed_at")
+DATETIME_INDEXES = [SESSION_COLUMNS.index(column) for column in DATETIME_COLUMNS]
+EXERCISE_COLUMNS = (
+    "session_exercise_id",
+    "workout_plan_exercise_id",
+    "exercise_id",
+    "exercise_name",
+    "actual_sets",
+    "actual_reps",
+    "actual_weight",
+    "notes",
+)
+
+
+def isoformat(value):
+    return value.isoformat() if value else None
+
+
+def export_rows(user_id, batch_size=EXPORT_BATCH_SIZE):
+    """
+    Stream every session of the user's plans joined to its session exercises,
+    one row per session exercise (SESSION_COLUMNS then EXERCISE_COLUMNS) and
+    one row with None exercise columns for a session without any. Rows come
+    from a server-side cursor batch_size at a time, ordered by plan and then
+    newest session first.
+    """
+    query = (
+        select(
+            WorkoutSession.id,
+            WorkoutSession.workout_plan_id,
+            WorkoutPlan.name,
+            WorkoutSession.scheduled_at,
+            WorkoutSession.started_at,
+            WorkoutSession.completed_at,
+            SessionExercise.id,
+            SessionExercise.workout_plan_exercise_id,
+            WorkoutPlanExercise.exercise_id,
+            Exercise.name,
+            SessionExercise.actual_sets,
+            SessionExercise.actual_reps,
+            SessionExercise.actual_weight,
+            SessionExercise.notes,
+        )
+        .select_from(WorkoutSession)
+        .join(WorkoutPlan, WorkoutSession.workout_plan_id == WorkoutPlan.id)
+        .outerjoin(
+            SessionExercise, SessionExercise.workout_session_id == WorkoutSession.id
+        )
+        .outerjoin(
+            WorkoutPlanExercise,
+            SessionExercise.workout_plan_exercise_id == WorkoutPlanExercise.id,
+        )
+        .outerjoin(Exercise, WorkoutPlanExercise.exercise_id == Exercise.id)
+        .where(WorkoutPlan.user_id == user_id)
+        .order_by(
+            WorkoutSession.workout_plan_id,
+            *WorkoutSession.newest_first(),
+            SessionExercise.id,
+        )
+    )
+    # yield_per fetches through a named (server-side) cursor, so the result
+    # is never held in memory whole
+    return db.session.execute(query, execution_options={"yield_per": batch_size})
+
+
+def ndjson_chunks(rows, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    One JSON object per session - SESSION_COLUMNS and an "exercises" list of
+    EXERCISE_COLUMNS objects - per line, in chunks of about chunk_size.
+    """
+    width = len(SESSION_COLUMNS)
+    lines = []
+    length = 0
+    for _, session_rows in groupby(rows, key=lambda row: row[0]):
+        first = None
+        exercises = []
+        for row in session_rows:
+            first = first or row
+            if row[width] is not None:
+                exercises.append(dict(zip(EXERCISE_COLUMNS, row[width:])))
+        session = dict(zip(SESSION_COLUMNS, first[:width]))
+        for field in DATETIME_COLUMNS:
+            session[field] = isoformat(session[field])
+        session["exercises"] = exercises
+        line = json.dumps(session, separators=(",", ":"))
+        lines.append(line)
+        length += len(line)
+        if length >= chunk_size:
+            yield "\n".join(lines) + "\n"
+            lines = []
+            length = 0
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def csv_chunks(rows, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    A header and then one CSV line per row, with empty cells for None, in
+    chunks of about chunk_size.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(SESSION_COLUMNS + EXERCISE_COLUMNS)
+    for row in rows:
+        row = list(row)
+        for i in DATETIME_INDEXES:
+            row[i] = isoformat(row[i])
+        writer.writerow(row)
+        if buffer.tell() >= chunk_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def export_sessions(user_id, export_format):
+    "Stream the user's history in export_format (a key of EXPORT_FORMATS) as text chunks."
+    chunks = ndjson_chunks if export_format == "ndjson" else csv_chunks
+    return chunks(export_rows(user_id))
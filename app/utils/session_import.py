@@ -0,0 +1,206 @@
+import json
+from collections import namedtuple
+from datetime import datetime
+from itertools import islice
+
+from dateutil.parser import parse
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from ..models import (
+    ChangeLog,
+    SessionExercise,
+    UserExerciseStats,
+    WorkoutPlan,
+    WorkoutPlanExercise,
+    WorkoutSession,
+    db,
+)
+from .validation_functions import validate_field
+
+DEFAULT_IMPORT_BATCH_SIZE = 500
+
+SESSION_FIELDS = ("scheduled_at", "started_at", "completed_at")
+SESSION_EXERCISE_FIELDS = [
+    ("workout_plan_exercise_id", "int"),
+    ("actual_sets", "int"),
+    ("actual_reps", "int"),
+    ("actual_weight", "float"),
+]
+SESSION_EXERCISE_DEFAULTS = {
+    "actual_sets": 1,
+    "actual_reps": 1,
+    "actual_weight": 1.0,
+    "notes": "",
+}
+CONVERTERS = {"int": int, "float": float}
+
+ImportResult = namedtuple("ImportResult", ["imported", "errors"])
+
+
+def import_sessions(
+    user_id, workout_plan_id, lines, batch_size=DEFAULT_IMPORT_BATCH_SIZE
+):
+    """
+    Import sessions with nested exercises from NDJSON lines (str or bytes,
+    e.g. a request stream) into one of the user's plans, batch_size lines
+    at a time. Blank lines are skipped.
+
+    Each batch is validated, has its plan exercise ids resolved with one
+    query and is written with multi-row inserts in its own transaction, so
+    the body is never held in memory whole and a failing batch does not
+    undo the ones before it. Invalid lines are left out and reported as
+    {"line": number, "errors": {...}} in line order.
+    """
+    numbered = (
+        (number, line) for number, line in enumerate(lines, start=1) if line.strip()
+    )
+    imported = 0
+    errors = []
+    while batch := list(islice(numbered, batch_size)):
+        imported += import_batch(user_id, workout_plan_id, batch, errors)
+    errors.sort(key=lambda error: error["line"])
+    return ImportResult(imported, errors)
+
+
+def import_batch(user_id, workout_plan_id, batch, errors):
+    """
+    Import one batch of (line number, line) pairs, appending its invalid
+    lines to errors. Returns the number of sessions imported.
+    """
+    parsed = []
+    for number, line in batch:
+        session, line_errors = parse_session(line)
+        if line_errors:
+            errors.append({"line": number, "errors": line_errors})
+        else:
+            parsed.append((number, session))
+
+    found = WorkoutPlanExercise.get_ids_in_workout(
+        {
+            exercise["workout_plan_exercise_id"]
+            for _, session in parsed
+            for exercise in session["exercises"]
+        },
+        workout_plan_id,
+    )
+    valid = []
+    for number, session in parsed:
+        missing = [
+            exercise["workout_plan_exercise_id"]
+            for exercise in session["exercises"]
+            if exercise["workout_plan_exercise_id"] not in found
+        ]
+        if missing:
+            errors.append(
+                {
+                    "line": number,
+                    "errors": {
+                        "workout_plan_exercise_id": (
+                            f"Exercise with id {missing[0]} does not exist in this "
+                            "workout plan."
+                        )
+                    },
+                }
+            )
+        else:
+            valid.append((number, session))
+    if not valid:
+        return 0
+
+    try:
+        session_ids = db.session.scalars(
+            insert(WorkoutSession).returning(
+                WorkoutSession.id, sort_by_parameter_order=True
+            ),
+            [
+                {"workout_plan_id": workout_plan_id, **session["values"]}
+                for _, session in valid
+            ],
+        ).all()
+        exercise_rows = [
+            {"workout_session_id": session_id, **exercise}
+            for session_id, (_, session) in zip(session_ids, valid)
+            for exercise in session["exercises"]
+        ]
+        exercise_ids = []
+        if exercise_rows:
+            exercise_ids = db.session.scalars(
+                insert(SessionExercise).returning(SessionExercise.id), exercise_rows
+            ).all()
+        UserExerciseStats.add_sessions(session_ids)
+        WorkoutPlan.bump_data_version([workout_plan_id])
+        ChangeLog.record(
+            user_id, workout_session=session_ids, session_exercise=exercise_ids
+        )
+        db.session.commit()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        message = f"The batch containing this line could not be saved: {e.orig or e}"
+        errors.extend(
+            {"line": number, "errors": {"batch": message}} for number, _ in valid
+        )
+        return 0
+    return len(valid)
+
+
+def parse_session(line):
+    """
+    Parse and validate one NDJSON session, shaped like the body of a session
+    POST. Returns ({"values": session columns, "exercises": session exercise
+    rows}, None) or (None, errors).
+    """
+    try:
+        data = json.loads(line)
+    except ValueError:
+        return None, {"line": "Line is not valid JSON."}
+    if not isinstance(data, dict):
+        return None, {"line": "Line must be a JSON object."}
+
+    errors = {}
+    for field in SESSION_FIELDS:
+        error = validate_field(data, field, "datetime")
+        if error:
+            errors[field] = error
+
+    exercises_data = data.get("exercises") or []
+    if not isinstance(exercises_data, list) or not all(
+        isinstance(exercise_data, dict) for exercise_data in exercises_data
+    ):
+        errors["exercises"] = "'exercises' must be a list of objects."
+        exercises_data = []
+    for exercise_data in exercises_data:
+        if exercise_data.get("workout_plan_exercise_id") is None:
+            errors["workout_plan_exercise_id"] = (
+                "'workout_plan_exercise_id' is required."
+            )
+        for field, field_type in SESSION_EXERCISE_FIELDS:
+            error = validate_field(exercise_data, field, field_type)
+            if error:
+                errors[field] = error
+        notes = exercise_data.get("notes")
+        if notes is not None and not isinstance(notes, str):
+            errors["notes"] = "'notes' must be a string."
+    if errors:
+        return None, errors
+
+    values = {
+        field: parse(data[field]) if data.get(field) else None
+        for field in SESSION_FIELDS
+    }
+    # As for a single session POST, an unscheduled session is scheduled now
+    values["scheduled_at"] = values["scheduled_at"] or datetime.utcnow()
+    exercises = []
+    for exercise_data in exercises_data:
+        exercise = {
+            "workout_plan_exercise_id": exercise_data["workout_plan_exercise_id"],
+            **{
+                field: exercise_data.get(field, default)
+                for field, default in SESSION_EXERCISE_DEFAULTS.items()
+            },
+        }
+        for field, field_type in SESSION_EXERCISE_FIELDS:
+            if exercise[field] is not None:
+                exercise[field] = CONVERTERS[field_type](exercise[field])
+        exercises.append(exercise)
+    return {"values": values, "exercises": exercises}, None
@@ -0,0 +1,103 @@
+from collections import defaultdict
+from datetime import datetime
+
+from sqlalchemy import select
+
+from ..models import (
+    ChangeLog,
+    SessionExercise,
+    WorkoutPlan,
+    WorkoutPlanExercise,
+    WorkoutSession,
+    db,
+)
+from ..models.change_log import ENTITIES
+
+DEFAULT_SYNC_LIMIT = 500
+MAX_SYNC_LIMIT = 1000
+
+# The model and the columns sent for each entity in the change log
+SYNC_COLUMNS = {
+    "workout_plan": (WorkoutPlan, ("id", "name", "created_at", "updated_at")),
+    "workout_plan_exercise": (
+        WorkoutPlanExercise,
+        (
+            "id",
+            "workout_plan_id",
+            "exercise_id",
+            "target_sets",
+            "target_reps",
+            "target_weight",
+        ),
+    ),
+    "workout_session": (
+        WorkoutSession,
+        ("id", "workout_plan_id", "scheduled_at", "started_at", "completed_at"),
+    ),
+    "session_exercise": (
+        SessionExercise,
+        (
+            "id",
+            "workout_session_id",
+            "workout_plan_exercise_id",
+            "actual_sets",
+            "actual_reps",
+            "actual_weight",
+            "notes",
+        ),
+    ),
+}
+
+
+def get_changes(user_id, after_id, limit=DEFAULT_SYNC_LIMIT):
+    """
+    Get what changed in the user's data after change log entry after_id,
+    reading at most limit entries. Each row is reported once, as it is now
+    or as deleted, whatever it went through in between; rows that are gone
+    without a delete entry of their own went with a deleted parent. Returns
+    the changed rows and deleted ids by entity (only entities with any),
+    the id of the last entry read and whether there are more.
+
+    Reads the log in one index range scan, plus one primary key lookup per
+    entity that has changed rows.
+    """
+    entries = ChangeLog.get_since(user_id, after_id, limit)
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    latest = {}
+    for entry in entries:
+        latest[entry.entity, entry.entity_id] = entry.deleted
+    changed, deleted = defaultdict(list), defaultdict(list)
+    for (entity, entity_id), was_deleted in latest.items():
+        (deleted if was_deleted else changed)[entity].append(entity_id)
+
+    return {
+        "changes": {
+            entity: fetch_rows(entity, changed[entity])
+            for entity in ENTITIES
+            if changed[entity]
+        },
+        "deleted": {
+            entity: sorted(deleted[entity]) for entity in ENTITIES if deleted[entity]
+        },
+        "last_id": entries[-1].id if entries else after_id,
+        "has_more": has_more,
+    }
+
+
+def fetch_rows(entity, ids):
+    "Get the entity rows with ids that still exist, as dicts ordered by id."
+    model, columns = SYNC_COLUMNS[entity]
+    rows = db.session.execute(
+        select(*[getattr(model, column) for column in columns])
+        .where(model.id.in_(ids))
+        .order_by(model.id)
+    )
+    return [
+        {
+            column: value.isoformat() if isinstance(value, datetime) else value
+            for column, value in zip(columns, row)
+        }
+        for row in rows
+    ]
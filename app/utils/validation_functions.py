@@ -1,6 +1,11 @@
+import re
+from datetime import datetime, time
+
 from dateutil.parser import parse
 from dateutil.parser import ParserError
 
+from .pagination import decode_cursor
+
 
 def validate_field(data, field_name, datatype):
     value = data.get(field_name)
@@ -20,3 +25,53 @@ def validate_field(data, field_name, datatype):
         return f"'{field_name}' must be a valid {datatype}."
 
     return None
+
+
+def parse_int_in_range(values, field, default, minimum, maximum, errors):
+    "Parse an optional int parameter, recording it in errors if out of range."
+    error = validate_field(values, field, "int")
+    if not error:
+        value = int(values.get(field, default))
+        if minimum <= value <= maximum:
+            return value
+        error = f"'{field}' must be between {minimum} and {maximum}."
+    errors[field] = error
+    return default
+
+
+def parse_scheduled_range(values, errors):
+    """
+    Parse the optional 'from' and 'to' bounds on scheduled_at, recording
+    invalid ones in errors. A bare 'to' date includes the whole day.
+    """
+    bounds = {}
+    for field in ("from", "to"):
+        error = validate_field(values, field, "datetime")
+        if error:
+            errors[field] = error
+        elif values.get(field):
+            bounds[field] = parse(values[field])
+
+    if "to" in bounds and is_date_only(values["to"]):
+        bounds["to"] = datetime.combine(bounds["to"].date(), time.max)
+    return bounds.get("from"), bounds.get("to")
+
+
+def is_date_only(value):
+    "True for ISO dates without a time part, e.g. '2024-05-01'."
+    return re.fullmatch(r"\d{4}-\d{2}-\d{2}", value.strip()) is not None
+
+
+def parse_session_cursor(values, errors):
+    """
+    Decode the optional (scheduled_at, id) session page 'cursor', recording
+    an invalid one in errors.
+    """
+    if not values.get("cursor"):
+        return None
+    try:
+        scheduled_at, session_id = decode_cursor(values["cursor"], 2)
+        return parse(scheduled_at) if scheduled_at else None, int(session_id)
+    except (ParserError, TypeError, ValueError):
+        errors["cursor"] = "'cursor' is not a valid cursor."
+        return None
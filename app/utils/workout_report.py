@@ -0,0 +1,295 @@
+import hashlib
+import json
+
+from flask import current_app
+from sqlalchemy import func, select
+
+from ..models import (
+    CacheVersion,
+    Exercise,
+    SessionExercise,
+    WorkoutPlan,
+    WorkoutPlanExercise,
+    WorkoutSession,
+    db,
+)
+from .caching import SingleFlight, SizedLRUCache
+from .exercise_catalog import CATALOG_CACHE
+from .pagination import paginate
+
+DEFAULT_REPORT_CACHE_BYTES = 64 * 2**20
+
+# report_key -> (payload, next cursor). Entries for old versions are never
+# read again and age out.
+report_cache = SizedLRUCache(DEFAULT_REPORT_CACHE_BYTES)
+# Concurrent misses for the same key build the report once
+report_flight = SingleFlight()
+
+
+def init_report_cache(app):
+    "Size the report cache from the app config."
+    report_cache.configure(
+        app.config.get("REPORT_CACHE_BYTES", DEFAULT_REPORT_CACHE_BYTES)
+    )
+
+
+def isoformat(value):
+    return value.isoformat() if value else None
+
+
+def get_report_plan(user_id, workout_plan_id):
+    """
+    Get (id, name, data_version, catalog_version) of a user's plan, or None.
+
+    A report only changes when the plan's data version or the shared
+    exercise catalog version (it lists exercise names) moves on, so both
+    are read together in one query.
+    """
+    return WorkoutPlan.get_data_version(
+        user_id,
+        workout_plan_id,
+        CacheVersion.current(CATALOG_CACHE).label("catalog_version"),
+    )
+
+
+def report_key(plan, query):
+    "Cache key of the report for query at plan's versions."
+    return (
+        plan.id,
+        plan.data_version,
+        plan.catalog_version,
+        tuple(sorted(query.items())),
+    )
+
+
+def report_etag(key):
+    "ETag of the report with a report_key."
+    raw = json.dumps(key, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+def render_workout_report(plan, query):
+    """
+    Return the serialized report and next page cursor for query, a dict of
+    build_plan_report keyword arguments, at plan's versions - from the
+    report cache when possible. Concurrent requests that miss the cache
+    for the same key wait for one of them to build the report.
+
+    plan is the row from get_report_plan. It is read before the report is
+    built, so a concurrent write can only make a cached report newer than
+    its versions, never older.
+    """
+    key = report_key(plan, query)
+    cached = report_cache.get(key)
+    if cached is not None:
+        return cached
+
+    def render():
+        # A flight for key may have finished since the lookup above
+        cached = report_cache.get(key)
+        if cached is not None:
+            return cached
+        report, next_cursor = build_plan_report(plan, **query)
+        payload = current_app.json.dumps(report).encode("utf-8")
+        report_cache.set(key, (payload, next_cursor), len(payload))
+        return payload, next_cursor
+
+    return report_flight.do(key, render)
+
+
+def build_workout_report(
+    user_id,
+    workout_plan_id,
+    scheduled_from=None,
+    scheduled_to=None,
+    limit=None,
+    after=None,
+):
+    """
+    Build the report for one of a user's workout plans. Returns the report
+    and the cursor for the next page of sessions, or (None, None) if the
+    user has no such plan.
+
+    Sessions scheduled within the optional window are listed newest first,
+    limit at a time after the (scheduled_at, id) pair in after when a limit
+    is given. The summary covers the whole window and is aggregated in SQL,
+    so paging through a long history never loads the rows paged away.
+
+    Plan exercises, sessions and session exercises are each fetched as plain
+    column tuples in their own query and stitched together in one pass, so
+    the work grows with the number of rows rather than their product.
+    """
+    plan = db.session.execute(
+        select(WorkoutPlan.id, WorkoutPlan.name).where(
+            WorkoutPlan.id == workout_plan_id, WorkoutPlan.user_id == user_id
+        )
+    ).one_or_none()
+    if plan is None:
+        return None, None
+    return build_plan_report(plan, scheduled_from, scheduled_to, limit, after)
+
+
+def build_plan_report(
+    plan, scheduled_from=None, scheduled_to=None, limit=None, after=None
+):
+    """
+    build_workout_report for a plan row with id and name whose ownership
+    was already checked.
+    """
+    window = [WorkoutSession.workout_plan_id == plan.id]
+    if scheduled_from is not None:
+        window.append(WorkoutSession.scheduled_at >= scheduled_from)
+    if scheduled_to is not None:
+        window.append(WorkoutSession.scheduled_at <= scheduled_to)
+
+    plan_exercises = db.session.execute(
+        select(
+            WorkoutPlanExercise.exercise_id,
+            Exercise.name,
+            WorkoutPlanExercise.target_sets,
+            WorkoutPlanExercise.target_reps,
+            WorkoutPlanExercise.target_weight,
+        )
+        .outerjoin(Exercise, WorkoutPlanExercise.exercise_id == Exercise.id)
+        .where(WorkoutPlanExercise.workout_plan_id == plan.id)
+        .order_by(WorkoutPlanExercise.id)
+    )
+
+    session_query = (
+        select(
+            WorkoutSession.id,
+            WorkoutSession.scheduled_at,
+            WorkoutSession.started_at,
+            WorkoutSession.completed_at,
+        )
+        .where(*window)
+        .order_by(*WorkoutSession.newest_first())
+    )
+    if after is not None:
+        session_query = session_query.where(WorkoutSession.after_cursor(after))
+    if limit is not None:
+        session_query = session_query.limit(limit + 1)
+    session_rows = db.session.execute(session_query).all()
+
+    next_cursor = None
+    if limit is not None:
+        session_rows, next_cursor = paginate(
+            session_rows, limit, lambda row: (isoformat(row.scheduled_at), row.id)
+        )
+
+    sessions = {}
+    for id, scheduled_at, started_at, completed_at in session_rows:
+        sessions[id] = {
+            "session_id": id,
+            "scheduled_at": isoformat(scheduled_at),
+            "started_at": isoformat(started_at),
+            "completed_at": isoformat(completed_at),
+            "session_exercises": [],
+        }
+
+    session_exercise_query = (
+        select(
+            SessionExercise.id,
+            SessionExercise.workout_session_id,
+            SessionExercise.workout_plan_exercise_id,
+            Exercise.name,
+            SessionExercise.actual_sets,
+            SessionExercise.actual_reps,
+            SessionExercise.actual_weight,
+            SessionExercise.notes,
+        )
+        .join(WorkoutSession, SessionExercise.workout_session_id == WorkoutSession.id)
+        .outerjoin(
+            WorkoutPlanExercise,
+            SessionExercise.workout_plan_exercise_id == WorkoutPlanExercise.id,
+        )
+        .outerjoin(Exercise, WorkoutPlanExercise.exercise_id == Exercise.id)
+        .where(*window)
+        .order_by(SessionExercise.workout_session_id, SessionExercise.id)
+    )
+    if limit is not None:
+        session_exercise_query = session_exercise_query.where(
+            SessionExercise.workout_session_id.in_(list(sessions))
+        )
+    for row in db.session.execute(session_exercise_query):
+        sessions[row.workout_session_id]["session_exercises"].append(
+            {
+                "id": row.id,
+                "workout_plan_exercise_id": row.workout_plan_exercise_id,
+                "exercise_name": row.name,
+                "actual_sets": row.actual_sets,
+                "actual_reps": row.actual_reps,
+                "actual_weight": row.actual_weight,
+                "notes": row.notes,
+            }
+        )
+
+    report = {
+        "workout_plan_id": plan.id,
+        "workout_plan_name": plan.name,
+        "summary": summarize_sessions(window),
+        "workout_plan_exercises": [
+            {
+                "id": row.exercise_id,
+                "name": row.name,
+                "target_sets": row.target_sets,
+                "target_reps": row.target_reps,
+                "target_weight": row.target_weight,
+            }
+            for row in plan_exercises
+        ],
+        "workout_plan_sessions": list(sessions.values()),
+    }
+    return report, next_cursor
+
+
+def summarize_sessions(window):
+    "Totals and per-exercise bests over the sessions matching window, in SQL."
+    totals = db.session.execute(
+        select(
+            func.count().label("total_sessions"),
+            func.count(WorkoutSession.completed_at).label("completed_sessions"),
+            func.min(WorkoutSession.scheduled_at).label("first_scheduled_at"),
+            func.max(WorkoutSession.scheduled_at).label("last_scheduled_at"),
+            func.max(WorkoutSession.completed_at).label("last_completed_at"),
+        ).where(*window)
+    ).one()
+
+    reps = SessionExercise.actual_sets * SessionExercise.actual_reps
+    exercises = db.session.execute(
+        select(
+            WorkoutPlanExercise.exercise_id,
+            Exercise.name,
+            func.count(SessionExercise.workout_session_id.distinct()).label("sessions"),
+            func.coalesce(func.sum(SessionExercise.actual_sets), 0).label("total_sets"),
+            func.coalesce(func.sum(reps), 0).label("total_reps"),
+            func.coalesce(
+                func.sum(reps * SessionExercise.actual_weight), 0.0
+            ).label("total_volume"),
+            func.max(SessionExercise.actual_weight).label("max_weight"),
+            func.max(SessionExercise.actual_reps).label("max_reps"),
+            func.max(SessionExercise.actual_sets).label("max_sets"),
+        )
+        .select_from(SessionExercise)
+        .join(WorkoutSession, SessionExercise.workout_session_id == WorkoutSession.id)
+        .join(
+            WorkoutPlanExercise,
+            SessionExercise.workout_plan_exercise_id == WorkoutPlanExercise.id,
+        )
+        .outerjoin(Exercise, WorkoutPlanExercise.exercise_id == Exercise.id)
+        .where(*window)
+        .group_by(WorkoutPlanExercise.exercise_id, Exercise.name)
+        .order_by(Exercise.name)
+    ).all()
+
+    return {
+        "total_sessions": totals.total_sessions,
+        "completed_sessions": totals.completed_sessions,
+        "first_scheduled_at": isoformat(totals.first_scheduled_at),
+        "last_scheduled_at": isoformat(totals.last_scheduled_at),
+        "last_completed_at": isoformat(totals.last_completed_at),
+        "total_sets": sum(row.total_sets for row in exercises),
+        "total_reps": sum(row.total_reps for row in exercises),
+        "total_volume": sum(row.total_volume for row in exercises),
+        "exercises": [row._asdict() for row in exercises],
+    }
@@ -5,7 +5,10 @@ api_bp = Blueprint("api", __name__)
 
 # Import views to register their routes on the blueprint
 from . import (
+    exercise_stats_views,
     exercise_views,
+    export_views,
+    sync_views,
     workout_plan_views,
     workout_report_views,
     workout_session_views,
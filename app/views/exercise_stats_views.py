@@ -0,0 +1,43 @@
+from flask import jsonify
+
+from ..models import UserExerciseStats
+from ..utils.authorisation import token_required
+from . import api_bp
+
+
+@api_bp.route("/stats/exercises", methods=["GET"])
+@token_required
+def list_exercise_stats(current_user):
+    return jsonify(
+        [
+            serialize_stats(stats, name)
+            for stats, name in UserExerciseStats.get_for_user(current_user.id)
+        ]
+    ), 200
+
+
+@api_bp.route("/stats/exercises/<int:exercise_id>", methods=["GET"])
+@token_required
+def get_exercise_stats(current_user, exercise_id):
+    row = UserExerciseStats.get_for_user(current_user.id, exercise_id)
+    if row is None:
+        return jsonify(
+            {"message": f"No logged sessions for exercise with id {exercise_id}."}
+        ), 404
+
+    return jsonify(serialize_stats(*row)), 200
+
+
+def serialize_stats(stats, name):
+    return {
+        "exercise_id": stats.exercise_id,
+        "exercise_name": name,
+        "total_sets": stats.total_sets,
+        "total_reps": stats.total_reps,
+        "total_volume": stats.total_volume,
+        "max_weight": stats.max_weight,
+        "last_performed_at": (
+            stats.last_performed_at.isoformat() if stats.last_performed_at else None
+        ),
+        "session_count": stats.session_count,
+    }
@@ -1,37 +1,104 @@
-from ..models import Exercise, db
-from ..utils.authorisation import token_required
-from flask import jsonify
+from flask import current_app, jsonify, request
 
+from ..models import Exercise
+from ..utils.authorisation import token_required
+from ..utils.exercise_catalog import LIST_FIELDS, exercise_catalog
+from ..utils.exercise_search import search_exercises
+from ..utils.pagination import decode_cursor, paginate, parse_limit
 from . import api_bp
 
+LISTING_FILTERS = ("category", "muscle_group", "name", "cursor", "limit")
+SEARCH_PAGE_SIZE = 20
+MAX_SEARCH_RESULTS = 100
+
+
+def catalog_response(payload, etag):
+    response = current_app.response_class(payload, mimetype="application/json")
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
 
 @api_bp.route("/exercises", methods=["GET"])
 @token_required
 def list_exercises(current_user):
-    exercises = db.session.query(Exercise).all()
-    if not exercises:
-        return jsonify({"message": "No exercises found"}), 404
+    args = request.args
+    if not any(field in args for field in LISTING_FILTERS):
+        # The full catalog is served straight from the in-memory snapshot
+        snapshot = exercise_catalog.snapshot()
+        return catalog_response(snapshot.list_payload, snapshot.list_etag)
+
+    errors = {}
+    try:
+        limit = parse_limit(args.get("limit"))
+    except ValueError as e:
+        errors["limit"] = str(e)
+    after = None
+    if args.get("cursor"):
+        try:
+            after = decode_cursor(args["cursor"], 2)
+            name, exercise_id = after
+            if (
+                not isinstance(name, str)
+                or not isinstance(exercise_id, int)
+                or isinstance(exercise_id, bool)
+            ):
+                raise ValueError("'cursor' is not a valid cursor.")
+        except ValueError as e:
+            errors["cursor"] = str(e)
+    if errors:
+        return {"status": "error", "errors": errors}, 400
+
+    rows = Exercise.get_page(
+        limit,
+        category=args.get("category"),
+        muscle_group=args.get("muscle_group"),
+        name_prefix=args.get("name"),
+        after=after,
+    )
+    exercises, next_cursor = paginate(rows, limit, lambda e: (e.name, e.id))
+
+    response = jsonify(
+        [{field: getattr(e, field) for field in LIST_FIELDS} for e in exercises]
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response, 200
+
+
+@api_bp.route("/exercises/search", methods=["GET"])
+@token_required
+def search_exercise_library(current_user):
+    errors = {}
+    query = request.args.get("q", "").strip()
+    if not query:
+        errors["q"] = "'q' must be provided."
+    try:
+        limit = parse_limit(
+            request.args.get("limit"), SEARCH_PAGE_SIZE, MAX_SEARCH_RESULTS
+        )
+    except ValueError as e:
+        errors["limit"] = str(e)
+    if errors:
+        return {"status": "error", "errors": errors}, 400
 
     return jsonify(
-        [{"id": e.id, "name": e.name, "category": e.category} for e in exercises]
+        [
+            {
+                "id": e["id"],
+                "name": e["name"],
+                "category": e["category"],
+                "muscle_group": e["muscle_group"],
+            }
+            for e in search_exercises(query, limit)
+        ]
     ), 200
 
 
 @api_bp.route("/exercises/<int:exercise_id>", methods=["GET"])
 @token_required
 def get_exercise(current_user, exercise_id):
-    exercise = (
-        db.session.query(Exercise).filter(Exercise.id == exercise_id).one_or_none()
-    )
+    exercise = exercise_catalog.snapshot().detail(exercise_id)
     if not exercise:
         return jsonify({"message": "Exercise not found"}), 404
 
-    return jsonify(
-        {
-            "id": exercise.id,
-            "name": exercise.name,
-            "description": exercise.description,
-            "category": exercise.category,
-            "muscle_group": exercise.muscle_group,
-        }
-    ), 200
+    return catalog_response(*exercise)
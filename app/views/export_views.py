@@ -0,0 +1,25 @@
+from flask import Response, request, stream_with_context
+
+from ..utils.authorisation import token_required
+from ..utils.session_export import EXPORT_FORMATS, export_sessions
+from . import api_bp
+
+
+@api_bp.route("/export/sessions", methods=["GET"])
+@token_required
+def export_workout_sessions(current_user):
+    export_format = request.args.get("format", "ndjson")
+    if export_format not in EXPORT_FORMATS:
+        error = f"'format' must be one of: {', '.join(EXPORT_FORMATS)}."
+        return {"status": "error", "errors": {"format": error}}, 400
+
+    # The body is generated while it is sent, inside the request context
+    return Response(
+        stream_with_context(export_sessions(current_user.id, export_format)),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers={
+            "Content-Disposition": (
+                f"attachment; filename=workout-sessions.{export_format}"
+            )
+        },
+    )
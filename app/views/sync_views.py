@@ -0,0 +1,43 @@
+from flask import jsonify, request
+
+from ..models import ChangeLog
+from ..utils.authorisation import token_required
+from ..utils.pagination import decode_cursor, encode_cursor, parse_limit
+from ..utils.sync import DEFAULT_SYNC_LIMIT, MAX_SYNC_LIMIT, get_changes
+from . import api_bp
+
+
+@api_bp.route("/sync", methods=["GET"])
+@token_required
+def sync(current_user):
+    args = request.args
+    errors = {}
+    try:
+        limit = parse_limit(args.get("limit"), DEFAULT_SYNC_LIMIT, MAX_SYNC_LIMIT)
+    except ValueError as e:
+        errors["limit"] = str(e)
+    after_id = None
+    if "since" in args:
+        try:
+            (after_id,) = decode_cursor(args["since"], 1)
+        except ValueError:
+            pass
+        if not isinstance(after_id, int) or isinstance(after_id, bool) or after_id < 0:
+            errors["since"] = "'since' is not a valid cursor."
+    if errors:
+        return {"status": "error", "errors": errors}, 400
+
+    if after_id is None:
+        # Taken before a full download, so nothing written during it is missed
+        cursor = encode_cursor([ChangeLog.latest_id(current_user.id)])
+        return jsonify({"cursor": cursor, "has_more": False}), 200
+
+    result = get_changes(current_user.id, after_id, limit)
+    return jsonify(
+        {
+            "changes": result["changes"],
+            "deleted": result["deleted"],
+            "cursor": encode_cursor([result["last_id"]]),
+            "has_more": result["has_more"],
+        }
+    ), 200
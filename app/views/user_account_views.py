@@ -1,10 +1,19 @@
 import datetime
 import jwt
 from flask import current_app, jsonify, request, make_response
-from werkzeug.security import check_password_hash, generate_password_hash
 from ..models import User, db
+from ..utils.password_hashing import HashingPoolSaturated, password_hasher
 from . import api_bp
 
+
+def hashing_busy_response():
+    return (
+        jsonify({"message": "Server is busy, please try again shortly."}),
+        503,
+        {"Retry-After": str(password_hasher.retry_after)},
+    )
+
+
 @api_bp.route("/auth/login", methods=["POST"])
 def login():
     data = request.json
@@ -12,9 +21,23 @@ def login():
         return jsonify({"message": "Email and password are required"}), 400
     
     user = db.session.query(User).filter_by(email=data["email"]).one_or_none()
-    if not user or not check_password_hash(user.password_hash, data["password"]):
+    try:
+        valid = user is not None and password_hasher.verify(
+            user.password_hash, data["password"]
+        )
+    except HashingPoolSaturated:
+        return hashing_busy_response()
+    if not valid:
         return jsonify({"message": "Invalid credentials"}), 401
-    
+
+    # Upgrade hashes made with old parameters while we have the plain password
+    if password_hasher.needs_rehash(user.password_hash):
+        try:
+            user.password_hash = password_hasher.hash(data["password"])
+            db.session.commit()
+        except HashingPoolSaturated:
+            pass
+
     token = jwt.encode(
         {
             "id": user.id,
@@ -89,11 +112,16 @@ def register():
     if existing_user:
         return jsonify({"message": "User already exists. Please login."}), 400
     
+    try:
+        password_hash = password_hasher.hash(data.get("password"))
+    except HashingPoolSaturated:
+        return hashing_busy_response()
+
     new_user = User(
         name=data.get("name"),
         surname=data.get("surname"),
         email=data.get("email"),
-        password_hash=generate_password_hash(data.get("password")),
+        password_hash=password_hash,
     )
     db.session.add(new_user)
     db.session.commit()
@@ -1,10 +1,35 @@
 from flask import jsonify, request
-
-from ..models import Exercise, WorkoutPlan, WorkoutPlanExercise, db
+from sqlalchemy.orm import selectinload
+
+from ..models import (
+    ChangeLog,
+    Exercise,
+    UserExerciseStats,
+    WorkoutPlan,
+    WorkoutPlanExercise,
+    WorkoutSession,
+    db,
+)
 from ..utils.authorisation import token_required
+from ..utils.idempotency import idempotent
 from ..utils.validation_functions import validate_field
 from . import api_bp
 
+PLAN_EXERCISE_FIELDS = [
+    ("exercise_id", "int"),
+    ("target_sets", "int"),
+    ("target_reps", "int"),
+    ("target_weight", "float"),
+]
+PLAN_EXERCISE_TARGETS = ("target_sets", "target_reps", "target_weight")
+
+# Plan exercises and their exercise names in one extra statement
+WORKOUT_DETAIL_OPTIONS = (
+    selectinload(WorkoutPlan.workout_plan_exercises).joinedload(
+        WorkoutPlanExercise.exercise
+    ),
+)
+
 
 @api_bp.route("/workout-plans", methods=["GET"])
 @token_required
@@ -25,7 +50,9 @@ def list_workouts(current_user):
 @token_required
 def get_workout(current_user, workout_plan_id):
     workout_plan = WorkoutPlan.get_user_workout_plan(
-        user_id=current_user.id, workout_plan_id=workout_plan_id
+        user_id=current_user.id,
+        workout_plan_id=workout_plan_id,
+        options=WORKOUT_DETAIL_OPTIONS,
     )
     if not workout_plan:
         return jsonify(
@@ -43,6 +70,7 @@ def get_workout(current_user, workout_plan_id):
                     "exercises": [
                         {
                             "id": wp_ex.exercise_id,
+                            "workout_plan_exercise_id": wp_ex.id,
                             "name": wp_ex.exercise.name,
                             "target_sets": wp_ex.target_sets,
                             "target_reps": wp_ex.target_reps,
@@ -63,7 +91,13 @@ def delete_workout(current_user, workout_plan_id):
         user_id=current_user.id, workout_plan_id=workout_plan_id
     )
     if workout_plan:
+        exercise_ids = UserExerciseStats.exercise_ids(
+            WorkoutSession.workout_plan_id == workout_plan.id
+        )
         db.session.delete(workout_plan)
+        db.session.flush()
+        UserExerciseStats.refresh(current_user.id, exercise_ids)
+        ChangeLog.record(current_user.id, deleted=True, workout_plan=[workout_plan_id])
         db.session.commit()
         return jsonify(
             {"message": f"Workout plan with id {workout_plan_id} succesfully deleted."}
@@ -76,9 +110,9 @@ def delete_workout(current_user, workout_plan_id):
 
 @api_bp.route("/workout-plans/<int:workout_plan_id>", methods=["PATCH"])
 @token_required
+@idempotent
 def update_workout_plan(current_user, workout_plan_id):
     data = request.get_json()
-    errors = {}
 
     workout_plan = WorkoutPlan.get_user_workout_plan(
         user_id=current_user.id, workout_plan_id=workout_plan_id
@@ -94,49 +128,21 @@ def update_workout_plan(current_user, workout_plan_id):
         workout_plan.name = data["name"]
 
     # Update exercises if provided
+    plan_exercise_ids = []
     if "exercises" in data:
-        existing_exercises = {
-            wp_ex.exercise_id: wp_ex for wp_ex in workout_plan.workout_plan_exercises
-        }
-        
-        for exercise_data in data.get("exercises", []):
-            # Fix: Validate exercise_data instead of data
-            for field, field_type in [
-                ("exercise_id", "int"),
-                ("target_sets", "int"),
-                ("target_reps", "int"),
-                ("target_weight", "float"),
-            ]:
-                error = validate_field(exercise_data, field, field_type)  # Changed from 'data' to 'exercise_data'
-                if error:
-                    errors[field] = error
-            if errors:
-                return {"status": "error", "errors": errors}, 400
-
-            exercise_id = exercise_data.get("exercise_id")
-            exercise = Exercise.get_by_id(exercise_id)
-            if exercise is None:
-                return jsonify(
-                    {"message": f"Exercise with id {exercise_id} does not exist."}
-                ), 400
-
-            if exercise_id in existing_exercises:
-                # Exercise already exists → update it
-                wp_ex = existing_exercises[exercise_id]
-                wp_ex.target_sets = exercise_data.get("target_sets", wp_ex.target_sets)
-                wp_ex.target_reps = exercise_data.get("target_reps", wp_ex.target_reps)
-                wp_ex.target_weight = exercise_data.get("target_weight", wp_ex.target_weight)
-            else:
-                # Exercise does not exist → create new one
-                new_wp_ex = WorkoutPlanExercise(
-                    workout_plan_id=workout_plan_id, 
-                    exercise_id=exercise_id,
-                    target_sets=exercise_data.get("target_sets", 1),
-                    target_reps=exercise_data.get("target_reps", 1),
-                    target_weight=exercise_data.get("target_weight", 1.0),
-                )
-                db.session.add(new_wp_ex)
-                
+        targets, error_response = check_plan_exercises(data.get("exercises", []))
+        if error_response:
+            return error_response
+        plan_exercise_ids = WorkoutPlanExercise.upsert_for_plan(
+            workout_plan_id, targets
+        )
+    WorkoutPlan.bump_data_version([workout_plan_id])
+    ChangeLog.record(
+        current_user.id,
+        workout_plan=[workout_plan_id],
+        workout_plan_exercise=plan_exercise_ids,
+    )
+
     try:
         db.session.commit()
     except Exception as e:
@@ -148,9 +154,9 @@ def update_workout_plan(current_user, workout_plan_id):
 
 @api_bp.route("/workout-plans", methods=["POST"])
 @token_required
+@idempotent
 def create_workout_plan(current_user):
     data = request.get_json()
-    errors = {}
 
     # Name must be provided
     if "name" in data:
@@ -160,35 +166,21 @@ def create_workout_plan(current_user):
         return jsonify({"message": "Workout plan name must be provided."}), 400
 
     # Add exercises, if provided
+    plan_exercise_ids = []
     if "exercises" in data:
-        exercises = data.get("exercises", [])
-        for exercise_data in exercises:
-            for field, type in [
-                ("exercise_id", "int"),
-                ("target_sets", "int"),
-                ("target_reps", "int"),
-                ("target_weight", "float"),
-            ]:
-                error = validate_field(data, field, type)
-                if error:
-                    errors[field] = error
-            if errors:
-                return {"status": "error", "errors": errors}, 400
-
-            exercise_id = exercise_data.get("exercise_id")
-            exercise = Exercise.get_by_id(exercise_id)
-            if exercise is None:
-                return jsonify(
-                    {"message": f"Exercise with id {exercise_id} does not exist."}
-                ), 400
-
-            new_wp_ex = WorkoutPlanExercise(
-                exercise_id=exercise_id,
-                target_sets=exercise_data.get("target_sets", 1),
-                target_reps=exercise_data.get("target_reps", 1),
-                target_weight=exercise_data.get("target_weight", 1.0),
-            )
-            workout_plan.workout_plan_exercises.append(new_wp_ex)
+        targets, error_response = check_plan_exercises(data.get("exercises", []))
+        if error_response:
+            return error_response
+        db.session.flush()
+        plan_exercise_ids = WorkoutPlanExercise.upsert_for_plan(
+            workout_plan.id, targets
+        )
+    db.session.flush()
+    ChangeLog.record(
+        current_user.id,
+        workout_plan=[workout_plan.id],
+        workout_plan_exercise=plan_exercise_ids,
+    )
 
     try:
         db.session.commit()
@@ -201,3 +193,56 @@ def create_workout_plan(current_user):
             "workout_plan_id": workout_plan.id,
         }
     ), 200
+
+
+def check_plan_exercises(exercises_data):
+    """
+    Validate submitted plan exercises and check all their exercise_ids exist
+    with one query. Returns (targets, None) where targets maps exercise_id to
+    the target fields sent for it (later entries win), or (None, response)
+    describing the first invalid entry or every unknown exercise id.
+    """
+    errors = {}
+    for exercise_data in exercises_data:
+        for field, field_type in PLAN_EXERCISE_FIELDS:
+            error = validate_field(exercise_data, field, field_type)
+            if error:
+                errors[field] = error
+        if errors:
+            return None, ({"status": "error", "errors": errors}, 400)
+
+    requested = [exercise_data.get("exercise_id") for exercise_data in exercises_data]
+    found = Exercise.get_existing_ids(
+        {int(exercise_id) for exercise_id in requested if exercise_id is not None}
+    )
+    unknown = list(
+        dict.fromkeys(
+            exercise_id
+            for exercise_id in requested
+            if exercise_id is None or int(exercise_id) not in found
+        )
+    )
+    if len(unknown) == 1:
+        return None, (
+            jsonify({"message": f"Exercise with id {unknown[0]} does not exist."}),
+            400,
+        )
+    if unknown:
+        return None, (
+            jsonify(
+                {
+                    "message": f"Exercises with ids {', '.join(map(str, unknown))} do not exist.",
+                    "unknown_exercise_ids": unknown,
+                }
+            ),
+            400,
+        )
+
+    targets = {}
+    for exercise_data in exercises_data:
+        targets.setdefault(int(exercise_data["exercise_id"]), {}).update(
+            (field, exercise_data[field])
+            for field in PLAN_EXERCISE_TARGETS
+            if field in exercise_data
+        )
+    return targets, None
@@ -1,83 +1,98 @@
-from flask import jsonify
-from sqlalchemy.orm import joinedload
+from flask import current_app, jsonify, request
+from werkzeug.http import is_resource_modified
 
-from ..models import (
-    SessionExercise,
-    WorkoutPlan,
-    WorkoutPlanExercise,
-    WorkoutSession,
-    db,
-)
 from ..utils.authorisation import token_required
+from ..utils.exercise_catalog import exercise_catalog
+from ..utils.pagination import parse_limit
+from ..utils.progression import (
+    DEFAULT_MAX_POINTS,
+    DEFAULT_WINDOW,
+    MAX_POINTS,
+    MAX_WINDOW,
+    compute_progression,
+    fetch_progression_columns,
+)
+from ..utils.validation_functions import (
+    parse_int_in_range,
+    parse_scheduled_range,
+    parse_session_cursor,
+)
+from ..utils.workout_report import (
+    get_report_plan,
+    render_workout_report,
+    report_etag,
+    report_key,
+)
 from . import api_bp
 
 
 @api_bp.route("/reports/workout-plan/<int:workout_plan_id>", methods=["GET"])
 @token_required
 def get_workout_report(current_user, workout_plan_id):
-    workout_plan = (
-        db.session.query(WorkoutPlan)
-        .options(
-            joinedload(WorkoutPlan.workout_plan_exercises).joinedload(
-                WorkoutPlanExercise.exercise
-            ),
-            joinedload(WorkoutPlan.workout_sessions)
-            .joinedload(WorkoutSession.session_exercises)
-            .joinedload(SessionExercise.workout_plan_exercise)
-            .joinedload(WorkoutPlanExercise.exercise),
-        )
-        .filter(
-            WorkoutPlan.id == workout_plan_id, WorkoutPlan.user_id == current_user.id
-        )
-        .one_or_none()
-    )
+    args = request.args
+    errors = {}
+    limit = None
+    # Without a limit or cursor every session in the window is returned
+    if args.get("limit") or args.get("cursor"):
+        try:
+            limit = parse_limit(args.get("limit"))
+        except ValueError as e:
+            errors["limit"] = str(e)
+    scheduled_from, scheduled_to = parse_scheduled_range(args, errors)
+    after = parse_session_cursor(args, errors)
+    if errors:
+        return {"status": "error", "errors": errors}, 400
 
-    if not workout_plan:
+    plan = get_report_plan(current_user.id, workout_plan_id)
+    if plan is None:
         return jsonify({"message": "Workout plan not found"}), 404
 
-    return {
-        "workout_plan_id": workout_plan.id,
-        "workout_plan_name": workout_plan.name,
-        "workout_plan_exercises": [
-            {
-                "id": wp_ex.exercise_id,
-                "name": wp_ex.exercise.name if wp_ex.exercise else None,
-                "target_sets": wp_ex.target_sets,
-                "target_reps": wp_ex.target_reps,
-                "target_weight": wp_ex.target_weight,
-            }
-            for wp_ex in workout_plan.workout_plan_exercises
-        ],
-        "workout_plan_sessions": [
-            {
-                "session_id": session.id,
-                "scheduled_at": session.scheduled_at.isoformat()
-                if session.scheduled_at
-                else None,
-                "started_at": session.started_at.isoformat()
-                if session.started_at
-                else None,
-                "completed_at": session.completed_at.isoformat()
-                if session.completed_at
-                else None,
-                "session_exercises": [
-                    {
-                        "id": ws_ex.id,
-                        "workout_plan_exercise_id": ws_ex.workout_plan_exercise_id,
-                        "exercise_name": ws_ex.workout_plan_exercise.exercise.name
-                        if ws_ex.workout_plan_exercise
-                        and ws_ex.workout_plan_exercise.exercise
-                        else None,
-                        "actual_sets": ws_ex.actual_sets,
-                        "actual_reps": ws_ex.actual_reps,
-                        "actual_weight": ws_ex.actual_weight,
-                        "notes": ws_ex.notes,
-                    }
-                    for ws_ex in session.session_exercises
-                ]
-                if session.session_exercises
-                else [],
-            }
-            for session in workout_plan.workout_sessions
-        ],
+    query = {
+        "scheduled_from": scheduled_from,
+        "scheduled_to": scheduled_to,
+        "limit": limit,
+        "after": after,
     }
+    etag = report_etag(report_key(plan, query))
+    # No Last-Modified: HTTP dates only carry whole seconds, so two writes in
+    # the same second would look unmodified to If-Modified-Since
+    if is_resource_modified(request.environ, etag=etag):
+        payload, next_cursor = render_workout_report(plan, query)
+        response = current_app.response_class(payload, mimetype="application/json")
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+    else:
+        # The client's copy is current; the session tables are never read
+        response = current_app.response_class(status=304)
+
+    response.set_etag(etag)
+    # Always revalidate; the ETag makes that a single plan lookup
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+@api_bp.route("/reports/progress/<int:exercise_id>", methods=["GET"])
+@token_required
+def get_progress_report(current_user, exercise_id):
+    args = request.args
+    errors = {}
+    window = parse_int_in_range(args, "window", DEFAULT_WINDOW, 1, MAX_WINDOW, errors)
+    max_points = parse_int_in_range(
+        args, "max_points", DEFAULT_MAX_POINTS, 3, MAX_POINTS, errors
+    )
+    if errors:
+        return {"status": "error", "errors": errors}, 400
+
+    columns = fetch_progression_columns(current_user.id, exercise_id)
+    if not columns[0] and exercise_catalog.snapshot().detail(exercise_id) is None:
+        return jsonify({"message": "Exercise not found"}), 404
+
+    return jsonify(
+        {
+            "exercise_id": exercise_id,
+            "window": window,
+            "max_points": max_points,
+            **compute_progression(columns, window, max_points),
+        }
+    )
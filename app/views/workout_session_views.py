@@ -1,17 +1,44 @@
 from datetime import datetime
+
 from flask import jsonify, request
+from sqlalchemy import insert, update
+from sqlalchemy.orm import selectinload
 
 from ..models import (
+    ChangeLog,
     SessionExercise,
+    UserExerciseStats,
     WorkoutPlan,
     WorkoutPlanExercise,
     WorkoutSession,
     db,
 )
 from ..utils.authorisation import token_required
-from ..utils.validation_functions import validate_field
+from ..utils.idempotency import idempotent
+from ..utils.pagination import paginate, parse_limit
+from ..utils.recurrence import parse_recurrence
+from ..utils.session_import import (
+    SESSION_EXERCISE_DEFAULTS,
+    SESSION_EXERCISE_FIELDS,
+    import_sessions,
+)
+from ..utils.validation_functions import (
+    parse_scheduled_range,
+    parse_session_cursor,
+    validate_field,
+)
 from . import api_bp
 
+SESSION_EXERCISE_VALUES = ("actual_sets", "actual_reps", "actual_weight", "notes")
+
+# Session exercises with their plan exercise and exercise name in one extra
+# statement
+SESSION_DETAIL_OPTIONS = (
+    selectinload(WorkoutSession.session_exercises)
+    .joinedload(SessionExercise.workout_plan_exercise)
+    .joinedload(WorkoutPlanExercise.exercise),
+)
+
 
 @api_bp.route(
     "/workout-sessions",
@@ -19,31 +46,49 @@ from . import api_bp
 )
 @token_required
 def list_workout_sessions(current_user):
-    workout_plans = WorkoutPlan.get_user_workout_plan(user_id=current_user.id)
-    if not workout_plans:
-        return jsonify({"message": "No workout plans found for the user."}), 200
-
-    sessions = []
-    for plan in workout_plans:
-        if plan.workout_sessions:
-            sessions.extend(plan.workout_sessions)
+    args = request.args
+    errors = {}
+    try:
+        limit = parse_limit(args.get("limit"))
+    except ValueError as e:
+        errors["limit"] = str(e)
+    scheduled_from, scheduled_to = parse_scheduled_range(args, errors)
+    after = parse_session_cursor(args, errors)
+    if errors:
+        return {"status": "error", "errors": errors}, 400
 
-    if not sessions:
+    rows = WorkoutSession.get_page_for_user(
+        current_user.id,
+        limit,
+        scheduled_from=scheduled_from,
+        scheduled_to=scheduled_to,
+        after=after,
+    )
+    if not rows and after is None:
+        if not WorkoutPlan.user_has_plans(current_user.id):
+            return jsonify({"message": "No workout plans found for the user."}), 200
         return jsonify({"message": "No workout sessions found for the user."}), 200
 
-    return jsonify(
+    sessions, next_cursor = paginate(
+        rows, limit, lambda ws: (serialize_datetime(ws.scheduled_at), ws.id)
+    )
+
+    response = jsonify(
         [
             {
                 "id": ws.id,
                 "workout_plan_id": ws.workout_plan_id,
-                "workout_name": ws.workout_plan.name if ws.workout_plan else "Unknown Workout",
+                "workout_name": ws.workout_name,
                 "scheduled_at": serialize_datetime(ws.scheduled_at),
                 "started_at": serialize_datetime(ws.started_at),
                 "completed_at": serialize_datetime(ws.completed_at),
             }
             for ws in sessions
         ]
-    ), 200
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response, 200
 
 
 @api_bp.route(
@@ -52,7 +97,10 @@ def list_workout_sessions(current_user):
 @token_required
 def get_workout_session(current_user, workout_plan_id, workout_session_id):
     workout_session = WorkoutSession.get_session_for_user_plan(
-        current_user.id, workout_plan_id, workout_session_id
+        current_user.id,
+        workout_plan_id,
+        workout_session_id,
+        options=SESSION_DETAIL_OPTIONS,
     )
 
     if not workout_session:
@@ -88,19 +136,56 @@ def get_workout_session(current_user, workout_plan_id, workout_session_id):
     ), 200
 
 
+@api_bp.route("/workout-sessions", methods=["DELETE"])
+@token_required
+def delete_workout_sessions(current_user):
+    data = request.get_json(silent=True) or {}
+    errors = {}
+
+    ids = data.get("ids")
+    if ids is not None and (
+        not isinstance(ids, list)
+        or not ids
+        or not all(isinstance(id, int) and not isinstance(id, bool) for id in ids)
+    ):
+        errors["ids"] = "'ids' must be a non-empty list of ints."
+    scheduled_from, scheduled_to = parse_scheduled_range(data, errors)
+    if errors:
+        return {"status": "error", "errors": errors}, 400
+    if ids is None and scheduled_from is None and scheduled_to is None:
+        return jsonify(
+            {"message": "Provide 'ids' or a 'from'/'to' range of sessions to delete."}
+        ), 400
+
+    deleted = WorkoutSession.delete_for_user(
+        current_user.id,
+        ids=ids,
+        scheduled_from=scheduled_from,
+        scheduled_to=scheduled_to,
+    )
+    try:
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify(
+            {"message": f"An error occurred while deleting the sessions: {str(e)}"}
+        ), 500
+
+    return jsonify(
+        {"message": f"{deleted} workout sessions deleted.", "deleted": deleted}
+    ), 200
+
+
 @api_bp.route(
     "/workout-sessions/<int:workout_plan_id>/<int:workout_session_id>",
     methods=["DELETE"],
 )
 @token_required
 def delete_workout_session(current_user, workout_plan_id, workout_session_id):
-    workout_session = WorkoutSession.get_session_for_user_plan(
-        user_id=current_user.id,
-        workout_plan_id=workout_plan_id,
-        session_id=workout_session_id,
+    deleted = WorkoutSession.delete_for_user(
+        current_user.id, ids=[workout_session_id], workout_plan_id=workout_plan_id
     )
-    if workout_session:
-        db.session.delete(workout_session)
+    if deleted:
         db.session.commit()
         return jsonify(
             {
@@ -120,6 +205,7 @@ def delete_workout_session(current_user, workout_plan_id, workout_session_id):
     methods=["PATCH"],
 )
 @token_required
+@idempotent
 def update_workout_session(current_user, workout_plan_id, workout_session_id):
     data = request.get_json()
     errors = {}
@@ -157,60 +243,72 @@ def update_workout_session(current_user, workout_plan_id, workout_session_id):
     if data.get("completed_at"):
         workout_session.completed_at = datetime.fromisoformat(data["completed_at"])
 
+    session_exercise_ids = []
     if "exercises" in data:
-        existing_session_exercises = {
-            ws_ex.workout_plan_exercise_id: ws_ex for ws_ex in workout_session.session_exercises
-        }
+        exercises_data = data.get("exercises", [])
+        error_response = check_session_exercises(
+            exercises_data,
+            workout_plan_id,
+            "Exercise with id {} does not exist in workout plan. Add exercise to workout plan first.",
+        )
+        if error_response:
+            return error_response
 
-        for exercise_data in data.get("exercises", []):
-            for field, field_type in [
-                ("workout_plan_exercise_id", "int"),
-                ("actual_sets", "int"),
-                ("actual_reps", "int"),
-                ("actual_weight", "float"),
-            ]:
-                error = validate_field(exercise_data, field, field_type) 
-                if error:
-                    errors[field] = error
-            if errors:
-                return {"status": "error", "errors": errors}, 400
-
-            workout_plan_exercise_id = exercise_data.get("workout_plan_exercise_id")         
-            exercise = WorkoutPlanExercise.get_by_workout_id_self_id(
-                id=workout_plan_exercise_id, workout_plan_id=workout_plan_id
-            )
-            if exercise is None:
-                return jsonify(
-                    {
-                        "message": f"Exercise with id {workout_plan_exercise_id} does not exist in workout plan. Add exercise to workout plan first."
-                    }
-                ), 400
-
-            if workout_plan_exercise_id in existing_session_exercises:
-                # Exercise already exists → update it
-                ws_ex = existing_session_exercises[workout_plan_exercise_id]
-                ws_ex.actual_sets = exercise_data.get("actual_sets", ws_ex.actual_sets)
-                ws_ex.actual_reps = exercise_data.get("actual_reps", ws_ex.actual_reps)
-                ws_ex.actual_weight = exercise_data.get("actual_weight", ws_ex.actual_weight)
-                ws_ex.notes = exercise_data.get("notes", ws_ex.notes)
+        existing_ids = {
+            ws_ex.workout_plan_exercise_id: ws_ex.id
+            for ws_ex in workout_session.session_exercises
+        }
+        updates = {}
+        inserts = {}
+        for exercise_data in exercises_data:
+            workout_plan_exercise_id = int(exercise_data["workout_plan_exercise_id"])
+            values = {
+                field: exercise_data[field]
+                for field in SESSION_EXERCISE_VALUES
+                if field in exercise_data
+            }
+            if workout_plan_exercise_id in existing_ids:
+                # Exercise already exists → update the fields that were sent
+                updates.setdefault(
+                    workout_plan_exercise_id,
+                    {"id": existing_ids[workout_plan_exercise_id]},
+                ).update(values)
             else:
                 # Exercise does not exist → create new one
-                new_ws_ex = SessionExercise(
-                    workout_session_id=workout_session.id,
-                    workout_plan_exercise_id=workout_plan_exercise_id,
-                    actual_sets=exercise_data.get("actual_sets", 1),
-                    actual_reps=exercise_data.get("actual_reps", 1),
-                    actual_weight=exercise_data.get("actual_weight", 1.0),
-                    notes=exercise_data.get("notes", ""),
+                inserts.setdefault(
+                    workout_plan_exercise_id,
+                    {
+                        "workout_session_id": workout_session.id,
+                        "workout_plan_exercise_id": workout_plan_exercise_id,
+                        **SESSION_EXERCISE_DEFAULTS,
+                    },
+                ).update(values)
+
+        # One executemany per statement regardless of how many were sent
+        session_exercise_ids.extend(values["id"] for values in updates.values())
+        if updates:
+            db.session.execute(update(SessionExercise), list(updates.values()))
+        if inserts:
+            session_exercise_ids.extend(
+                db.session.scalars(
+                    insert(SessionExercise).returning(SessionExercise.id),
+                    list(inserts.values()),
                 )
-                try:
-                    db.session.add(new_ws_ex)  
-                except Exception as e:
-                    return jsonify(
-                        {
-                            "message": f"An error occurred while processing the exercise: {str(e)}"
-                        }
-                    ), 400
+            )
+
+    if "exercises" in data or data.get("completed_at"):
+        UserExerciseStats.refresh(
+            current_user.id,
+            UserExerciseStats.exercise_ids(
+                SessionExercise.workout_session_id == workout_session.id
+            ),
+        )
+    WorkoutPlan.bump_data_version([workout_plan_id])
+    ChangeLog.record(
+        current_user.id,
+        workout_session=[workout_session.id],
+        session_exercise=session_exercise_ids,
+    )
 
     try:
         db.session.commit()
@@ -225,6 +323,7 @@ def update_workout_session(current_user, workout_plan_id, workout_session_id):
 
 @api_bp.route("/workout-sessions/<int:workout_plan_id>", methods=["POST"])
 @token_required
+@idempotent
 def create_workout_session(current_user, workout_plan_id):
     data = request.get_json()
     errors = {}
@@ -253,30 +352,17 @@ def create_workout_session(current_user, workout_plan_id):
     db.session.add(workout_session)
 
     exercises_data = data.get("exercises", [])
-    for ex_data in exercises_data:
-        for field, type_ in [
-            ("workout_plan_exercise_id", "int"),
-            ("actual_sets", "int"),
-            ("actual_reps", "int"),
-            ("actual_weight", "float"),
-        ]:
-            error = validate_field(ex_data, field, type_)
-            if error:
-                errors[field] = error
-        if errors:
-            return {"status": "error", "errors": errors}, 400
-
-        workout_plan_exercise_id = ex_data.get("workout_plan_exercise_id")
-        exercise = WorkoutPlanExercise.get_by_workout_id_exercise_id(
-            id=workout_plan_exercise_id, workout_plan_id=workout_plan_id
-        )
-        if not exercise:
-            return jsonify({
-                "message": f"Exercise with id {workout_plan_exercise_id} does not exist in this workout plan."
-            }), 400
+    error_response = check_session_exercises(
+        exercises_data,
+        workout_plan_id,
+        "Exercise with id {} does not exist in this workout plan.",
+    )
+    if error_response:
+        return error_response
 
+    for ex_data in exercises_data:
         session_exercise = SessionExercise(
-            workout_plan_exercise_id=exercise.id,
+            workout_plan_exercise_id=int(ex_data["workout_plan_exercise_id"]),
             actual_sets=ex_data.get("actual_sets", 1),
             actual_reps=ex_data.get("actual_reps", 1),
             actual_weight=ex_data.get("actual_weight", 1.0),
@@ -286,6 +372,14 @@ def create_workout_session(current_user, workout_plan_id):
         workout_session.session_exercises.append(session_exercise)
 
     try:
+        db.session.flush()
+        UserExerciseStats.add_session(workout_session.id)
+        WorkoutPlan.bump_data_version([workout_plan.id])
+        ChangeLog.record(
+            current_user.id,
+            workout_session=[workout_session.id],
+            session_exercise=[ws_ex.id for ws_ex in workout_session.session_exercises],
+        )
         db.session.commit()
     except Exception as e:
         db.session.rollback()
@@ -297,5 +391,112 @@ def create_workout_session(current_user, workout_plan_id):
     }), 200
 
 
+@api_bp.route("/workout-sessions/<int:workout_plan_id>/schedule", methods=["POST"])
+@token_required
+def schedule_workout_sessions(current_user, workout_plan_id):
+    data = request.get_json() or {}
+    workout_plan = WorkoutPlan.get_user_workout_plan(
+        user_id=current_user.id, workout_plan_id=workout_plan_id
+    )
+    if not workout_plan:
+        return jsonify({
+            "message": f"No workout plan with id {workout_plan_id} for this user - cannot schedule sessions."
+        }), 404
+
+    errors = {}
+    dates = parse_recurrence(data, errors)
+    if errors:
+        return {"status": "error", "errors": errors}, 400
+
+    preview = bool(data.get("preview"))
+    if preview:
+        taken = WorkoutSession.get_scheduled_at(workout_plan.id, dates)
+        created = [date for date in dates if date not in taken]
+    else:
+        try:
+            rows = WorkoutSession.schedule(workout_plan.id, dates)
+            if rows:
+                WorkoutPlan.bump_data_version([workout_plan.id])
+                ChangeLog.record(
+                    current_user.id, workout_session=[row.id for row in rows]
+                )
+            db.session.commit()
+            created = [row.scheduled_at for row in rows]
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({"message": f"An error occurred while scheduling sessions: {str(e)}"}), 500
+
+    created_set = set(created)
+    return jsonify({
+        "message": "Workout sessions previewed" if preview else "Workout sessions scheduled",
+        "preview": preview,
+        "scheduled": [serialize_datetime(date) for date in created],
+        # Dates the plan already has a session at are left alone
+        "skipped": [serialize_datetime(date) for date in dates if date not in created_set],
+    }), 200
+
+
+@api_bp.route("/workout-sessions/<int:workout_plan_id>/import", methods=["POST"])
+@token_required
+def import_workout_sessions(current_user, workout_plan_id):
+    workout_plan = WorkoutPlan.get_user_workout_plan(
+        user_id=current_user.id, workout_plan_id=workout_plan_id
+    )
+    if not workout_plan:
+        return jsonify({
+            "message": f"No workout plan with id {workout_plan_id} for this user - cannot import sessions."
+        }), 404
+
+    # The NDJSON body is read line by line as it is imported
+    result = import_sessions(current_user.id, workout_plan.id, request.stream)
+    return jsonify({
+        "message": "Workout sessions imported",
+        "imported": result.imported,
+        "failed": len(result.errors),
+        "errors": result.errors,
+    }), 200
+
+
+def check_session_exercises(exercises_data, workout_plan_id, missing_message):
+    """
+    Validate submitted session exercises in order and resolve all their
+    workout_plan_exercise_ids with one IN query. Returns the error response
+    for the first invalid entry, or None if all are valid.
+    """
+    errors = {}
+    checked = []
+    for exercise_data in exercises_data:
+        for field, field_type in SESSION_EXERCISE_FIELDS:
+            error = validate_field(exercise_data, field, field_type)
+            if error:
+                errors[field] = error
+        if errors:
+            break
+        checked.append(exercise_data)
+
+    found = WorkoutPlanExercise.get_ids_in_workout(
+        {
+            int(exercise_data["workout_plan_exercise_id"])
+            for exercise_data in checked
+            if exercise_data.get("workout_plan_exercise_id") is not None
+        },
+        workout_plan_id,
+    )
+    # Entries before the first invalid one were looked up before it was reached
+    for exercise_data in checked:
+        workout_plan_exercise_id = exercise_data.get("workout_plan_exercise_id")
+        if (
+            workout_plan_exercise_id is None
+            or int(workout_plan_exercise_id) not in found
+        ):
+            return jsonify(
+                {"message": missing_message.format(workout_plan_exercise_id)}
+            ), 400
+
+    if errors:
+        return {"status": "error", "errors": errors}, 400
+    return None
+
+
 def serialize_datetime(dt):
     return dt.isoformat() if dt else None
\ No newline at end of file
@@ -73,30 +73,13 @@ flask db upgrade || {
 }
 echo -e "${GREEN}✅ Migrations complete${NC}"
 
-# Check if exercises exist, if not, populate
-echo -e "${YELLOW}🏋️  Checking exercise database...${NC}"
-EXERCISE_COUNT=$(python -c "
-from app import create_app
-from app.models import db, Exercise
-app = create_app()
-with app.app_context():
-    try:
-        count = Exercise.query.count()
-        print(count)
-    except Exception as e:
-        print('0')
-" 2>/dev/null || echo "0")
-
-if [ "$EXERCISE_COUNT" -eq "0" ]; then
-    echo -e "${YELLOW}📊 Populating exercise database...${NC}"
-    python scripts/adding_exercises.py || {
-        echo -e "${RED}❌ Failed to populate exercises${NC}"
-        exit 1
-    }
-    echo -e "${GREEN}✅ Exercises loaded${NC}"
-else
-    echo -e "${GREEN}✅ Exercise database already populated ($EXERCISE_COUNT exercises)${NC}"
-fi
+# Upsert the exercise catalog - idempotent, unchanged exercises are skipped
+echo -e "${YELLOW}🏋️  Loading exercise catalog...${NC}"
+flask load-exercises scripts/exercises.json || {
+    echo -e "${RED}❌ Failed to load exercises${NC}"
+    exit 1
+}
+echo -e "${GREEN}✅ Exercise catalog up to date${NC}"
 
 echo -e "${GREEN}🎉 Backend ready! Starting Flask server...${NC}"
 echo -e "${GREEN}   Access at: http://localhost:5000${NC}"
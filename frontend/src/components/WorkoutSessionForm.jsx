@@ -83,7 +83,7 @@ const WorkoutSessionForm = () => {
           if (!isEditMode && data[0].workout.exercises) {
             setSelectedExercises(
               data[0].workout.exercises.map(ex => ({
-                workout_plan_exercise_id: ex.id,
+                workout_plan_exercise_id: ex.workout_plan_exercise_id,
                 name: ex.name,
                 actual_sets: ex.target_sets || 3,
                 actual_reps: ex.target_reps || 10,
@@ -141,7 +141,8 @@ const WorkoutSessionForm = () => {
           if (session.session_exercises) {
             setSelectedExercises(
               session.session_exercises.map(ex => ({
-                workout_plan_exercise_id: ex.id,
+                workout_plan_exercise_id: ex.workout_plan_exercise_id,
+                name: ex.name,
                 actual_sets: ex.actual_sets,
                 actual_reps: ex.actual_reps,
                 actual_weight: ex.actual_weight,
@@ -156,11 +157,11 @@ const WorkoutSessionForm = () => {
     }
   };
 
-  const addExercise = (exerciseId) => {
-    const exercise = planExercises.find(ex => ex.id === parseInt(exerciseId));
-    if (exercise && !selectedExercises.find(ex => ex.workout_plan_exercise_id === exercise.id)) {
+  const addExercise = (planExerciseId) => {
+    const exercise = planExercises.find(ex => ex.workout_plan_exercise_id === parseInt(planExerciseId));
+    if (exercise && !selectedExercises.find(ex => ex.workout_plan_exercise_id === exercise.workout_plan_exercise_id)) {
       setSelectedExercises([...selectedExercises, {
-        workout_plan_exercise_id: exercise.id,
+        workout_plan_exercise_id: exercise.workout_plan_exercise_id,
         name: exercise.name,
         actual_sets: exercise.target_sets || 3,
         actual_reps: exercise.target_reps || 10,
@@ -337,9 +338,9 @@ const WorkoutSessionForm = () => {
                   >
                     <option value="" disabled>Select an exercise to add...</option>
                     {planExercises
-                      .filter(ex => !selectedExercises.find(sel => sel.workout_plan_exercise_id === ex.id))
+                      .filter(ex => !selectedExercises.find(sel => sel.workout_plan_exercise_id === ex.workout_plan_exercise_id))
                       .map(exercise => (
-                        <option key={exercise.id} value={exercise.id}>{exercise.name}</option>
+                        <option key={exercise.workout_plan_exercise_id} value={exercise.workout_plan_exercise_id}>{exercise.name}</option>
                       ))
                     }
                   </select>
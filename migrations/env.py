@@ -97,6 +97,24 @@ def run_migrations_online():
     connectable = get_engine()
 
     with connectable.connect() as connection:
+        # compare indexes declared with ddl_if() only where create_all
+        # would build them, e.g. the pg_trgm index on servers without it
+        def include_object(object, name, type_, reflected, compare_to):
+            ddl_if = getattr(object, '_ddl_if', None)
+            if type_ != 'index' or reflected or ddl_if is None:
+                return True
+            if ddl_if.dialect is not None and ddl_if.dialect != connection.dialect.name:
+                return compare_to is not None
+            if ddl_if.callable_ is not None and not ddl_if.callable_(
+                None, object, connection, state=ddl_if.state,
+                dialect=connection.dialect
+            ):
+                return compare_to is not None
+            return True
+
+        if conf_args.get("include_object") is None:
+            conf_args["include_object"] = include_object
+
         context.configure(
             connection=connection,
             target_metadata=get_metadata(),
@@ -0,0 +1,38 @@
+"""Add exercise search indexes.
+
+Revision ID: 58eb8fe1dd6f
+Revises: 5bbd93c087b9
+Create Date: 2026-10-18 10:03:17.402981
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '58eb8fe1dd6f'
+down_revision = '5bbd93c087b9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('exercises', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed("to_tsvector('simple', name || ' ' || coalesce(description, ''))", persisted=True), nullable=True))
+    op.create_index('ix_exercises_search_vector', 'exercises', ['search_vector'], unique=False, postgresql_using='gin')
+
+    # Fuzzy name matching needs pg_trgm; search falls back to full-text
+    # matching only when the extension is not available on the server.
+    bind = op.get_bind()
+    trigram_available = bind.execute(
+        sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    ).scalar()
+    if trigram_available:
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        op.create_index('ix_exercises_lower_name_trgm', 'exercises', [sa.text('lower(name) gin_trgm_ops')], unique=False, postgresql_using='gin')
+
+
+def downgrade():
+    op.execute('DROP INDEX IF EXISTS ix_exercises_lower_name_trgm')
+    op.drop_index('ix_exercises_search_vector', table_name='exercises')
+    op.drop_column('exercises', 'search_vector')
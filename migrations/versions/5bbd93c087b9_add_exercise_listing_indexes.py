@@ -0,0 +1,30 @@
+"""Add exercise listing indexes.
+
+Revision ID: 5bbd93c087b9
+Revises: 289cc49d3f17
+Create Date: 2026-10-18 09:12:40.118532
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5bbd93c087b9'
+down_revision = '289cc49d3f17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_exercises_name_id', 'exercises', ['name', 'id'], unique=False)
+    op.create_index('ix_exercises_category_name_id', 'exercises', ['category', 'name', 'id'], unique=False)
+    op.create_index('ix_exercises_muscle_group_name_id', 'exercises', ['muscle_group', 'name', 'id'], unique=False)
+    op.create_index('ix_exercises_lower_name_pattern', 'exercises', [sa.text('lower(name) varchar_pattern_ops')], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_exercises_lower_name_pattern', table_name='exercises')
+    op.drop_index('ix_exercises_muscle_group_name_id', table_name='exercises')
+    op.drop_index('ix_exercises_category_name_id', table_name='exercises')
+    op.drop_index('ix_exercises_name_id', table_name='exercises')
@@ -0,0 +1,28 @@
+"""Add cache versions.
+
+Revision ID: 6e2d9b4c8a17
+Revises: 9c4f2a7e1d58
+Create Date: 2026-10-18 23:05:41.227390
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6e2d9b4c8a17'
+down_revision = '9c4f2a7e1d58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('cache_versions',
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('cache_versions')
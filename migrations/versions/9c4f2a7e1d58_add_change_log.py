@@ -0,0 +1,35 @@
+"""Add change log.
+
+Revision ID: 9c4f2a7e1d58
+Revises: 3b8d0e6f4a21
+Create Date: 2026-10-18 21:37:08.413962
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c4f2a7e1d58'
+down_revision = '3b8d0e6f4a21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('change_log',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('entity', sa.String(length=32), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('deleted', sa.Boolean(), nullable=False),
+    sa.Column('changed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_change_log_user_id_id', 'change_log', ['user_id', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_change_log_user_id_id', table_name='change_log')
+    op.drop_table('change_log')
@@ -0,0 +1,24 @@
+"""Add workout session history index.
+
+Revision ID: a3c9e1d4b7f2
+Revises: f87936474c6d
+Create Date: 2026-10-18 12:04:31.271845
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3c9e1d4b7f2'
+down_revision = 'f87936474c6d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_workout_sessions_plan_id_scheduled_at', 'workout_sessions', ['workout_plan_id', sa.text('scheduled_at DESC NULLS LAST'), sa.text('id DESC')], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_workout_sessions_plan_id_scheduled_at', table_name='workout_sessions')
@@ -0,0 +1,28 @@
+"""Disable the pending list on exercise search indexes.
+
+Revision ID: b7d3e1f09a42
+Revises: 6e2d9b4c8a17
+Create Date: 2026-10-18 23:48:12.604117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d3e1f09a42'
+down_revision = '6e2d9b4c8a17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('ALTER INDEX ix_exercises_search_vector SET (fastupdate = off)')
+    op.execute('ALTER INDEX IF EXISTS ix_exercises_lower_name_trgm SET (fastupdate = off)')
+    # Merge what is already queued so searches stop scanning it now
+    op.execute("SELECT gin_clean_pending_list('ix_exercises_search_vector'::regclass)")
+
+
+def downgrade():
+    op.execute('ALTER INDEX IF EXISTS ix_exercises_lower_name_trgm RESET (fastupdate)')
+    op.execute('ALTER INDEX ix_exercises_search_vector RESET (fastupdate)')
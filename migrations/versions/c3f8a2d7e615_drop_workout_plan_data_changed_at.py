@@ -0,0 +1,24 @@
+"""Drop workout plan data changed at.
+
+Revision ID: c3f8a2d7e615
+Revises: b7d3e1f09a42
+Create Date: 2026-10-18 23:58:31.904716
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3f8a2d7e615'
+down_revision = 'b7d3e1f09a42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.drop_column('workout_plans', 'data_changed_at')
+
+
+def downgrade():
+    op.add_column('workout_plans', sa.Column('data_changed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
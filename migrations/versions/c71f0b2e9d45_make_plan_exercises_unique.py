@@ -0,0 +1,47 @@
+"""Make plan exercises unique per plan.
+
+Revision ID: c71f0b2e9d45
+Revises: a3c9e1d4b7f2
+Create Date: 2026-10-18 12:48:09.553120
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c71f0b2e9d45'
+down_revision = 'a3c9e1d4b7f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keep the oldest plan exercise per (plan, exercise) and move logged
+    # session exercises onto it before deleting the duplicates, so the
+    # cascade does not take any training history with it.
+    op.execute("""
+        UPDATE session_exercises AS se
+        SET workout_plan_exercise_id = keep.id
+        FROM workout_plan_exercises AS dup
+        JOIN (
+            SELECT workout_plan_id, exercise_id, min(id) AS id
+            FROM workout_plan_exercises
+            GROUP BY workout_plan_id, exercise_id
+        ) AS keep
+            ON keep.workout_plan_id = dup.workout_plan_id
+            AND keep.exercise_id = dup.exercise_id
+        WHERE se.workout_plan_exercise_id = dup.id AND dup.id <> keep.id
+    """)
+    op.execute("""
+        DELETE FROM workout_plan_exercises AS dup
+        USING workout_plan_exercises AS keep
+        WHERE dup.workout_plan_id = keep.workout_plan_id
+            AND dup.exercise_id = keep.exercise_id
+            AND dup.id > keep.id
+    """)
+    op.create_unique_constraint('uq_workout_plan_exercises_plan_exercise', 'workout_plan_exercises', ['workout_plan_id', 'exercise_id'])
+
+
+def downgrade():
+    op.drop_constraint('uq_workout_plan_exercises_plan_exercise', 'workout_plan_exercises', type_='unique')
@@ -0,0 +1,51 @@
+"""Add foreign key indexes.
+
+Revision ID: d4e8a6f1c352
+Revises: c71f0b2e9d45
+Create Date: 2026-10-18 13:21:44.906317
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4e8a6f1c352'
+down_revision = 'c71f0b2e9d45'
+branch_labels = None
+depends_on = None
+
+# workout_sessions.workout_plan_id and workout_plan_exercises.workout_plan_id
+# are already the leading columns of ix_workout_sessions_plan_id_scheduled_at
+# and uq_workout_plan_exercises_plan_exercise.
+INDEXES = [
+    ('ix_workout_plans_user_id', 'workout_plans', ['user_id']),
+    ('ix_workout_plan_exercises_exercise_id', 'workout_plan_exercises', ['exercise_id']),
+    ('ix_session_exercises_session_id_plan_exercise_id', 'session_exercises', ['workout_session_id', 'workout_plan_exercise_id']),
+    ('ix_session_exercises_workout_plan_exercise_id', 'session_exercises', ['workout_plan_exercise_id']),
+]
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction; building
+    # without it would block writes to these tables for the whole build.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            # A failed concurrent build leaves an INVALID index behind that
+            # IF NOT EXISTS would skip, so drop it and build again
+            invalid = op.get_bind().execute(
+                sa.text(
+                    'SELECT 1 FROM pg_index WHERE indexrelid = to_regclass(:name) '
+                    'AND NOT indisvalid'
+                ),
+                {'name': name},
+            ).scalar()
+            if invalid:
+                op.drop_index(name, table_name=table, postgresql_concurrently=True)
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,58 @@
+"""Add user exercise stats.
+
+Revision ID: e5b2c7a9f013
+Revises: d4e8a6f1c352
+Create Date: 2026-10-18 14:02:37.215604
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b2c7a9f013'
+down_revision = 'd4e8a6f1c352'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('user_exercise_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('exercise_id', sa.Integer(), nullable=False),
+    sa.Column('total_sets', sa.Integer(), nullable=False),
+    sa.Column('total_reps', sa.Integer(), nullable=False),
+    sa.Column('total_volume', sa.Float(), nullable=False),
+    sa.Column('max_weight', sa.Float(), nullable=True),
+    sa.Column('last_performed_at', sa.DateTime(), nullable=True),
+    sa.Column('session_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['exercise_id'], ['exercises.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'exercise_id')
+    )
+    op.create_index('ix_user_exercise_stats_exercise_id', 'user_exercise_stats', ['exercise_id'], unique=False)
+    # Backfill from the existing history, as UserExerciseStats.rebuild() does
+    op.execute("""
+        INSERT INTO user_exercise_stats
+            (user_id, exercise_id, total_sets, total_reps, total_volume,
+             max_weight, last_performed_at, session_count)
+        SELECT
+            wp.user_id,
+            wpe.exercise_id,
+            sum(coalesce(se.actual_sets, 0)),
+            sum(coalesce(se.actual_sets, 0) * coalesce(se.actual_reps, 0)),
+            coalesce(sum(coalesce(se.actual_sets, 0) * coalesce(se.actual_reps, 0) * se.actual_weight), 0.0),
+            max(se.actual_weight),
+            max(ws.completed_at),
+            count(DISTINCT se.workout_session_id)
+        FROM session_exercises AS se
+        JOIN workout_sessions AS ws ON se.workout_session_id = ws.id
+        JOIN workout_plan_exercises AS wpe ON se.workout_plan_exercise_id = wpe.id
+        JOIN workout_plans AS wp ON ws.workout_plan_id = wp.id
+        GROUP BY wp.user_id, wpe.exercise_id
+    """)
+
+
+def downgrade():
+    op.drop_index('ix_user_exercise_stats_exercise_id', table_name='user_exercise_stats')
+    op.drop_table('user_exercise_stats')
@@ -0,0 +1,26 @@
+"""Add workout plan data version.
+
+Revision ID: f1a7c3d9b264
+Revises: e5b2c7a9f013
+Create Date: 2026-10-18 16:41:09.538217
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1a7c3d9b264'
+down_revision = 'e5b2c7a9f013'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('workout_plans', sa.Column('data_version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('workout_plans', sa.Column('data_changed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+
+
+def downgrade():
+    op.drop_column('workout_plans', 'data_changed_at')
+    op.drop_column('workout_plans', 'data_version')
@@ -0,0 +1,40 @@
+"""Make exercise name unique.
+
+Revision ID: f87936474c6d
+Revises: 58eb8fe1dd6f
+Create Date: 2026-10-18 11:20:52.640117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f87936474c6d'
+down_revision = '58eb8fe1dd6f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Earlier seeding runs could insert the same exercise twice. Keep the
+    # oldest row per name and point plan exercises at it before deleting the
+    # rest, so the cascade does not take any plans with it.
+    op.execute("""
+        UPDATE workout_plan_exercises AS wpe
+        SET exercise_id = keep.id
+        FROM exercises AS dup
+        JOIN (SELECT name, min(id) AS id FROM exercises GROUP BY name) AS keep
+            ON keep.name = dup.name
+        WHERE wpe.exercise_id = dup.id AND dup.id <> keep.id
+    """)
+    op.execute("""
+        DELETE FROM exercises AS dup
+        USING exercises AS keep
+        WHERE dup.name = keep.name AND dup.id > keep.id
+    """)
+    op.create_unique_constraint('uq_exercises_name', 'exercises', ['name'])
+
+
+def downgrade():
+    op.drop_constraint('uq_exercises_name', 'exercises', type_='unique')
@@ -0,0 +1,117 @@
+"""
+Latency benchmark for /api/exercises/search on a large synthetic catalog.
+
+Builds a catalog of --size exercises and reports p50/p99 search latency for
+the in-memory inverted index. With --postgres the same catalog is inserted
+into the configured database (inside a transaction that is rolled back) and
+the full-text query is measured as well.
+
+    python scripts/benchmark_exercise_search.py --size 50000
+
+On Postgres 16 with 50,000 exercises the full-text query measures a p50 of
+2.4-2.8 ms and a p99 of 9.1-10.6 ms across fresh databases, so the 10 ms p99
+target is not reliably met. The tail is broad prefix queries ("single leg"
+matches ~8% of the catalog): GIN partial matching, heap visits and ts_rank
+cost about 3 ms each over thousands of rows.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+# Add the root directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.utils.exercise_search import InvertedIndex
+
+MOVEMENTS = [
+    "press", "squat", "deadlift", "row", "curl", "raise", "pulldown", "lunge",
+    "extension", "fly", "thrust", "dip", "pullover", "shrug", "crunch", "carry",
+]
+MODIFIERS = [
+    "barbell", "dumbbell", "cable", "machine", "kettlebell", "incline", "decline",
+    "seated", "standing", "single arm", "single leg", "paused", "tempo", "banded",
+    "sumo", "front", "overhead", "reverse", "close grip", "wide grip",
+]
+MUSCLES = [
+    "chest", "back", "legs", "glutes", "shoulders", "biceps", "triceps", "core",
+    "hamstrings", "quadriceps", "calves", "forearms",
+]
+QUERIES = [
+    "press", "bench", "dumbbell curl", "incline press", "sq", "single leg",
+    "kettlebell swing", "cable fly", "dedlift", "pause squat", "overhead ext",
+    "glutes", "row 12", "banded pull",
+]
+
+
+def synthetic_catalog(size, seed=42):
+    rng = random.Random(seed)
+    catalog = []
+    for i in range(1, size + 1):
+        movement = rng.choice(MOVEMENTS)
+        modifiers = rng.sample(MODIFIERS, rng.randint(1, 2))
+        muscle = rng.choice(MUSCLES)
+        catalog.append(
+            {
+                "id": i,
+                "name": f"{' '.join(modifiers).title()} {movement.title()} {i}",
+                "description": f"{movement} variation targeting the {muscle}",
+                "category": "Strength",
+                "muscle_group": muscle.title(),
+            }
+        )
+    return catalog
+
+
+def measure(search, repeats):
+    timings = []
+    for _ in range(repeats):
+        for query in QUERIES:
+            start = time.perf_counter()
+            search(query)
+            timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.99) - 1]
+
+
+def report(label, p50, p99):
+    print(f"{label:<12} p50 {p50:6.2f} ms   p99 {p99:6.2f} ms")
+
+
+def benchmark_postgres(catalog, repeats, limit):
+    from app import create_app
+    from app.models import Exercise, db
+    from app.utils.exercise_search import search_exercises
+
+    app = create_app()
+    app.config["EXERCISE_SEARCH_BACKEND"] = "postgres"
+    with app.app_context():
+        try:
+            db.session.execute(
+                Exercise.__table__.insert(),
+                [{k: v for k, v in row.items() if k != "id"} for row in catalog],
+            )
+            db.session.execute(db.text("ANALYZE exercises"))
+            report("postgres", *measure(lambda q: search_exercises(q, limit), repeats))
+        finally:
+            db.session.rollback()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=50000)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--postgres", action="store_true")
+    args = parser.parse_args()
+
+    catalog = synthetic_catalog(args.size)
+    start = time.perf_counter()
+    index = InvertedIndex(catalog)
+    print(f"{args.size} exercises, index built in {time.perf_counter() - start:.2f} s")
+    report("memory", *measure(lambda q: index.search(q, args.limit), args.repeats))
+
+    if args.postgres:
+        benchmark_postgres(catalog, args.repeats, args.limit)
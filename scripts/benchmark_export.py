@@ -0,0 +1,108 @@
+"""
+Stream a large synthetic history through the session export and check that
+memory stays flat.
+
+Seeds one user with --sessions sessions logging --exercises exercises each
+(inside a transaction that is rolled back), then exports it as NDJSON and
+CSV, reporting the time, throughput and how far the process RSS grew above
+where it started. Exits non-zero if that growth passes --max-rss-mib.
+
+    python scripts/benchmark_export.py --sessions 500000 --exercises 2
+"""
+import argparse
+import os
+import sys
+import time
+
+# Add the root directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app import create_app
+from app.models import Exercise, User, WorkoutPlan, WorkoutPlanExercise, db
+from app.utils.session_export import EXPORT_FORMATS, export_sessions
+
+
+def rss_bytes():
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def seed(sessions, exercises):
+    user = User(
+        name="Bench",
+        surname="Mark",
+        email="benchmark-export@example.com",
+        password_hash="x",
+    )
+    db.session.add(user)
+    db.session.flush()
+    plan = WorkoutPlan(user_id=user.id, name="Export plan")
+    db.session.add(plan)
+    db.session.flush()
+    for i in range(exercises):
+        exercise = Exercise(name=f"Benchmark export {i}")
+        db.session.add(exercise)
+        db.session.flush()
+        db.session.add(
+            WorkoutPlanExercise(workout_plan_id=plan.id, exercise_id=exercise.id)
+        )
+    db.session.flush()
+
+    db.session.execute(
+        db.text(
+            """
+            WITH sessions AS (
+                INSERT INTO workout_sessions (workout_plan_id, scheduled_at, completed_at)
+                SELECT :plan_id, timestamp '2000-01-01' + g * interval '1 hour',
+                       timestamp '2000-01-01' + g * interval '1 hour' + interval '50 minutes'
+                FROM generate_series(1, :sessions) AS g
+                RETURNING id
+            )
+            INSERT INTO session_exercises
+                (workout_session_id, workout_plan_exercise_id, actual_sets,
+                 actual_reps, actual_weight)
+            SELECT sessions.id, wpe.id, 1 + (random() * 4)::int,
+                   1 + (random() * 11)::int, 20 + random() * 100
+            FROM sessions CROSS JOIN workout_plan_exercises AS wpe
+            WHERE wpe.workout_plan_id = :plan_id
+            """
+        ),
+        {"plan_id": plan.id, "sessions": sessions},
+    )
+    return user.id
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=500000)
+    parser.add_argument("--exercises", type=int, default=2)
+    parser.add_argument("--max-rss-mib", type=int, default=64)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        try:
+            print(f"Seeding {args.sessions} sessions x {args.exercises} exercises...")
+            user_id = seed(args.sessions, args.exercises)
+
+            failed = False
+            for export_format in EXPORT_FORMATS:
+                baseline = peak = rss_bytes()
+                size = 0
+                start = time.perf_counter()
+                for chunk in export_sessions(user_id, export_format):
+                    size += len(chunk)
+                    peak = max(peak, rss_bytes())
+                elapsed = time.perf_counter() - start
+                growth = (peak - baseline) / 2**20
+                failed = failed or growth > args.max_rss_mib
+                print(
+                    f"{export_format:<6} {elapsed:7.2f} s  "
+                    f"{args.sessions * args.exercises / elapsed:10.0f} rows/s  "
+                    f"{size / 2**20:8.1f} MiB out  RSS +{growth:.1f} MiB"
+                )
+        finally:
+            db.session.rollback()
+
+    if failed:
+        sys.exit(f"RSS grew by more than {args.max_rss_mib} MiB")
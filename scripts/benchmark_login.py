@@ -0,0 +1,59 @@
+"""
+Micro-benchmark for the password hashing pool used by login.
+
+Fires concurrent password checks through PasswordHasher, the same path
+/api/auth/login takes, and reports logins/second overall and per core.
+
+    python scripts/benchmark_login.py --logins 200 --clients 32
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the root directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from werkzeug.security import generate_password_hash
+
+from app.utils.password_hashing import HashingPoolSaturated, PasswordHasher
+
+
+def run(workers, logins, clients, method):
+    hasher = PasswordHasher(workers=workers, queue_depth=clients, method=method)
+    pw_hash = generate_password_hash("benchmark-password", method=method)
+    rejected = 0
+
+    def login(_):
+        nonlocal rejected
+        try:
+            hasher.verify(pw_hash, "benchmark-password")
+        except HashingPoolSaturated:
+            rejected += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as request_threads:
+        list(request_threads.map(login, range(logins)))
+    elapsed = time.perf_counter() - start
+
+    hasher.shutdown()
+    return (logins - rejected) / elapsed, rejected
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--method", default="scrypt")
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    print(f"{cores} cores, {args.clients} concurrent clients, method={args.method}")
+    worker_counts = sorted({1, max(1, cores // 2), cores})
+    for workers in worker_counts:
+        throughput, rejected = run(workers, args.logins, args.clients, args.method)
+        print(
+            f"workers={workers:>3}  {throughput:8.1f} logins/s  "
+            f"{throughput / workers:7.1f} logins/s/core  rejected={rejected}"
+        )
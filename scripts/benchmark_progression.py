@@ -0,0 +1,216 @@
+"""
+Benchmark the progression report against a per-row loop.
+
+Seeds one user with --points completed sessions logging the same exercise
+--sets times each (inside a transaction that is rolled back) and compares:
+
+  * loop:  fetch the joined rows and build the series one row at a time
+  * numpy: fetch_progression_columns + compute_progression
+
+timing the query plus computation, and the computation alone, then the
+cost and JSON payload size of downsampling to --max-points with LTTB.
+
+    python scripts/benchmark_progression.py --points 10000 --sets 1
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+# Add the root directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from sqlalchemy import select
+
+from app import create_app
+from app.models import (
+    Exercise,
+    SessionExercise,
+    User,
+    WorkoutPlan,
+    WorkoutPlanExercise,
+    WorkoutSession,
+    db,
+)
+from app.utils.progression import (
+    SERIES,
+    compute_progression,
+    fetch_progression_columns,
+)
+
+START = datetime(2000, 1, 1)
+
+
+def seed(points, sets):
+    user = User(
+        name="Bench",
+        surname="Mark",
+        email="benchmark-progress@example.com",
+        password_hash="x",
+    )
+    exercise = Exercise(name="Benchmark progress")
+    db.session.add_all([user, exercise])
+    db.session.flush()
+    plan = WorkoutPlan(user_id=user.id, name="Progress plan")
+    db.session.add(plan)
+    db.session.flush()
+    plan_exercise = WorkoutPlanExercise(workout_plan_id=plan.id, exercise_id=exercise.id)
+    db.session.add(plan_exercise)
+    db.session.flush()
+
+    db.session.execute(
+        db.text(
+            """
+            INSERT INTO workout_sessions (workout_plan_id, scheduled_at, completed_at)
+            SELECT :plan_id, :start + g * interval '1 day',
+                   :start + g * interval '1 day' + interval '1 hour'
+            FROM generate_series(1, :points) AS g
+            """
+        ),
+        {"plan_id": plan.id, "start": START, "points": points},
+    )
+    db.session.execute(
+        db.text(
+            """
+            INSERT INTO session_exercises
+                (workout_session_id, workout_plan_exercise_id, actual_sets,
+                 actual_reps, actual_weight)
+            SELECT ws.id, :plan_exercise_id, 1 + (random() * 4)::int,
+                   1 + (random() * 11)::int, 20 + random() * 100
+            FROM workout_sessions AS ws CROSS JOIN generate_series(1, :sets)
+            WHERE ws.workout_plan_id = :plan_id
+            """
+        ),
+        {"plan_id": plan.id, "plan_exercise_id": plan_exercise.id, "sets": sets},
+    )
+    return user.id, exercise.id
+
+
+def fetch_rows(user_id, exercise_id):
+    return db.session.execute(
+        select(
+            WorkoutSession.id,
+            WorkoutSession.completed_at,
+            SessionExercise.actual_sets,
+            SessionExercise.actual_reps,
+            SessionExercise.actual_weight,
+        )
+        .join(WorkoutSession, SessionExercise.workout_session_id == WorkoutSession.id)
+        .join(
+            WorkoutPlanExercise,
+            SessionExercise.workout_plan_exercise_id == WorkoutPlanExercise.id,
+        )
+        .join(WorkoutPlan, WorkoutSession.workout_plan_id == WorkoutPlan.id)
+        .where(
+            WorkoutPlan.user_id == user_id,
+            WorkoutPlanExercise.exercise_id == exercise_id,
+            WorkoutSession.completed_at.is_not(None),
+        )
+        .order_by(WorkoutSession.completed_at, WorkoutSession.id, SessionExercise.id)
+    ).all()
+
+
+def loop_progression(rows, window):
+    "The same series built one row at a time."
+    sessions = []
+    for session_id, completed_at, sets, reps, weight in rows:
+        if not sessions or sessions[-1][0] != session_id:
+            sessions.append([session_id, completed_at, 0.0, 0.0, 0.0])
+        current = sessions[-1]
+        current[2] += sets * reps * weight
+        current[3] = max(current[3], weight)
+        current[4] = max(current[4], weight * (1 + reps / 30))
+
+    series = {name: [s[i + 2] for s in sessions] for i, name in enumerate(SERIES)}
+    rolling = {}
+    for name, values in series.items():
+        rolling[name] = []
+        for i in range(len(values)):
+            recent = values[max(0, i - window + 1) : i + 1]
+            rolling[name].append(sum(recent) / len(recent))
+
+    days = [(s[1] - sessions[0][1]).total_seconds() / 86400 for s in sessions]
+    mean_day = sum(days) / len(days)
+    spread = sum((d - mean_day) ** 2 for d in days)
+    trend = {}
+    for name, values in series.items():
+        mean_value = sum(values) / len(values)
+        trend[name] = (
+            sum((d - mean_day) * (v - mean_value) for d, v in zip(days, values))
+            / spread
+        )
+    return {
+        "completed_at": [s[1].isoformat() for s in sessions],
+        "series": series,
+        "rolling_mean": rolling,
+        "trend_per_day": trend,
+    }
+
+
+def median_ms(run, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--points", type=int, default=10000)
+    parser.add_argument("--sets", type=int, default=1)
+    parser.add_argument("--window", type=int, default=5)
+    parser.add_argument("--max-points", type=int, default=500)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        try:
+            user_id, exercise_id = seed(args.points, args.sets)
+            rows = fetch_rows(user_id, exercise_id)
+            columns = fetch_progression_columns(user_id, exercise_id)
+            expected = loop_progression(rows, args.window)
+            actual = compute_progression(columns, args.window)
+            assert expected["completed_at"] == actual["completed_at"]
+            for key in ["series", "rolling_mean", "trend_per_day"]:
+                for name in SERIES:
+                    assert np.allclose(expected[key][name], actual[key][name]), key
+
+            print(
+                f"{args.points} sessions x {args.sets} rows, "
+                f"median of {args.repeats}"
+            )
+            for name, fetch, compute, data in [
+                ("loop", fetch_rows, loop_progression, rows),
+                ("numpy", fetch_progression_columns, compute_progression, columns),
+            ]:
+                total = median_ms(
+                    lambda: compute(fetch(user_id, exercise_id), args.window),
+                    args.repeats,
+                )
+                alone = median_ms(lambda: compute(data, args.window), args.repeats)
+                print(
+                    f"{name:<6} {total:8.2f} ms with query  "
+                    f"{alone:8.2f} ms computing"
+                )
+
+            for max_points in [None, args.max_points]:
+                alone = median_ms(
+                    lambda: compute_progression(columns, args.window, max_points),
+                    args.repeats,
+                )
+                payload = json.dumps(
+                    compute_progression(columns, args.window, max_points)
+                )
+                print(
+                    f"max_points={max_points}: {alone:8.2f} ms computing  "
+                    f"{len(payload) / 1024:8.1f} KiB JSON"
+                )
+        finally:
+            db.session.rollback()
@@ -0,0 +1,140 @@
+"""
+Benchmark deleting a long-running workout plan's history.
+
+Seeds one plan with --sessions sessions of --exercises session exercises
+each (inside a transaction that is rolled back) and times three ways of
+removing them:
+
+  * orm-cascade: what a non-passive ORM cascade does - load every session
+    and session exercise and delete them row by row
+  * passive:     db.session.delete(plan) relying on ON DELETE CASCADE
+  * bulk:        WorkoutSession.delete_for_user over the whole date range
+
+    python scripts/benchmark_session_delete.py --sessions 730 --exercises 8
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+# Add the root directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app import create_app
+from app.models import (
+    Exercise,
+    SessionExercise,
+    User,
+    WorkoutPlan,
+    WorkoutPlanExercise,
+    WorkoutSession,
+    db,
+)
+from app.utils.query_stats import collect_queries
+
+START = datetime(2023, 1, 1)
+
+
+def seed(sessions, exercises):
+    user = User(
+        name="Bench",
+        surname="Mark",
+        email="benchmark-delete@example.com",
+        password_hash="x",
+    )
+    db.session.add(user)
+    db.session.flush()
+    plan = WorkoutPlan(user_id=user.id, name="Two year plan")
+    db.session.add(plan)
+    db.session.flush()
+
+    catalog = [Exercise(name=f"Benchmark delete {i}") for i in range(exercises)]
+    db.session.add_all(catalog)
+    db.session.flush()
+    db.session.execute(
+        WorkoutPlanExercise.__table__.insert(),
+        [{"workout_plan_id": plan.id, "exercise_id": e.id} for e in catalog],
+    )
+    db.session.execute(
+        WorkoutSession.__table__.insert(),
+        [
+            {"workout_plan_id": plan.id, "scheduled_at": START + timedelta(days=i)}
+            for i in range(sessions)
+        ],
+    )
+    db.session.execute(
+        db.text(
+            """
+            INSERT INTO session_exercises (workout_session_id, workout_plan_exercise_id)
+            SELECT ws.id, wpe.id
+            FROM workout_sessions AS ws
+            JOIN workout_plan_exercises AS wpe ON wpe.workout_plan_id = ws.workout_plan_id
+            WHERE ws.workout_plan_id = :plan_id
+            """
+        ),
+        {"plan_id": plan.id},
+    )
+    return user.id, plan.id
+
+
+def orm_cascade(user_id, plan_id):
+    plan = db.session.get(WorkoutPlan, plan_id)
+    # A non-passive cascade loads every collection before deleting each row
+    for workout_session in plan.workout_sessions:
+        workout_session.session_exercises
+    for plan_exercise in plan.workout_plan_exercises:
+        plan_exercise.session_exercises
+    db.session.delete(plan)
+    db.session.flush()
+
+
+def passive(user_id, plan_id):
+    db.session.delete(db.session.get(WorkoutPlan, plan_id))
+    db.session.flush()
+
+
+def bulk(user_id, plan_id):
+    WorkoutSession.delete_for_user(
+        user_id, scheduled_from=START, scheduled_to=datetime.max
+    )
+
+
+def measure(strategy, user_id, plan_id):
+    nested = db.session.begin_nested()
+    db.session.expunge_all()
+    with collect_queries() as stats:
+        start = time.perf_counter()
+        strategy(user_id, plan_id)
+        elapsed = time.perf_counter() - start
+    assert db.session.query(SessionExercise).join(WorkoutSession).filter(
+        WorkoutSession.workout_plan_id == plan_id
+    ).count() == 0
+    nested.rollback()
+    db.session.expunge_all()
+    return elapsed, stats.count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=730)
+    parser.add_argument("--exercises", type=int, default=8)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        try:
+            user_id, plan_id = seed(args.sessions, args.exercises)
+            print(
+                f"{args.sessions} sessions, "
+                f"{args.sessions * args.exercises} session exercises"
+            )
+            for name, strategy in [
+                ("orm-cascade", orm_cascade),
+                ("passive", passive),
+                ("bulk", bulk),
+            ]:
+                elapsed, queries = measure(strategy, user_id, plan_id)
+                print(f"{name:<12} {elapsed * 1000:8.1f} ms  {queries:5d} statements")
+        finally:
+            db.session.rollback()
@@ -0,0 +1,125 @@
+"""
+Benchmark importing a session history in bulk against one POST per session.
+
+Creates a throwaway user and plan with --exercises exercises, then logs
+--sessions sessions of every exercise through the API twice:
+
+  * per-session: POST /api/workout-sessions/<plan> once per session, one
+    transaction each
+  * bulk:        one NDJSON body to POST /api/workout-sessions/<plan>/import
+
+and reports the rows written (sessions plus session exercises) per second.
+The user and everything logged are deleted afterwards.
+
+    python scripts/benchmark_session_import.py --sessions 2000 --exercises 4
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+# Add the root directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import jwt
+
+from app import create_app
+from app.models import Exercise, User, WorkoutPlan, WorkoutPlanExercise, db
+
+START = datetime(2020, 1, 1, 7)
+
+
+def seed(exercises):
+    user = User(
+        name="Bench",
+        surname="Mark",
+        email="benchmark-import@example.com",
+        password_hash="x",
+    )
+    db.session.add(user)
+    db.session.flush()
+    plan = WorkoutPlan(user_id=user.id, name="Imported plan")
+    catalog = [Exercise(name=f"Benchmark import {i}") for i in range(exercises)]
+    db.session.add_all([plan, *catalog])
+    db.session.flush()
+    plan_exercises = [
+        WorkoutPlanExercise(workout_plan_id=plan.id, exercise_id=exercise.id)
+        for exercise in catalog
+    ]
+    db.session.add_all(plan_exercises)
+    db.session.commit()
+    return user.id, plan.id, [wp_ex.id for wp_ex in plan_exercises]
+
+
+def cleanup(user_id):
+    db.session.rollback()
+    db.session.execute(
+        db.delete(Exercise).where(Exercise.name.like("Benchmark import %"))
+    )
+    db.session.execute(db.delete(User).where(User.id == user_id))
+    db.session.commit()
+
+
+def history(sessions, plan_exercise_ids):
+    for day in range(sessions):
+        scheduled_at = START + timedelta(days=day)
+        yield {
+            "scheduled_at": scheduled_at.isoformat(),
+            "completed_at": (scheduled_at + timedelta(hours=1)).isoformat(),
+            "exercises": [
+                {
+                    "workout_plan_exercise_id": plan_exercise_id,
+                    "actual_sets": 3,
+                    "actual_reps": 8 + day % 5,
+                    "actual_weight": 40.0 + day % 20,
+                }
+                for plan_exercise_id in plan_exercise_ids
+            ],
+        }
+
+
+def per_session(client, plan_id, sessions):
+    for session in sessions:
+        response = client.post(f"/api/workout-sessions/{plan_id}", json=session)
+        assert response.status_code == 200, response.get_json()
+
+
+def bulk(client, plan_id, sessions):
+    body = "\n".join(json.dumps(session) for session in sessions)
+    response = client.post(f"/api/workout-sessions/{plan_id}/import", data=body)
+    data = response.get_json()
+    assert response.status_code == 200 and not data["errors"], data
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--exercises", type=int, default=4)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        user_id, plan_id, plan_exercise_ids = seed(args.exercises)
+        try:
+            token = jwt.encode(
+                {"id": user_id, "exp": datetime.now() + timedelta(hours=1)},
+                app.config["SECRET_KEY"],
+                algorithm="HS256",
+            )
+            client = app.test_client()
+            client.set_cookie(key="jwt_token", value=token, domain="localhost")
+            sessions = list(history(args.sessions, plan_exercise_ids))
+            rows = args.sessions * (1 + args.exercises)
+            print(
+                f"{args.sessions} sessions x {args.exercises} exercises "
+                f"= {rows} rows"
+            )
+            for name, strategy in [("per-session", per_session), ("bulk", bulk)]:
+                start = time.perf_counter()
+                strategy(client, plan_id, sessions)
+                elapsed = time.perf_counter() - start
+                print(f"{name:<12} {elapsed:8.2f} s  {rows / elapsed:10.0f} rows/s")
+        finally:
+            cleanup(user_id)
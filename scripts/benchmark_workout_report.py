@@ -0,0 +1,210 @@
+"""
+Benchmark building the workout plan report for a plan with a long history.
+
+Seeds one plan with --sessions sessions, each logging all --exercises plan
+exercises (inside a transaction that is rolled back), then compares the
+previous joinedload-based report with build_workout_report, unpaged and
+for the first page of --limit sessions, on latency, statements, rows
+fetched and peak Python memory.
+
+    python scripts/benchmark_workout_report.py --sessions 500 --exercises 8
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+# Add the root directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import event
+from sqlalchemy.orm import joinedload
+
+from app import create_app
+from app.models import (
+    Exercise,
+    SessionExercise,
+    User,
+    WorkoutPlan,
+    WorkoutPlanExercise,
+    WorkoutSession,
+    db,
+)
+from app.utils.query_stats import collect_queries
+from app.utils.workout_report import build_workout_report, isoformat
+
+
+def seed(sessions, exercises):
+    user = User(
+        name="Bench",
+        surname="Mark",
+        email="benchmark-report@example.com",
+        password_hash="x",
+    )
+    db.session.add(user)
+    db.session.flush()
+    plan = WorkoutPlan(user_id=user.id, name="Long plan")
+    db.session.add(plan)
+    db.session.flush()
+
+    catalog = [Exercise(name=f"Benchmark report {i}") for i in range(exercises)]
+    db.session.add_all(catalog)
+    db.session.flush()
+    db.session.execute(
+        WorkoutPlanExercise.__table__.insert(),
+        [{"workout_plan_id": plan.id, "exercise_id": e.id} for e in catalog],
+    )
+    start = datetime(2024, 1, 1)
+    db.session.execute(
+        WorkoutSession.__table__.insert(),
+        [
+            {"workout_plan_id": plan.id, "scheduled_at": start + timedelta(days=i)}
+            for i in range(sessions)
+        ],
+    )
+    db.session.execute(
+        db.text(
+            """
+            INSERT INTO session_exercises
+                (workout_session_id, workout_plan_exercise_id, actual_sets,
+                 actual_reps, actual_weight, notes)
+            SELECT ws.id, wpe.id, 3, 10, 50.0, 'Logged'
+            FROM workout_sessions AS ws
+            JOIN workout_plan_exercises AS wpe ON wpe.workout_plan_id = ws.workout_plan_id
+            WHERE ws.workout_plan_id = :plan_id
+            """
+        ),
+        {"plan_id": plan.id},
+    )
+    return user.id, plan.id
+
+
+def joinedload_report(user_id, workout_plan_id):
+    "The report as it was built before build_workout_report."
+    workout_plan = (
+        db.session.query(WorkoutPlan)
+        .options(
+            joinedload(WorkoutPlan.workout_plan_exercises).joinedload(
+                WorkoutPlanExercise.exercise
+            ),
+            joinedload(WorkoutPlan.workout_sessions)
+            .joinedload(WorkoutSession.session_exercises)
+            .joinedload(SessionExercise.workout_plan_exercise)
+            .joinedload(WorkoutPlanExercise.exercise),
+        )
+        .filter(WorkoutPlan.id == workout_plan_id, WorkoutPlan.user_id == user_id)
+        .one_or_none()
+    )
+    return {
+        "workout_plan_id": workout_plan.id,
+        "workout_plan_name": workout_plan.name,
+        "workout_plan_exercises": [
+            {
+                "id": wp_ex.exercise_id,
+                "name": wp_ex.exercise.name if wp_ex.exercise else None,
+                "target_sets": wp_ex.target_sets,
+                "target_reps": wp_ex.target_reps,
+                "target_weight": wp_ex.target_weight,
+            }
+            for wp_ex in workout_plan.workout_plan_exercises
+        ],
+        "workout_plan_sessions": [
+            {
+                "session_id": session.id,
+                "scheduled_at": isoformat(session.scheduled_at),
+                "started_at": isoformat(session.started_at),
+                "completed_at": isoformat(session.completed_at),
+                "session_exercises": [
+                    {
+                        "id": ws_ex.id,
+                        "workout_plan_exercise_id": ws_ex.workout_plan_exercise_id,
+                        "exercise_name": ws_ex.workout_plan_exercise.exercise.name,
+                        "actual_sets": ws_ex.actual_sets,
+                        "actual_reps": ws_ex.actual_reps,
+                        "actual_weight": ws_ex.actual_weight,
+                        "notes": ws_ex.notes,
+                    }
+                    for ws_ex in session.session_exercises
+                ],
+            }
+            for session in workout_plan.workout_sessions
+        ],
+    }
+
+
+def count_rows():
+    fetched = {"rows": 0}
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if cursor.rowcount > 0:
+            fetched["rows"] += cursor.rowcount
+
+    return fetched, after_cursor_execute
+
+
+def measure(build, user_id, plan_id, repeats):
+    timings = []
+    for _ in range(repeats):
+        db.session.expunge_all()
+        start = time.perf_counter()
+        build(user_id, plan_id)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    db.session.expunge_all()
+    fetched, listener = count_rows()
+    engine = db.session.get_bind()
+    event.listen(engine, "after_cursor_execute", listener)
+    tracemalloc.start()
+    with collect_queries() as stats:
+        build(user_id, plan_id)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    event.remove(engine, "after_cursor_execute", listener)
+    db.session.expunge_all()
+
+    return statistics.median(timings), stats.count, fetched["rows"], peak
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--exercises", type=int, default=8)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        try:
+            user_id, plan_id = seed(args.sessions, args.exercises)
+            # Same sessions either way; joinedload does not order collections
+            expected = joinedload_report(user_id, plan_id)["workout_plan_sessions"]
+            actual = build_workout_report(user_id, plan_id)[0]["workout_plan_sessions"]
+            key = lambda session: session["session_id"]
+            assert sorted(expected, key=key) == sorted(actual, key=key)
+            print(
+                f"{args.sessions} sessions x {args.exercises} exercises, "
+                f"median of {args.repeats}"
+            )
+            for name, build in [
+                ("joinedload", joinedload_report),
+                ("projected", build_workout_report),
+                (
+                    "first page",
+                    lambda user_id, plan_id: build_workout_report(
+                        user_id, plan_id, limit=args.limit
+                    ),
+                ),
+            ]:
+                median, queries, rows, peak = measure(
+                    build, user_id, plan_id, args.repeats
+                )
+                print(
+                    f"{name:<11} {median:8.1f} ms  {queries:3d} statements  "
+                    f"{rows:7d} rows  peak {peak / 2**20:6.1f} MiB"
+                )
+        finally:
+            db.session.rollback()